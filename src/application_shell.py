@@ -27,6 +27,7 @@ from src.models.application_model import ApplicationModel
 from src.views.application_view import ApplicationView, show_error_message
 from src.controllers.application_controller import ApplicationController
 from src.utils.custom_logger import CustomLogger
+from src.utils.query_cache import query_cache
 
 # Instantiate the logger
 logger = CustomLogger(__name__).logger
@@ -67,11 +68,14 @@ class ApplicationShell:
         all components can properly interact following the MVC architectural pattern.
         """
         try:
+            # The models of the Tk thread read through this connection, so the query cache serves it
+            query_cache.track(self.db_connection.connection)
             self.model = ApplicationModel(self.db_connection)
             self.controller = ApplicationController(self.model, self.db_connection)
             self.view = ApplicationView(self.controller.get_callbacks())
             self.controller.set_view(self.view)
-            self.controller.prepare_treeview_data()
+            # Loads in the background, so the window paints before the library is read
+            self.controller.load_treeview_data()
 
         except Exception as error:
             # Consider logging the error and presenting an error message to the user
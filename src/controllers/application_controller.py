@@ -21,17 +21,31 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from tkinter import messagebox
+import bisect
+from collections import OrderedDict
+from tkinter import messagebox, filedialog
 
 
 from src.controllers.snippet_controller import SnippetController
 from src.controllers.theme_management_controller import ThemeController
 from src.controllers.configuration_management_controller import ConfigurationController
 
+from src.db.connection import DatabaseConnection
+from src.models.application_model import ApplicationModel
+from src.models.duplicate_model import DuplicateModel
+from src.models.related_model import RelatedModel
 from src.models.snippet_model import SnippetModel
 from src.models.theme_management_model import ThemeModel
 from src.models.configuration_management_model import ConfigurationModel
-from src.utils.constants import THEMES_DIR, CONFIG_DIR
+from src.utils.constants import (THEMES_DIR, CONFIG_DIR, FUZZY_FILTER_LIMIT, SELECTION_DEBOUNCE_MS,
+                                 PREFETCH_NEIGHBOURS, TREE_PAGE_SIZE, TREE_NODE_BUDGET)
+from src.utils.configuration_manager import ConfigurationManager
+from src.utils.event_bus import event_bus, SnippetChanged, CategoryChanged
+from src.utils.snippet_exporter import SnippetExporter
+from src.utils.fuzzy_finder import fuzzy_finder
+from src.utils.task_runner import TaskRunner
+from src.utils.theme import theme_manager
+from src.utils.tree_loader import TreeLoader
 
 
 from src.views.snippet_view import SnippetView
@@ -66,17 +80,32 @@ class ApplicationController:
         self.model = model
         self.view = None
         self.db_connection = db_connection
+        self.treeview_data = {}
+        self.category_locations = {}
+        self.snippet_locations = {}
+        self.tree_loader = None
+        self.tree_load_total = 0
+        self.lazy_tree = False
+        self.opened_categories = OrderedDict()
+        self.selection_job = None
         self.callbacks = {
             # Button Related Callbacks
             'new_snippet': self.new_snippet,
             'edit_snippet': self.edit_snippet,
             'delete_snippet': self.delete_snippet,
+            'duplicate_snippets': self.duplicate_snippets,
+            'move_snippets': self.move_snippets,
+            'change_snippets_language': self.change_snippets_language,
+            'get_bulk_targets': self.get_bulk_targets,
             'import_snippet': self.import_snippet,
             'export_snippet': self.export_snippet,
             "manage_languages": self.manage_languages,
             "manage_categories": self.manage_categories,
             "manage_theme": self.manage_theme,
             "manage_configuration": self.manage_configuration,
+            "find_duplicates": self.find_duplicates,
+            "find_similar_snippets": self.find_similar_snippets,
+            "merge_duplicates": self.merge_duplicates,
             "open_user_guide": self.open_user_guide,
             "open_faqs": self.open_faqs,
             "report_issue": self.report_issue,
@@ -84,10 +113,9 @@ class ApplicationController:
             "open_about": self.open_about,
             # Misc Callbacks
             'close_db_connection': self.close_db_connection,
-            'add_snippet_to_treeview': self.add_snippet_to_treeview,
-            'update_snippet_in_treeview': self.edit_snippet_in_treeview,
-            'delete_snippet_in_treeview': self.delete_snippet_in_treeview,
             'on_tree_select': self.on_tree_select,
+            'expand_tree_node': self.expand_tree_node,
+            'filter_snippets': self.filter_snippets,
             'get_language_specific_categories': self.get_language_specific_categories,
             'get_general_categories': self.get_general_categories,
             'apply_theme': self.apply_theme
@@ -101,6 +129,13 @@ class ApplicationController:
     def set_view(self, view):
         """ set """
         self.view = view
+        self.task_runner = TaskRunner(view.app)
+        # Changes published by any controller are applied to the tree once per idle cycle
+        event_bus.attach(view.app)
+        event_bus.subscribe(SnippetChanged, self.on_snippets_changed, coalesce=True)
+        event_bus.subscribe(CategoryChanged, self.on_categories_changed, coalesce=True)
+        self.tree_loader = TreeLoader(view.app, self.db_connection.db_file, self.on_tree_categories_loaded,
+                                      self.on_tree_snippets_loaded, self.on_tree_loaded, self.on_tree_load_failed)
 
     def get_callbacks(self):
         """ set """
@@ -114,54 +149,290 @@ class ApplicationController:
 
     def prepare_treeview_data(self):
         """
-        summary
-        """
-        # Fetch all languages as a dictionary: {language_id: language_name, ...}
-        languages = self.model.get_all_languages()
-
-        # Fetch general categories as a list of dictionaries: [{'id': x, 'name': y}, ...]
-        general_categories = self.model.get_general_categories()
+        Builds the language, category and snippet hierarchy shown in the treeview and hands it to the view.
 
-        structured_data = {}
+        The categories and snippets come from two queries that return them already grouped and sorted, and
+        each snippet is filed under its language and category with a single dictionary lookup. This blocks
+        until the whole library is read; load_treeview_data does the same in the background.
+        """
+        if self.tree_loader is not None:
+            self.tree_loader.cancel()
+        structured_data = self.build_treeview_categories(self.model.get_treeview_categories())
+        snippets = [snippet for snippet, _ in self.file_treeview_snippets(self.model.get_treeview_snippets())]
 
-        for language_id, language_name in languages.items():
-            # Initialize each language in structured data with an empty categories dictionary
-            structured_data[language_id] = {
-                'name': language_name,
-                'categories': {}
-            }
-
-            # Populate general categories for each language
-            for category in general_categories:
-                structured_data[language_id]['categories'][f"general-{category['id']}"] = {
-                    'name': category['name'],
-                    'snippets': []
-                }
-
-            # Fetch and populate language-specific categories
-            self.language_specific_categories = self.model.get_language_specific_categories(language_id)
-            for category in self.language_specific_categories:
-                structured_data[language_id]['categories'][f"specific-{category['id']}"] = {
-                    'name': category['name'],
-                    'snippets': []
-                }
-
-        # Fetch all snippets and categorize them under their respective language and category
-        snippets = self.model.get_all_snippets()
-        for snippet in snippets:
-            lang_id = snippet['language_id']
-            cat_id = snippet['category_id']
-            category_prefix = 'specific-' if cat_id in [cat['id'] for cat in
-                                                        self.language_specific_categories] else 'general-'
-            cat_key = f"{category_prefix}{cat_id}"
-
-            # Ensure the snippet's language and category are present in structured_data before adding
-            if lang_id in structured_data and cat_key in structured_data[lang_id]['categories']:
-                structured_data[lang_id]['categories'][cat_key]['snippets'].append(snippet)
+        # Index the titles so the filter can narrow the tree without querying again
+        fuzzy_finder.load((snippet['id'], snippet['title']) for snippet in snippets)
 
         # structured_data is now ready and can be passed to the view for treeview construction
         if self.view:
             self.view.refresh_treeview(structured_data)
+            self.view.hide_load_progress()
+
+    def build_treeview_categories(self, category_rows, lazy=False):
+        """
+        Starts new tree data with the language and category levels, and no snippets yet.
+
+        Each category keeps its snippets in (title, id) order, with the sort keys alongside in "keys", so a
+        snippet is filed or taken out with a bisect. In a lazily filled tree each category only holds the
+        pages read so far. Its "cursor" is the (title, id) of the last snippet read, and it is "complete"
+        once the last page has been read.
+
+        Args:
+            category_rows (list): The rows of ApplicationModel.get_treeview_categories.
+            lazy (bool): Whether the categories are filled one page at a time as they are opened.
+
+        Returns:
+            dict: The new tree data, which also becomes self.treeview_data.
+        """
+        structured_data = {}
+        self.category_locations = {}
+        self.snippet_locations = {}
+        self.opened_categories = OrderedDict()
+        self.lazy_tree = lazy
+
+        for language_id, language_name, category_id, category_name, is_specific in category_rows:
+            language = structured_data.get(language_id)
+            if language is None:
+                language = structured_data[language_id] = {'name': language_name, 'categories': {}}
+            cat_key = f"{'specific' if is_specific else 'general'}-{category_id}"
+            category = {'id': category_id, 'name': category_name, 'snippets': [], 'keys': [], 'cursor': None,
+                        'complete': not lazy}
+            language['categories'][cat_key] = category
+            self.category_locations[(language_id, category_id)] = (cat_key, category)
+
+        self.treeview_data = structured_data
+        return structured_data
+
+    def file_treeview_snippets(self, snippet_rows):
+        """
+        Files snippets under their language and category in the tree data, each at its place in title
+        order. Rows given in treeview order are appended.
+
+        Args:
+            snippet_rows (iterable): (id, title, language_id, category_id) rows, in treeview order.
+
+        Returns:
+            list: A (snippet, category) pair for each snippet filed. Snippets whose category is not shown
+                under their language have no place in the tree and are left out.
+        """
+        filed = []
+        for snippet_id, title, language_id, category_id in snippet_rows:
+            location = self.category_locations.get((language_id, category_id))
+            if location is None:
+                continue
+            cat_key, category = location
+            snippet = {'id': snippet_id, 'title': title, 'language_id': language_id, 'category_id': category_id}
+            key = (title, snippet_id)
+            position = bisect.bisect_right(category['keys'], key)
+            category['keys'].insert(position, key)
+            category['snippets'].insert(position, snippet)
+            self.snippet_locations[snippet_id] = (language_id, cat_key, snippet)
+            filed.append((snippet, category))
+        return filed
+
+    def load_treeview_data(self):
+        """
+        Loads the treeview in the background, restarting the load if one is already running.
+
+        The languages and categories appear first and the snippets follow in chunks, with the progress
+        shown under the tree, so the window paints and stays responsive however large the library is.
+        """
+        self.tree_loader.start()
+        self.view.show_load_progress(0, None)
+
+    def on_tree_categories_loaded(self, category_rows, total, lazy):
+        """
+        Shows the languages and categories of a background load.
+
+        Args:
+            category_rows (list): The rows of ApplicationModel.get_treeview_categories.
+            total (int): The number of snippets in the library.
+            lazy (bool): Whether the snippets are left to be read as their categories are opened.
+        """
+        self.tree_load_total = total
+        self.view.refresh_treeview(self.build_treeview_categories(category_rows, lazy), lazy=lazy)
+        self.view.show_load_progress(0, total)
+
+    def on_tree_snippets_loaded(self, snippet_rows, loaded):
+        """
+        Adds a chunk of snippets from a background load to the tree.
+
+        Args:
+            snippet_rows (list): (id, title, language_id, category_id) rows, in treeview order.
+            loaded (int): The number of snippets loaded so far.
+        """
+        filed = self.file_treeview_snippets(snippet_rows)
+        if not self.view.filter_var.get().strip():
+            self.view.append_snippet_nodes(filed)
+        self.view.show_load_progress(loaded, self.tree_load_total)
+
+    def on_tree_loaded(self):
+        """
+        Finishes a background load by indexing the titles for the filter.
+
+        A lazily filled tree has not read the titles, so they are read on a worker thread instead.
+        """
+        self.view.hide_load_progress()
+        if self.lazy_tree:
+            self.task_runner.submit(self.read_snippet_titles, callback=self.on_snippet_titles_read,
+                                    key="snippet_titles")
+            return
+        fuzzy_finder.load((snippet_id, location[2]['title']) for snippet_id, location in
+                          self.snippet_locations.items())
+        if self.view.filter_var.get().strip():
+            self.filter_snippets(self.view.filter_var.get())
+
+    def read_snippet_titles(self):
+        """
+        Reads the title of every snippet. Runs on a worker thread with its own database connection.
+
+        Returns:
+            list: (id, title) tuples.
+        """
+        db_connection = DatabaseConnection(self.db_connection.db_file)
+        try:
+            return ApplicationModel(db_connection).get_snippet_titles()
+        finally:
+            db_connection.close_connection()
+
+    def on_snippet_titles_read(self, titles):
+        """
+        Indexes the titles read for a lazily filled tree, so the filter covers the whole library.
+
+        Args:
+            titles (list): (id, title) tuples.
+        """
+        fuzzy_finder.load(titles)
+        if self.view.filter_var.get().strip():
+            self.filter_snippets(self.view.filter_var.get())
+
+    def expand_tree_node(self, item):
+        """
+        Fills a node of a lazily filled tree the first time it is opened: a language with its categories,
+        or a category with the first page of its snippets.
+
+        Args:
+            item (str): The iid of the opened node.
+        """
+        if item.startswith("language-"):
+            language_id = int(item[len("language-"):])
+            language = self.treeview_data.get(language_id)
+            if language is not None:
+                self.view.show_category_nodes(language_id, list(language['categories'].values()))
+        elif item.startswith("category-"):
+            language_id, category_id = (int(part) for part in item[len("category-"):].split("-"))
+            self.load_tree_page(language_id, category_id)
+
+    def load_tree_page(self, language_id, category_id):
+        """
+        Reads the next page of a category of a lazily filled tree and appends it to the category's node.
+
+        Args:
+            language_id (int): The ID of the language.
+            category_id (int): The ID of the category.
+        """
+        location = self.category_locations.get((language_id, category_id))
+        if location is None or location[1]['complete']:
+            return
+        category = location[1]
+        rows = self.model.get_treeview_page(language_id, category_id, category['cursor'])
+        if rows:
+            category['cursor'] = (rows[-1][1], rows[-1][0])
+        category['complete'] = len(rows) < TREE_PAGE_SIZE
+        filed = self.file_treeview_snippets(rows)
+        self.opened_categories[(language_id, category_id)] = None
+        self.opened_categories.move_to_end((language_id, category_id))
+        self.view.show_snippet_page(language_id, category, [snippet for snippet, _ in filed],
+                                    not category['complete'])
+        self.release_collapsed_categories()
+
+    def release_collapsed_categories(self):
+        """
+        Keeps a lazily filled tree within its node budget by releasing the pages of the categories opened
+        longest ago that are no longer shown expanded. A released category is read again when reopened.
+        """
+        for language_id, category_id in list(self.opened_categories):
+            if len(self.snippet_locations) <= TREE_NODE_BUDGET:
+                break
+            if not self.view.is_expanded(f"category-{language_id}-{category_id}"):
+                self.release_category(language_id, category_id)
+
+    def release_category(self, language_id, category_id, update_view=True):
+        """
+        Forgets the pages read for a category of a lazily filled tree.
+
+        Args:
+            language_id (int): The ID of the language.
+            category_id (int): The ID of the category.
+            update_view (bool): Also put the category's node back to its unopened state.
+        """
+        category = self.category_locations[(language_id, category_id)][1]
+        for snippet in category['snippets']:
+            self.snippet_locations.pop(snippet['id'], None)
+        category.update(snippets=[], keys=[], cursor=None, complete=False)
+        self.opened_categories.pop((language_id, category_id), None)
+        if update_view:
+            self.view.release_category_node(language_id, category_id)
+
+    def show_treeview_data(self):
+        """
+        Shows the whole tree again, as after clearing the filter. A lazily filled tree shows the categories
+        whose pages were read open again, with those pages.
+        """
+        self.view.refresh_treeview(self.treeview_data, lazy=self.lazy_tree, opened=self.opened_categories)
+
+    def on_tree_load_failed(self, error):
+        """
+        Reports a background load that failed.
+
+        Args:
+            error (Exception): The error raised by the loader.
+        """
+        logger.error(f"Failed to load the snippet tree: {error}")
+        self.view.hide_load_progress()
+        messagebox.showerror("Load Failed", "The snippet library could not be loaded. Check logs.")
+
+    def filter_snippets(self, query):
+        """
+        Narrows the treeview to the snippets whose titles fuzzily match a query, best matches first.
+
+        Called on every keystroke in the filter box. An empty query shows the whole tree again.
+
+        Args:
+            query (str): The text typed into the filter box.
+        """
+        structured_data = self.treeview_data
+        if not query.strip():
+            fuzzy_finder.search("")
+            self.show_treeview_data()
+            return
+
+        snippet_ids, total = fuzzy_finder.search(query, limit=FUZZY_FILTER_LIMIT)
+
+        # A lazily filled tree has not read most matches yet, so those are read by ID
+        missing = [snippet_id for snippet_id in snippet_ids if snippet_id not in self.snippet_locations]
+        missing_rows = {row[0]: row for row in self.model.get_treeview_rows(missing)} if missing else {}
+
+        # Languages and categories are listed in the order of their best match
+        filtered_data = {}
+        for snippet_id in snippet_ids:
+            if snippet_id in self.snippet_locations:
+                lang_id, cat_key, snippet = self.snippet_locations[snippet_id]
+            elif snippet_id in missing_rows and missing_rows[snippet_id][2:] in self.category_locations:
+                _, title, lang_id, category_id = missing_rows[snippet_id]
+                cat_key = self.category_locations[(lang_id, category_id)][0]
+                snippet = {'id': snippet_id, 'title': title, 'language_id': lang_id, 'category_id': category_id}
+            else:
+                continue
+            lang_info = structured_data[lang_id]
+            filtered_language = filtered_data.setdefault(lang_id, {'name': lang_info['name'], 'categories': {}})
+            cat_info = lang_info['categories'][cat_key]
+            filtered_category = filtered_language['categories'].setdefault(
+                cat_key, {'id': cat_info['id'], 'name': cat_info['name'], 'snippets': []})
+            filtered_category['snippets'].append(snippet)
+
+        self.view.refresh_treeview(filtered_data, expand=True)
+        self.view.show_filter_matches(len(snippet_ids), total)
 
     def show_snippet_details(self):
         """ summary """
@@ -181,13 +452,12 @@ class ApplicationController:
             messagebox.showerror("Selection Required", "Please select a snippet to edit.")
             return
 
-        # Assuming the first selected item is what we want to edit
-        self.selected_item = selected_items[0]
-
-        # Check if the selected item is a snippet
-        if not self.selected_item.startswith("snippet-"):
+        # Edit the first snippet of a multi-selection, skipping any language or category nodes in it
+        selected_snippets = [item for item in selected_items if item.startswith("snippet-")]
+        if not selected_snippets:
             messagebox.showerror("Invalid Selection", "Please select a valid snippet to edit.")
             return
+        self.selected_item = selected_snippets[0]
 
         # Strip the "snippet-" prefix to get the numeric ID
         snippet_id = self.selected_item.replace("snippet-", "")
@@ -205,21 +475,278 @@ class ApplicationController:
         """ summary """
         pass
 
-    def export_snippet(self):
-        """ summary """
-        pass
+    def get_selection_filter(self):
+        """
+        Translates the current treeview selection into a selection filter for the model.
+
+        Language nodes select their whole subtree, category nodes select the snippets filed under that
+        category for their language, and snippet nodes select themselves.
+
+        Returns:
+            dict | None: The selection filter, or None when nothing is selected.
+        """
+        selection = {'snippet_ids': [], 'language_nodes': [], 'category_nodes': []}
+        for item in self.view.treeview.selection():
+            if item.startswith("snippet-"):
+                selection['snippet_ids'].append(int(item[len("snippet-"):]))
+            elif item.startswith("language-"):
+                selection['language_nodes'].append(int(item[len("language-"):]))
+            elif item.startswith("category-"):
+                language_id, category_id = item[len("category-"):].split("-")
+                selection['category_nodes'].append((int(language_id), int(category_id)))
+
+        if not any(selection.values()):
+            return None
+        return selection
+
+    def export_snippet(self, archive=True):
+        """
+        Exports the selected snippets, or the whole library when nothing is selected, as source files.
+
+        The user picks a zip file or a folder to export to. The export itself runs on a background
+        thread and streams snippets straight from the database, so it does not block the UI.
+
+        Args:
+            archive (bool): True to export into a zip archive, False to export into a folder.
+        """
+        if archive:
+            destination = filedialog.asksaveasfilename(parent=self.view.app, title="Export Snippets",
+                                                       defaultextension=".zip",
+                                                       filetypes=[("Zip archive", "*.zip")])
+        else:
+            destination = filedialog.askdirectory(parent=self.view.app, title="Export Snippets to Folder")
+        if not destination:
+            return
+
+        export_config = ConfigurationManager("application_config").get_configuration("export", {})
+        try:
+            exporter = SnippetExporter(self.db_connection.db_file, destination, archive=archive,
+                                       compression=export_config.get("compression", "deflated"),
+                                       compresslevel=export_config.get("compresslevel"),
+                                       selection=self.get_selection_filter())
+        except ValueError as error:
+            logger.error(f"Invalid export configuration: {error}")
+            messagebox.showerror("Export Failed", str(error))
+            return
+
+        self.task_runner.submit(exporter.export,
+                                callback=lambda count: self.on_export_done(exporter, count),
+                                error_callback=self.on_export_failed)
+
+    def on_export_done(self, exporter, count):
+        """
+        Reports a finished export.
+
+        Args:
+            exporter (SnippetExporter): The exporter that ran.
+            count (int): The number of snippets written.
+        """
+        messagebox.showinfo("Export Complete", f"Exported {count} snippets to {exporter.destination}.")
+
+    def on_export_failed(self, error):
+        """
+        Reports an export that failed.
+
+        Args:
+            error (Exception): The error raised by the exporter.
+        """
+        logger.error(f"Failed to export snippets: {error}")
+        messagebox.showerror("Export Failed", f"Failed to export snippets: {error}")
+
+    def find_duplicates(self):
+        """
+        Finds clusters of near-duplicate snippets across the whole library and offers to merge them.
+        """
+        self.start_duplicate_search()
+
+    def find_similar_snippets(self):
+        """
+        Finds the near-duplicates of the selected snippet and offers to merge them.
+        """
+        selected_snippets = [item for item in self.view.treeview.selection() if item.startswith("snippet-")]
+        if not selected_snippets:
+            messagebox.showerror("Selection Required", "Please select a snippet to find similar snippets for.")
+            return
+        snippet_id = int(selected_snippets[0][len("snippet-"):])
+        self.start_duplicate_search(snippet_id)
+
+    def start_duplicate_search(self, snippet_id=None):
+        """
+        Runs a near-duplicate search in the background and shows its clusters when it is done. A search
+        started while another runs makes the earlier one's result stale, so only the latest is shown.
+
+        Args:
+            snippet_id (int, optional): Only look for near-duplicates of this snippet.
+        """
+        self.task_runner.submit(self.search_duplicates, snippet_id, callback=self.view.show_duplicate_clusters,
+                                error_callback=self.on_duplicate_search_failed, key="duplicates")
+
+    def search_duplicates(self, snippet_id=None):
+        """
+        Searches for near-duplicates. Runs on a worker thread with its own database connection.
+
+        Signatures missing for older snippets are computed first.
+
+        Args:
+            snippet_id (int, optional): Only look for near-duplicates of this snippet.
+
+        Returns:
+            list: The clusters found, each a list of snippet summaries.
+        """
+        db_connection = DatabaseConnection(self.db_connection.db_file)
+        try:
+            duplicate_model = DuplicateModel(db_connection)
+            duplicate_model.index_missing_signatures()
+            if snippet_id is None:
+                clusters = duplicate_model.find_clusters()
+            else:
+                similar = duplicate_model.find_similar(snippet_id)
+                clusters = [[snippet_id] + [other_id for other_id, _ in similar]] if similar else []
+
+            summaries = duplicate_model.get_snippet_summaries({item for cluster in clusters for item in cluster})
+            return [[summaries[item] for item in cluster if item in summaries] for cluster in clusters]
+        finally:
+            db_connection.close_connection()
+
+    def on_duplicate_search_failed(self, error):
+        """
+        Reports a near-duplicate search that failed.
+
+        Args:
+            error (Exception): The error raised by the search.
+        """
+        logger.error(f"Failed to search for duplicate snippets: {error}")
+        messagebox.showerror("Duplicate Search Failed", f"Failed to search for duplicate snippets: {error}")
+
+    def merge_duplicates(self, keep_id, duplicate_ids):
+        """
+        Keeps one snippet of a near-duplicate cluster and deletes the others.
+
+        Args:
+            keep_id (int): The ID of the snippet to keep.
+            duplicate_ids (list): The IDs of the snippets to delete.
+
+        Returns:
+            bool: True if the merge succeeded.
+        """
+        if DuplicateModel(self.db_connection).merge_snippets(keep_id, duplicate_ids):
+            event_bus.publish(SnippetChanged([snippet_id for snippet_id in duplicate_ids if snippet_id != keep_id],
+                                             SnippetChanged.DELETED))
+            return True
+        messagebox.showerror("Merge Failed", "Failed to merge the duplicate snippets.")
+        return False
 
     def import_snippet(self):
         """ summary """
         pass
 
     def delete_snippet(self):
-        """ summary """
-        pass
+        """
+        Deletes the selected snippets, including every snippet under selected language and category nodes,
+        after asking the user to confirm.
+        """
+        selection = self.get_selection_filter()
+        count = self.model.count_snippets(selection) if selection else 0
+        if not count:
+            messagebox.showerror("Selection Required", "Please select the snippets to delete.")
+            return
+        if not messagebox.askyesno("Delete Snippets", f"Delete {count} selected snippet(s)?"):
+            return
+
+        snippet_ids = SnippetModel(self.db_connection).delete_snippets(selection)
+        if snippet_ids is None:
+            messagebox.showerror("Delete Failed", "Failed to delete the selected snippets.")
+            return
+        event_bus.publish(SnippetChanged(snippet_ids, SnippetChanged.DELETED))
+
+    def duplicate_snippets(self):
+        """
+        Copies the selected snippets, including every snippet under selected language and category nodes.
+        """
+        self.run_bulk_operation("Duplicate", SnippetChanged.ADDED, SnippetModel.duplicate_snippets)
+
+    def move_snippets(self, category_id):
+        """
+        Files the selected snippets under another category.
+
+        Args:
+            category_id (int): The ID of the category to move them to.
+        """
+        self.run_bulk_operation("Move", SnippetChanged.UPDATED, SnippetModel.move_snippets, category_id)
+
+    def change_snippets_language(self, language_id):
+        """
+        Changes the language of the selected snippets.
+
+        Args:
+            language_id (int): The ID of the new language.
+        """
+        self.run_bulk_operation("Change Language", SnippetChanged.UPDATED, SnippetModel.change_snippets_language,
+                                language_id)
+
+    def run_bulk_operation(self, title, kind, operation, *args):
+        """
+        Runs a bulk SnippetModel operation on the current selection and publishes one SnippetChanged event
+        for the snippets it changed or created.
+
+        Args:
+            title (str): The name of the operation, for error messages.
+            kind (str): The SnippetChanged kind of the change.
+            operation (callable): The SnippetModel method, taking the selection and *args and returning the
+                IDs of the snippets it changed or created, or None on failure.
+            *args: Further arguments of the operation.
+        """
+        selection = self.get_selection_filter()
+        if selection is None:
+            messagebox.showerror("Selection Required", "Please select the snippets to change.")
+            return
+        snippet_ids = operation(SnippetModel(self.db_connection), selection, *args)
+        if snippet_ids is None:
+            messagebox.showerror(f"{title} Failed", "Failed to change the selected snippets.")
+            return
+        event_bus.publish(SnippetChanged(snippet_ids, kind))
+
+    def get_bulk_targets(self):
+        """
+        Lists the languages and categories the current selection can be moved to.
+
+        Categories are limited to those shown for every language in the selection, so moved snippets stay
+        visible in the tree.
+
+        Returns:
+            dict: "languages" and "categories", each a list of (id, name) pairs.
+        """
+        language_ids = set()
+        for item in self.view.treeview.selection():
+            if item.startswith("snippet-"):
+                location = self.snippet_locations.get(int(item[len("snippet-"):]))
+                if location is not None:
+                    language_ids.add(location[0])
+            elif item.startswith("language-"):
+                language_ids.add(int(item[len("language-"):]))
+            elif item.startswith("category-"):
+                language_ids.add(int(item[len("category-"):].split("-")[0]))
+
+        categories = None
+        for language_id in language_ids:
+            shown = {category['id']: category['name']
+                     for category in self.treeview_data.get(language_id, {}).get('categories', {}).values()}
+            categories = shown if categories is None else {category_id: name for category_id, name
+                                                           in categories.items() if category_id in shown}
+        return {
+            'languages': [(language_id, language['name']) for language_id, language in self.treeview_data.items()],
+            'categories': sorted((categories or {}).items(), key=lambda category: category[1])
+        }
 
     def apply_theme(self, theme_name):
-        """ summary """
-        pass
+        """
+        Switches the application to another theme while it runs, and keeps it as the user's theme.
+
+        Args:
+            theme_name (str): The name of the theme.
+        """
+        theme_manager.set_theme(theme_name)
+        self.view.apply_theme()
 
     def manage_configuration(self):
         """
@@ -246,17 +773,125 @@ class ApplicationController:
         """
         Summary
         """
-        parent_item = self.view.treeview.parent(selected_item)
-        grandparent_item = self.view.treeview.parent(parent_item) if parent_item else None
-
-        if not parent_item:
+        parent_item = self.view.node_index.parent(selected_item)
+        grandparent_item = self.view.node_index.parent(parent_item) if parent_item else None
+
+        if self.selection_job is not None:
+            self.view.app.after_cancel(self.selection_job)
+            self.selection_job = None
+
+        if selected_item.startswith("more-"):
+            # The last node of a partly read category of a lazily filled tree reads the next page
+            language_id, category_id = (int(part) for part in selected_item[len("more-"):].split("-"))
+            self.load_tree_page(language_id, category_id)
+        elif not selected_item.startswith(("language-", "category-", "snippet-")):
+            return
+        elif not parent_item:
             print("Language selected:", self.view.treeview.item(selected_item, 'text'))
+            self.task_runner.cancel("related_snippets")
+            self.view.show_related_snippets([])
         elif not grandparent_item:
             print("Category selected:", self.view.treeview.item(selected_item, 'text'))
+            self.task_runner.cancel("related_snippets")
+            self.view.show_related_snippets([])
         else:
-            snippet_id = self.view.treeview.item(selected_item, 'values')[0]
+            # A cached snippet is shown at once. Anything that costs a query waits until the selection has
+            # settled, so holding an arrow key down the tree skips the snippets passed over.
+            snippet_id = int(self.view.treeview.item(selected_item, 'values')[0])
+            shown = self.model.is_snippet_cached(snippet_id)
+            if shown:
+                snippet = self.model.get_snippet(snippet_id)
+                self.view.display_snippet_code(snippet['code'], snippet['language'])
+            self.selection_job = self.view.app.after(SELECTION_DEBOUNCE_MS, self.on_selection_settled,
+                                                     snippet_id, shown)
+
+    def on_selection_settled(self, snippet_id, shown):
+        """
+        Loads what the selected snippet needs once the selection has stopped changing.
+
+        Args:
+            snippet_id (int): The ID of the selected snippet.
+            shown (bool): Whether its code was already shown from the snippet cache.
+        """
+        self.selection_job = None
+        if not shown:
             snippet_details = self.model.get_snippet(snippet_id)
-            self.view.display_snippet_code(snippet_details['code'])
+            if snippet_details is None:
+                return
+            self.view.display_snippet_code(snippet_details['code'], snippet_details['language'])
+        self.load_related_snippets(snippet_id)
+        self.prefetch_neighbours(snippet_id)
+
+    def prefetch_neighbours(self, snippet_id):
+        """
+        Reads the snippets around the selected one into the snippet cache in the background, so moving to
+        them with the arrow keys shows them without waiting.
+
+        Only snippets not already cached are read, in one query, and a newer prefetch supersedes this one.
+
+        Args:
+            snippet_id (int): The ID of the selected snippet.
+        """
+        item = f"snippet-{snippet_id}"
+        if item not in self.view.node_index:
+            return
+        neighbour_ids = []
+        previous_item = next_item = item
+        for _ in range(PREFETCH_NEIGHBOURS):
+            previous_item = self.view.treeview.prev(previous_item) if previous_item else ''
+            next_item = self.view.treeview.next(next_item) if next_item else ''
+            for neighbour in (previous_item, next_item):
+                if neighbour.startswith("snippet-"):
+                    neighbour_id = int(neighbour[len("snippet-"):])
+                    if not self.model.is_snippet_cached(neighbour_id):
+                        neighbour_ids.append(neighbour_id)
+        if neighbour_ids:
+            self.task_runner.submit(self.fetch_snippets, neighbour_ids, key="prefetch")
+
+    def fetch_snippets(self, snippet_ids):
+        """
+        Reads snippets into the snippet cache. Runs on a worker thread with its own database connection.
+
+        Args:
+            snippet_ids (list): The IDs of the snippets.
+        """
+        db_connection = DatabaseConnection(self.db_connection.db_file)
+        try:
+            ApplicationModel(db_connection).prefetch_snippets(snippet_ids)
+        finally:
+            db_connection.close_connection()
+
+    def load_related_snippets(self, snippet_id):
+        """
+        Fills the related snippets panel for a snippet in the background.
+
+        The panel shows a loading state straight away and is filled once the search finishes, so the
+        selection handler never waits on it. Selecting another snippet in the meantime discards the
+        result of this search.
+
+        Args:
+            snippet_id (int): The ID of the selected snippet.
+        """
+        self.view.show_related_snippets(None)
+        self.task_runner.submit(self.find_related_snippets, snippet_id,
+                                callback=self.view.show_related_snippets, key="related_snippets")
+
+    def find_related_snippets(self, snippet_id):
+        """
+        Finds the snippets related to a snippet. Runs on a worker thread with its own database connection,
+        which is only needed the first time, to load the index.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+
+        Returns:
+            list: The related snippets, most similar first.
+        """
+        db_connection = DatabaseConnection(self.db_connection.db_file)
+        try:
+            return RelatedModel(db_connection).get_related(snippet_id)
+        finally:
+            db_connection.close_connection()
 
     def update_snippet_display(self):
         """ Test """
@@ -277,20 +912,114 @@ class ApplicationController:
         if self.view is not None:
             self.view.update_general_categories(general_categories)
 
-    def add_snippet_to_treeview(self):
+    def on_snippets_changed(self, events):
         """
-        Summary
+        Applies the snippet changes published during one idle cycle to the treeview, as one patch.
+
+        Args:
+            events (list): The SnippetChanged events, in the order they were published.
+        """
+        changes = SnippetChanged.coalesce(events)
+        deleted = [snippet_id for snippet_id, kind in changes.items() if kind == SnippetChanged.DELETED]
+        saved = [snippet_id for snippet_id, kind in changes.items() if kind != SnippetChanged.DELETED]
+        if self.tree_loader is not None and self.tree_loader.running:
+            # The load in progress may or may not have read the changes yet, so read the library again
+            self.load_treeview_data()
+            return
+        if deleted:
+            self.remove_snippets_from_treeview(deleted)
+        if saved:
+            self.place_snippets_in_treeview(saved)
+
+    def on_categories_changed(self, events):
         """
+        Rebuilds the treeview after categories changed, since any language may show or hide them.
 
-    def edit_snippet_in_treeview(self):
+        Args:
+            events (list): The CategoryChanged events of one idle cycle.
         """
-        Summary
+        self.load_treeview_data()
+
+    def remove_snippets_from_treeview(self, snippet_ids):
         """
+        Removes many deleted snippets from the treeview in one patch.
 
-    def delete_snippet_in_treeview(self):
+        Args:
+            snippet_ids (list): The IDs of the deleted snippets.
         """
-        Summary
+        if self.tree_loader is not None and self.tree_loader.running:
+            self.load_treeview_data()
+            return
+        for snippet_id in snippet_ids:
+            self.forget_snippet_location(snippet_id)
+            fuzzy_finder.remove(snippet_id)
+        if self.view is not None:
+            if self.view.filter_var.get().strip():
+                self.filter_snippets(self.view.filter_var.get())
+            else:
+                self.view.remove_snippet_nodes(snippet_ids)
+
+    def place_snippets_in_treeview(self, snippet_ids):
+        """
+        Files many saved snippets under their languages and categories and patches the treeview once.
+
+        The snippets are read back in one query. Each category they land in is sorted by title once, rather
+        than once per snippet, and the view only inserts the nodes of the snippets that changed.
+
+        Args:
+            snippet_ids (list): The IDs of the saved snippets.
+        """
+        if self.tree_loader is not None and self.tree_loader.running:
+            self.load_treeview_data()
+            return
+        for snippet_id in snippet_ids:
+            self.forget_snippet_location(snippet_id)
+
+        filed = self.file_treeview_snippets(self.model.get_treeview_rows(snippet_ids))
+        fuzzy_finder.set_titles((snippet['id'], snippet['title']) for snippet, _ in filed)
+        placed = {snippet['id'] for snippet, _ in filed}
+        for snippet_id in snippet_ids:
+            if snippet_id not in placed:
+                fuzzy_finder.remove(snippet_id)
+
+        touched = {}
+        for snippet, category in filed:
+            cursor = category['cursor']
+            if not category['complete'] and (cursor is None or (snippet['title'], snippet['id']) > cursor):
+                # A partly read category only holds its pages so far. Snippets sorting past the last one
+                # read are left for the page that will contain them.
+                self.forget_snippet_location(snippet['id'])
+                placed.discard(snippet['id'])
+            else:
+                touched.setdefault((snippet['language_id'], category['id']), (category, []))[1].append(snippet)
+
+        categories = []
+        for (language_id, _), (category, snippets) in touched.items():
+            keys = category['keys']
+            positions = sorted(((bisect.bisect_left(keys, (snippet['title'], snippet['id'])), snippet)
+                                for snippet in snippets), key=lambda position: position[0])
+            categories.append((language_id, self.treeview_data[language_id]['name'], category, positions))
+
+        if self.view is not None:
+            if self.view.filter_var.get().strip():
+                self.filter_snippets(self.view.filter_var.get())
+            else:
+                self.view.patch_snippet_nodes(snippet_ids, categories, placed)
+
+    def forget_snippet_location(self, snippet_id):
+        """
+        Takes a snippet out of the tree data it is currently filed under.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
         """
+        location = self.snippet_locations.pop(snippet_id, None)
+        if location is not None:
+            language_id, cat_key, snippet = location
+            category = self.treeview_data[language_id]['categories'][cat_key]
+            position = bisect.bisect_left(category['keys'], (snippet['title'], snippet['id']))
+            del category['keys'][position]
+            del category['snippets'][position]
 
     def manage_languages(self):
         # Logic to manage programming languages in the application
@@ -23,6 +23,8 @@ SOFTWARE.
 """
 import threading
 
+from src.utils.event_bus import event_bus, SnippetChanged
+
 
 def validate_snippet_data(data):
     """
@@ -60,6 +62,7 @@ class SnippetController:
         self.mode = 'edit' if selected_item else 'add'
         self.callbacks = {
             'submit_snippet': self.submit_snippet,
+            'detect_language': self.detect_language,
         }
         self.application_callbacks = application_callbacks
 
@@ -76,6 +79,18 @@ class SnippetController:
         if self.mode == 'edit':
             self.view.populate_form(self.snippet)
 
+    def detect_language(self, code):
+        """
+        Detects the language of the code typed or pasted into the snippet form.
+
+        Args:
+            code (str): The code to classify.
+
+        Returns:
+            dict: The detected "language" and its "confidence".
+        """
+        return self.model.detect_language(code)
+
     def submit_snippet_async(self, snippet_data):
         """Submits the snippet in a new thread to keep UI responsive."""
         threading.Thread(target=self.submit_snippet, args=(snippet_data,), daemon=True).start()
@@ -95,7 +110,10 @@ class SnippetController:
             self.success = self.model.update_snippet(self.selected_item, snippet_data)
 
         message = "Snippet saved successfully." if self.success else "Failed to save snippet."
-        self.invoke_in_main_thread(self.post_submission_cleanup, message, self.success)
+        # add_snippet returns the new snippet's ID, which the main window needs to show it
+        snippet_id = self.success if self.mode == 'add' else self.selected_item
+        self.invoke_in_main_thread(self.post_submission_cleanup, message, self.success,
+                                   dict(snippet_data, id=snippet_id) if self.success else None)
 
         # Execute UI operations in the main thread
         self.view.master.after(0, self.view.show_message, message, self.success)
@@ -131,19 +149,10 @@ class SnippetController:
             # Show a success message to the user.
             self.view.show_message("Success", message)
 
-            # Assuming the application_callbacks dict has a callback to refresh or update the main display.
-            # If a snippet was added or edited, update the treeview or relevant display accordingly.
+            # Tell the main window, and anything else listening, which snippet changed
             if snippet_data:
-                # Check if the operation was an add or edit based on snippet_data content.
-                if 'id' in snippet_data and snippet_data['id']:
-                    # Handle updating an existing snippet in the treeview.
-                    self.application_callbacks['update_snippet_in_treeview'](snippet_data)
-                else:
-                    # Handle adding a new snippet to the treeview.
-                    self.application_callbacks['add_snippet_to_treeview'](snippet_data)
-            else:
-                # General refresh of the display if no specific snippet data is provided.
-                self.application_callbacks['refresh_display']()
+                kind = SnippetChanged.UPDATED if self.mode == 'edit' else SnippetChanged.ADDED
+                event_bus.publish(SnippetChanged([snippet_data['id']], kind))
 
             # Close the snippet form window.
             self.view.close()
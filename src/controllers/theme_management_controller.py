@@ -38,6 +38,7 @@ class ThemeController:
         self.callbacks = {
             'theme_selected': self.theme_selected,
             'save_theme': self.save_theme,
+            'apply_theme': self.apply_theme,
         }
         self.application_callbacks = application_callbacks
 
@@ -0,0 +1,99 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from collections import defaultdict
+
+
+class WidgetPool:
+    """
+    Keeps widgets that were shown once so they can be shown again, instead of destroying them and
+    building new ones each time a panel is refilled.
+
+    Widgets are built by a factory registered for each kind and are all children of the pool's master.
+    They are shown by packing them into a container, which must be the master or one of its
+    descendants, so one widget can be reused in any section of the panel. Releasing the pool hides
+    every widget in use and makes it available to the next acquire of the same kind.
+
+    Attributes:
+        master (tk.Widget): The parent of every pooled widget.
+        factories (dict): The function building a new widget of each kind from the master.
+        free (dict): The hidden widgets ready for reuse, by kind.
+        used (list): (kind, widget) pairs of the widgets shown, in the order they were acquired.
+        created (int): The number of widgets built so far.
+    """
+
+    def __init__(self, master):
+        """
+        Initializes an empty WidgetPool.
+
+        Args:
+            master (tk.Widget): The parent of every pooled widget.
+        """
+        self.master = master
+        self.factories = {}
+        self.free = defaultdict(list)
+        self.used = []
+        self.created = 0
+
+    def register(self, kind, factory):
+        """
+        Registers the factory building widgets of a kind.
+
+        Args:
+            kind (str): The kind of widget.
+            factory (callable): Called with the master, returns a new widget.
+        """
+        self.factories[kind] = factory
+
+    def acquire(self, kind, container, **pack_options):
+        """
+        Shows a widget of a kind at the end of a container, reusing a hidden one when there is one.
+
+        Args:
+            kind (str): The kind of widget.
+            container (tk.Widget): The widget to pack it into, the master or a descendant of it.
+            **pack_options: Options passed to pack().
+
+        Returns:
+            tk.Widget: The widget, to be filled in by the caller.
+        """
+        free = self.free[kind]
+        if free:
+            widget = free.pop()
+        else:
+            widget = self.factories[kind](self.master)
+            self.created += 1
+        widget.pack(in_=container, **pack_options)
+        # Widgets built before the container would otherwise be hidden behind it
+        widget.lift()
+        self.used.append((kind, widget))
+        return widget
+
+    def release_all(self):
+        """
+        Hides every widget in use and makes it available for reuse.
+        """
+        for kind, widget in self.used:
+            widget.pack_forget()
+            self.free[kind].append(widget)
+        self.used.clear()
@@ -23,6 +23,7 @@ SOFTWARE.
 """
 import sqlite3
 from src.utils.custom_logger import CustomLogger
+from src.utils.query_cache import query_cache
 
 # Instantiate the logger
 logger = CustomLogger(__name__).logger
@@ -64,6 +65,8 @@ class DatabaseConnection:
     def close_connection(self):
         """Close the database connection if it's open."""
         if self.connection:
+            # Cached results must not outlive the connection they were read through
+            query_cache.forget(self.connection)
             self.connection.close()
             self.connection = None
             logger.info("SQLite database connection closed")
@@ -47,9 +47,37 @@ TABLES_SQL = {
                        [created_at] TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                        FOREIGN KEY (category_id) REFERENCES categories(id),
                        FOREIGN KEY (language_id) REFERENCES languages(id)
+                   );""",
+    "snippet_signatures": """CREATE TABLE IF NOT EXISTS [snippet_signatures] (
+                       [snippet_id] INTEGER NOT NULL PRIMARY KEY,
+                       [signature] BLOB NOT NULL,
+                       FOREIGN KEY (snippet_id) REFERENCES snippets(id)
+                   );""",
+    "snippet_lsh_buckets": """CREATE TABLE IF NOT EXISTS [snippet_lsh_buckets] (
+                       [band] INTEGER NOT NULL,
+                       [bucket] INTEGER NOT NULL,
+                       [snippet_id] INTEGER NOT NULL,
+                       FOREIGN KEY (snippet_id) REFERENCES snippets(id)
+                   );""",
+    "snippet_terms": """CREATE TABLE IF NOT EXISTS [snippet_terms] (
+                       [snippet_id] INTEGER NOT NULL,
+                       [term] TEXT NOT NULL,
+                       [count] INTEGER NOT NULL,
+                       FOREIGN KEY (snippet_id) REFERENCES snippets(id)
                    );"""
 }
 
+INDEXES_SQL = {
+    "idx_snippet_lsh_buckets_band_bucket": """CREATE INDEX IF NOT EXISTS [idx_snippet_lsh_buckets_band_bucket]
+                       ON [snippet_lsh_buckets] ([band], [bucket]);""",
+    "idx_snippet_lsh_buckets_snippet": """CREATE INDEX IF NOT EXISTS [idx_snippet_lsh_buckets_snippet]
+                       ON [snippet_lsh_buckets] ([snippet_id]);""",
+    "idx_snippet_terms_snippet": """CREATE INDEX IF NOT EXISTS [idx_snippet_terms_snippet]
+                       ON [snippet_terms] ([snippet_id]);""",
+    "idx_snippets_tree": """CREATE INDEX IF NOT EXISTS [idx_snippets_tree]
+                       ON [snippets] ([language_id], [category_id], [title]);"""
+}
+
 INITIAL_DATA_SQL = {
     "languages": [
         """INSERT INTO languages (name) VALUES ('Python');""",
@@ -169,6 +169,11 @@ class LoadingScreen:
                     logger.error(f"Failed to create tables: {', '.join(errors)}")
                     self.update_message("Failed to create tables. Check logs.")
                     return  # Abort further initialization if table creation failed
+            else:
+                # Bring existing databases up to date with tables added in newer versions
+                success, errors = DatabaseInitializer(self.db_connection).create_tables()
+                if not success:
+                    logger.error(f"Failed to update database schema: {', '.join(errors)}")
         except Exception as e:
             logger.error(f"An unexpected error occurred during initialization: {e}")
             self.update_message("Unexpected error during initialization. Check logs.")
@@ -21,6 +21,122 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import json
+
+from src.utils.constants import EXPORT_BATCH_SIZE, TREE_LOAD_BATCH_SIZE, TREE_PAGE_SIZE
+from src.utils.query_cache import query_cache
+from src.utils.snippet_cache import snippet_cache
+
+# Tables read by the cached queries, so writes to them invalidate the right results
+SNIPPET_TABLES = ("snippets", "languages", "categories")
+CATEGORY_TABLES = ("categories", "languages_categories")
+
+SNIPPET_DETAILS_QUERY = """SELECT snippets.id, snippets.title, snippets.code, snippets.language_id, languages.name AS language, snippets.category_id, categories.name AS category FROM snippets JOIN languages ON snippets.language_id = languages.id JOIN categories ON snippets.category_id = categories.id WHERE snippets.id IN (SELECT value FROM json_each(?))"""
+
+
+def read_snippet_details(connection, snippet_ids, count=True):
+    """
+    Reads the detail rows of snippets, answering from the shared snippet cache where it can and caching
+    the rows it has to query.
+
+    Args:
+        connection (sqlite3.Connection): The connection to query on a miss.
+        snippet_ids (iterable): The IDs of the snippets.
+        count (bool): Whether the lookups count towards the cache statistics.
+
+    Returns:
+        dict: Maps each snippet ID found to its (id, title, code, language_id, language, category_id,
+            category) row.
+    """
+    rows = {}
+    missing = []
+    for snippet_id in snippet_ids:
+        row = snippet_cache.get(snippet_id, count)
+        if row is None:
+            missing.append(int(snippet_id))
+        else:
+            rows[int(snippet_id)] = row
+    if missing:
+        # Taken before the query, so rows read across a write that invalidates them are not cached
+        version = snippet_cache.version
+        for row in connection.execute(SNIPPET_DETAILS_QUERY, (json.dumps(missing),)):
+            snippet_cache.put(row[0], row, version)
+            rows[row[0]] = row
+    return rows
+
+
+# The keys of a selection that pick snippets in the tree, as opposed to narrowing those picked
+TREE_SELECTION_KEYS = ("snippet_ids", "language_nodes", "category_nodes")
+
+
+def picks_tree_nodes(selection):
+    """
+    Tells whether a selection picks any snippet or subtree in the tree. A selection that does not only
+    narrows the whole library, so operations that change snippets must treat it as selecting nothing.
+
+    Args:
+        selection (dict | None): A selection as understood by build_selection_filter.
+    """
+    return bool(selection) and any(selection.get(key) for key in TREE_SELECTION_KEYS)
+
+
+def build_selection_filter(selection):
+    """
+    Builds a SQL WHERE clause restricting the snippets table to a selection.
+
+    A selection is a dictionary that may contain any of the following keys, all of which are optional.
+    Rows matching any of the tree-based keys are included, and the result is then narrowed by the
+    language and category filters.
+
+        snippet_ids (list): Individual snippets picked in the tree.
+        language_nodes (list): Language ids whose whole subtree was picked in the tree.
+        category_nodes (list): (language_id, category_id) pairs whose subtree was picked in the tree.
+        language_ids (list): Only keep snippets written in one of these languages.
+        category_ids (list): Only keep snippets filed under one of these categories.
+
+    Id lists are passed to SQLite as a single JSON parameter and expanded with json_each, so the size of
+    the selection never runs into the bound parameter limit.
+
+    Args:
+        selection (dict | None): The selection to translate. None or an empty dict selects every snippet.
+
+    Returns:
+        tuple: A (clause, params) pair. The clause is an empty string when nothing restricts the query,
+        otherwise it starts with "WHERE".
+    """
+    if not selection:
+        return "", ()
+
+    tree_conditions = []
+    conditions = []
+    params = []
+
+    if selection.get("snippet_ids"):
+        tree_conditions.append("snippets.id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(snippet_id) for snippet_id in selection["snippet_ids"]]))
+    if selection.get("language_nodes"):
+        tree_conditions.append("snippets.language_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(language_id) for language_id in selection["language_nodes"]]))
+    if selection.get("category_nodes"):
+        tree_conditions.append(
+            "EXISTS (SELECT 1 FROM json_each(?) AS node "
+            "WHERE json_extract(node.value, '$[0]') = snippets.language_id "
+            "AND json_extract(node.value, '$[1]') = snippets.category_id)")
+        params.append(json.dumps([[int(language_id), int(category_id)]
+                                  for language_id, category_id in selection["category_nodes"]]))
+    if tree_conditions:
+        conditions.append("(" + " OR ".join(tree_conditions) + ")")
+
+    if selection.get("language_ids"):
+        conditions.append("snippets.language_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(language_id) for language_id in selection["language_ids"]]))
+    if selection.get("category_ids"):
+        conditions.append("snippets.category_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(category_id) for category_id in selection["category_ids"]]))
+
+    if not conditions:
+        return "", ()
+    return "WHERE " + " AND ".join(conditions), tuple(params)
 
 
 class ApplicationModel:
@@ -44,6 +160,7 @@ class ApplicationModel:
             db_connection: The database connection resource to be used by the application model.
         """
         self.db_connection = db_connection.connection
+        self.db_file = db_connection.db_file
 
     def get_all_snippets(self):
         """
@@ -56,9 +173,7 @@ class ApplicationModel:
         query = "SELECT snippets.id, snippets.title, snippets.code, snippets.language_id, languages.name AS language, snippets.category_id, categories.name AS category FROM snippets JOIN languages ON snippets.language_id = languages.id JOIN categories ON snippets.category_id = categories.id ORDER BY snippets.title ASC"
 
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
+            rows = query_cache.fetch(self.db_connection, query, tables=SNIPPET_TABLES)
 
             for row in rows:
                 snippet = {
@@ -78,6 +193,43 @@ class ApplicationModel:
 
         return snippets
 
+    def iter_snippets(self, selection=None, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Streams snippets from the database, ordered by language, category and title.
+
+        Rows are stepped out of the SQLite cursor in batches of `batch_size`, so only one batch of snippet
+        bodies is held in memory at any time regardless of the size of the library.
+
+        Args:
+            selection (dict, optional): A selection as understood by build_selection_filter.
+            batch_size (int): The number of rows fetched from the cursor at a time.
+
+        Yields:
+            dict: One snippet at a time, with the same keys as get_all_snippets.
+        """
+        where_clause, params = build_selection_filter(selection)
+        query = f"""SELECT snippets.id, snippets.title, snippets.code, snippets.language_id, languages.name AS language, snippets.category_id, categories.name AS category FROM snippets JOIN languages ON snippets.language_id = languages.id JOIN categories ON snippets.category_id = categories.id {where_clause} ORDER BY languages.name, categories.name, snippets.title"""
+
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {
+                        "id": row[0],
+                        "title": row[1],
+                        "code": row[2],
+                        "language_id": row[3],
+                        "language": row[4],
+                        "category_id": row[5],
+                        "category": row[6]
+                    }
+        finally:
+            cursor.close()
+
     def get_snippet(self, snippet_id):
         """
         Retrieves a single snippet from the database by its ID, including language name and category name.
@@ -88,13 +240,10 @@ class ApplicationModel:
         Returns:
             A dictionary containing the snippet data or None if not found.
         """
-        params = (snippet_id,)
-        query = """SELECT snippets.id, snippets.title, snippets.code, snippets.language_id, languages.name AS language, snippets.category_id, categories.name AS category FROM snippets JOIN languages ON snippets.language_id = languages.id JOIN categories ON snippets.category_id = categories.id WHERE snippets.id = ?"""
-
+        if snippet_id is None:
+            return None
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query, params)
-            snippet = cursor.fetchone()
+            snippet = read_snippet_details(self.db_connection, [snippet_id]).get(int(snippet_id))
             if snippet is not None:
                 return {
                     "id": snippet[0],
@@ -110,6 +259,27 @@ class ApplicationModel:
             print(f"Error retrieving snippet: {e}")
             return None
 
+    def is_snippet_cached(self, snippet_id):
+        """
+        Tells whether get_snippet can answer for a snippet without querying the database.
+
+        Parameters:
+            snippet_id (int): The ID of the snippet.
+
+        Returns:
+            True if the snippet's details are cached.
+        """
+        return snippet_id in snippet_cache
+
+    def prefetch_snippets(self, snippet_ids):
+        """
+        Reads the details of snippets into the shared snippet cache ahead of their use.
+
+        Parameters:
+            snippet_ids (list): The IDs of the snippets.
+        """
+        read_snippet_details(self.db_connection, snippet_ids, count=False)
+
     def get_language_specific_categories(self, language_id):
         """Retrieve shared categories from the database."""
         language_specific_categories = []
@@ -117,9 +287,7 @@ class ApplicationModel:
         query = """SELECT c.id, c.name FROM categories c JOIN languages_categories lc ON c.id = lc.category_id WHERE lc.language_id = ?;"""
 
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+            rows = query_cache.fetch(self.db_connection, query, params, tables=CATEGORY_TABLES)
 
             for row in rows:
                 language_specific_categories.append({'id': row[0], 'name': row[1]})
@@ -135,9 +303,7 @@ class ApplicationModel:
         query = """SELECT c.id, c.name FROM categories c WHERE NOT EXISTS (SELECT 1 FROM languages_categories lc WHERE lc.category_id = c.id);"""
 
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
+            rows = query_cache.fetch(self.db_connection, query, tables=CATEGORY_TABLES)
             for row in rows:
                 general_categories.append({'id': row[0], 'name': row[1]})
         except Exception as e:
@@ -146,15 +312,139 @@ class ApplicationModel:
         print(general_categories)
         return general_categories
 
+    def get_treeview_categories(self):
+        """
+        Retrieves every language with the categories shown under it, in treeview order.
+
+        A language lists all general categories, those not tied to any language, followed by its own
+        language-specific categories.
+
+        Returns:
+            A list of (language_id, language_name, category_id, category_name, is_specific) tuples, grouped by
+            language.
+        """
+        query = """SELECT l.id, l.name, c.id, c.name, lc.category_id IS NOT NULL AS is_specific
+                   FROM languages l
+                   CROSS JOIN categories c
+                   LEFT JOIN languages_categories lc ON lc.language_id = l.id AND lc.category_id = c.id
+                   WHERE lc.category_id IS NOT NULL
+                      OR NOT EXISTS (SELECT 1 FROM languages_categories g WHERE g.category_id = c.id)
+                   ORDER BY l.id, is_specific, c.id"""
+
+        try:
+            return query_cache.fetch(self.db_connection, query, tables=("languages",) + CATEGORY_TABLES)
+        except Exception as e:
+            print(f"Error retrieving treeview categories: {e}")
+            return []
+
+    def get_treeview_snippets(self):
+        """
+        Retrieves the fields of every snippet the treeview needs, leaving out the code.
+
+        Returns:
+            A list of (id, title, language_id, category_id) tuples, grouped by language and category and sorted
+            by title and id within each group.
+        """
+        query = """SELECT id, title, language_id, category_id FROM snippets
+                   ORDER BY language_id, category_id, title, id"""
+
+        try:
+            return query_cache.fetch(self.db_connection, query, tables=("snippets",))
+        except Exception as e:
+            print(f"Failed to fetch snippets: {e}")
+            return []
+
+    def count_snippets(self, selection=None):
+        """
+        Counts the snippets in the library, or in part of it.
+
+        Args:
+            selection (dict, optional): A selection as understood by build_selection_filter.
+
+        Returns:
+            int: The number of snippets.
+        """
+        where_clause, params = build_selection_filter(selection)
+        return self.db_connection.execute(f"SELECT COUNT(*) FROM snippets {where_clause}", params).fetchone()[0]
+
+    def get_treeview_rows(self, snippet_ids):
+        """
+        Retrieves the treeview fields of a set of snippets, such as those changed by a bulk operation.
+
+        Args:
+            snippet_ids (iterable): The IDs of the snippets.
+
+        Returns:
+            A list of (id, title, language_id, category_id) tuples in treeview order.
+        """
+        query = """SELECT id, title, language_id, category_id FROM snippets
+                   WHERE id IN (SELECT value FROM json_each(?))
+                   ORDER BY language_id, category_id, title, id"""
+        return self.db_connection.execute(query, (json.dumps([int(snippet_id) for snippet_id in snippet_ids]),)).fetchall()
+
+    def iter_treeview_snippets(self, batch_size=TREE_LOAD_BATCH_SIZE):
+        """
+        Streams the rows of get_treeview_snippets in batches, without holding the whole result.
+
+        Args:
+            batch_size (int): The number of rows fetched from the cursor at a time.
+
+        Yields:
+            list: Batches of (id, title, language_id, category_id) tuples, in treeview order.
+        """
+        query = """SELECT id, title, language_id, category_id FROM snippets
+                   ORDER BY language_id, category_id, title, id"""
+
+        cursor = self.db_connection.cursor()
+        try:
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    def get_treeview_page(self, language_id, category_id, after=None, limit=TREE_PAGE_SIZE):
+        """
+        Retrieves one page of the snippets of a category, for a lazily filled treeview.
+
+        Pages are read with a keyset on (title, id) rather than an offset, so each page starts with an index
+        seek however deep into the category it is, and snippets added or deleted meanwhile do not shift the
+        pages that follow.
+
+        Args:
+            language_id (int): The ID of the language.
+            category_id (int): The ID of the category.
+            after (tuple, optional): The (title, id) of the last snippet of the previous page.
+            limit (int): The most snippets to return.
+
+        Returns:
+            A list of (id, title, language_id, category_id) tuples sorted by title and id.
+        """
+        query = """SELECT id, title, language_id, category_id FROM snippets
+                   WHERE language_id = ? AND category_id = ? AND (title, id) > (?, ?)
+                   ORDER BY title, id LIMIT ?"""
+        after_title, after_id = after if after is not None else ("", -1)
+        return self.db_connection.execute(query, (language_id, category_id, after_title, after_id, limit)).fetchall()
+
+    def get_snippet_titles(self):
+        """
+        Retrieves the ID and title of every snippet, for indexing the titles without filling the treeview.
+
+        Returns:
+            A list of (id, title) tuples.
+        """
+        return self.db_connection.execute("SELECT id, title FROM snippets").fetchall()
+
     def get_all_language_ids(self):
         """Retrieve all language IDs from the database."""
         query = "SELECT id FROM languages;"
         language_ids = []
 
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
+            rows = query_cache.fetch(self.db_connection, query, tables=("languages",))
 
             for row in rows:
                 language_ids.append(row[0])  # Assuming 'id' is the first column
@@ -170,9 +460,7 @@ class ApplicationModel:
         languages = {}
 
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
+            rows = query_cache.fetch(self.db_connection, query, tables=("languages",))
 
             for row in rows:
                 languages[row[0]] = row[1]  # Map ID to name
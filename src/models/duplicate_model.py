@@ -0,0 +1,298 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+
+import numpy as np
+
+from src.models.related_model import RelatedModel
+from src.utils.constants import DUPLICATE_BUCKET_LIMIT, DUPLICATE_SIMILARITY_THRESHOLD, SIGNATURE_BATCH_SIZE
+from src.utils.custom_logger import CustomLogger
+from src.utils.minhash import (compute_signature, band_buckets, signature_to_blob, signature_from_blob,
+                               estimate_similarity)
+from src.utils.query_cache import query_cache
+from src.utils.snippet_cache import snippet_cache
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+
+class DuplicateModel:
+    """
+    Finds near-duplicate snippets using MinHash signatures and locality-sensitive hashing.
+
+    Every snippet has a MinHash signature in the snippet_signatures table, and one row per LSH band in
+    the snippet_lsh_buckets table. Looking up the snippets similar to one snippet only reads the
+    buckets it shares with others through an index, and finding every cluster only compares snippets
+    that share at least one bucket, so neither has to compare every pair of snippets.
+
+    Signatures are kept current by SnippetModel, which calls update_signature and remove_signature as
+    part of its own writes.
+
+    Attributes:
+        db_connection: The sqlite3 connection used for all queries.
+    """
+
+    def __init__(self, db_connection):
+        """
+        Initializes the DuplicateModel with a database connection.
+
+        Args:
+            db_connection: The database connection resource to be used by the model.
+        """
+        self.db_connection = db_connection.connection
+        self.related_model = RelatedModel(db_connection)
+
+    def update_signature(self, snippet_id, code, commit=True):
+        """
+        Stores the signature and LSH buckets of a snippet, replacing any previous ones.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            code (str): The code of the snippet.
+            commit (bool): Commit straight away. Pass False when the caller commits its own transaction.
+        """
+        signature = compute_signature(code)
+        cursor = self.db_connection.cursor()
+        cursor.execute("INSERT OR REPLACE INTO snippet_signatures (snippet_id, signature) VALUES (?, ?)",
+                       (snippet_id, signature_to_blob(signature)))
+        cursor.execute("DELETE FROM snippet_lsh_buckets WHERE snippet_id = ?", (snippet_id,))
+        cursor.executemany("INSERT INTO snippet_lsh_buckets (band, bucket, snippet_id) VALUES (?, ?, ?)",
+                           ((band, bucket, snippet_id) for band, bucket in enumerate(band_buckets(signature))))
+        if commit:
+            self.db_connection.commit()
+
+    def remove_signatures(self, snippet_ids, commit=True):
+        """
+        Removes the signatures and LSH buckets of deleted snippets.
+
+        Args:
+            snippet_ids (list): The IDs of the snippets.
+            commit (bool): Commit straight away. Pass False when the caller commits its own transaction.
+        """
+        ids = json.dumps([int(snippet_id) for snippet_id in snippet_ids])
+        cursor = self.db_connection.cursor()
+        cursor.execute("DELETE FROM snippet_signatures WHERE snippet_id IN (SELECT value FROM json_each(?))", (ids,))
+        cursor.execute("DELETE FROM snippet_lsh_buckets WHERE snippet_id IN (SELECT value FROM json_each(?))", (ids,))
+        if commit:
+            self.db_connection.commit()
+
+    def copy_signatures(self, copies, commit=True):
+        """
+        Gives copied snippets the signatures and LSH buckets of their originals.
+
+        Args:
+            copies (dict): Maps the ID of each original snippet to the ID of its copy.
+            commit (bool): Commit straight away. Pass False when the caller commits its own transaction.
+        """
+        pairs = json.dumps({str(snippet_id): copy_id for snippet_id, copy_id in copies.items()})
+        cursor = self.db_connection.cursor()
+        cursor.execute("""INSERT OR REPLACE INTO snippet_signatures (snippet_id, signature) SELECT pair.value, snippet_signatures.signature FROM json_each(?) AS pair JOIN snippet_signatures ON snippet_signatures.snippet_id = CAST(pair.key AS INTEGER)""", (pairs,))
+        cursor.execute("""INSERT INTO snippet_lsh_buckets (band, bucket, snippet_id) SELECT snippet_lsh_buckets.band, snippet_lsh_buckets.bucket, pair.value FROM json_each(?) AS pair JOIN snippet_lsh_buckets ON snippet_lsh_buckets.snippet_id = CAST(pair.key AS INTEGER)""", (pairs,))
+        if commit:
+            self.db_connection.commit()
+
+    def index_missing_signatures(self, batch_size=SIGNATURE_BATCH_SIZE):
+        """
+        Computes signatures for snippets that do not have one yet, such as snippets created before
+        duplicate detection existed.
+
+        Args:
+            batch_size (int): The number of snippets signed per transaction.
+
+        Returns:
+            int: The number of snippets signed.
+        """
+        query = """SELECT snippets.id, snippets.code FROM snippets LEFT JOIN snippet_signatures ON snippet_signatures.snippet_id = snippets.id WHERE snippet_signatures.snippet_id IS NULL"""
+        count = 0
+        try:
+            rows = self.db_connection.execute(query)
+            while True:
+                batch = rows.fetchmany(batch_size)
+                if not batch:
+                    break
+                for snippet_id, code in batch:
+                    self.update_signature(snippet_id, code, commit=False)
+                self.db_connection.commit()
+                count += len(batch)
+        except Exception as e:
+            self.db_connection.rollback()
+            logger.error(f"Error computing snippet signatures: {e}")
+        if count:
+            logger.info(f"Computed signatures for {count} snippets.")
+        return count
+
+    def load_signatures(self, snippet_ids):
+        """
+        Loads the signatures of the given snippets.
+
+        Args:
+            snippet_ids (iterable): The IDs of the snippets.
+
+        Returns:
+            dict: Maps each snippet ID that has a signature to its signature.
+        """
+        query = """SELECT snippet_id, signature FROM snippet_signatures WHERE snippet_id IN (SELECT value FROM json_each(?))"""
+        rows = self.db_connection.execute(query, (json.dumps([int(snippet_id) for snippet_id in snippet_ids]),))
+        return {snippet_id: signature_from_blob(blob) for snippet_id, blob in rows}
+
+    def find_similar(self, snippet_id, threshold=DUPLICATE_SIMILARITY_THRESHOLD):
+        """
+        Finds the snippets that are near-duplicates of one snippet.
+
+        Args:
+            snippet_id (int): The ID of the snippet to compare against.
+            threshold (float): The minimum estimated similarity to report.
+
+        Returns:
+            list: (snippet_id, similarity) tuples, most similar first.
+        """
+        query = """SELECT DISTINCT other.snippet_id FROM snippet_lsh_buckets AS own JOIN snippet_lsh_buckets AS other ON other.band = own.band AND other.bucket = own.bucket WHERE own.snippet_id = ? AND other.snippet_id != own.snippet_id"""
+        try:
+            candidate_ids = [row[0] for row in self.db_connection.execute(query, (snippet_id,))]
+            signatures = self.load_signatures(candidate_ids + [snippet_id])
+        except Exception as e:
+            logger.error(f"Error finding similar snippets: {e}")
+            return []
+        if snippet_id not in signatures or not candidate_ids:
+            return []
+
+        candidate_ids = [candidate for candidate in candidate_ids if candidate in signatures]
+        similarities = estimate_similarity(signatures[snippet_id],
+                                           np.vstack([signatures[candidate] for candidate in candidate_ids]))
+        matches = [(candidate, float(similarity)) for candidate, similarity in zip(candidate_ids, similarities)
+                   if similarity >= threshold]
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def find_clusters(self, threshold=DUPLICATE_SIMILARITY_THRESHOLD, bucket_limit=DUPLICATE_BUCKET_LIMIT):
+        """
+        Groups the whole library into clusters of near-duplicate snippets.
+
+        Only snippets that share an LSH bucket are compared. Pairs above the threshold are joined with
+        a union-find, so a cluster may contain snippets that are only similar through a third one.
+
+        Snippets with the same signature are joined before any scoring, and only one of them is compared
+        with the rest of their buckets, so many copies of one snippet cost no more than a single copy. A
+        bucket holding more distinct signatures than the limit is not scored pair by pair, and its
+        snippets are only joined through the other buckets they share.
+
+        Args:
+            threshold (float): The minimum estimated similarity for two snippets to be joined.
+            bucket_limit (int): The most distinct signatures of a bucket that are compared pair by pair.
+
+        Returns:
+            list: Clusters of two or more snippet IDs, largest cluster first.
+        """
+        query = """SELECT group_concat(snippet_id) FROM snippet_lsh_buckets GROUP BY band, bucket HAVING COUNT(*) > 1"""
+        try:
+            groups = [sorted({int(snippet_id) for snippet_id in row[0].split(",")})
+                      for row in self.db_connection.execute(query)]
+            signatures = self.load_signatures({snippet_id for group in groups for snippet_id in group})
+        except Exception as e:
+            logger.error(f"Error finding duplicate clusters: {e}")
+            return []
+
+        parents = {}
+
+        def find(snippet_id):
+            parents.setdefault(snippet_id, snippet_id)
+            while parents[snippet_id] != snippet_id:
+                parents[snippet_id] = parents[parents[snippet_id]]
+                snippet_id = parents[snippet_id]
+            return snippet_id
+
+        # Identical signatures are as similar as snippets get, so each is joined to the first snippet
+        # with its signature, which stands for all of them in the buckets
+        representatives = {}
+        first_with = {}
+        for snippet_id in sorted(signatures):
+            representative = first_with.setdefault(signatures[snippet_id].tobytes(), snippet_id)
+            representatives[snippet_id] = representative
+            if representative != snippet_id:
+                parents[find(snippet_id)] = find(representative)
+
+        skipped = 0
+        for group in groups:
+            group = sorted({representatives[snippet_id] for snippet_id in group if snippet_id in signatures})
+            if len(group) > bucket_limit:
+                skipped += 1
+                continue
+            if len(group) < 2:
+                continue
+            matrix = np.vstack([signatures[snippet_id] for snippet_id in group])
+            for index, snippet_id in enumerate(group[:-1]):
+                similarities = estimate_similarity(matrix[index], matrix[index + 1:])
+                for offset in np.flatnonzero(similarities >= threshold):
+                    parents[find(group[index + 1 + offset])] = find(snippet_id)
+        if skipped:
+            logger.warning(f"Skipped {skipped} LSH buckets with more than {bucket_limit} distinct snippets.")
+
+        clusters = {}
+        for snippet_id in list(parents):
+            clusters.setdefault(find(snippet_id), []).append(snippet_id)
+        return sorted((sorted(cluster) for cluster in clusters.values() if len(cluster) > 1),
+                      key=len, reverse=True)
+
+    def get_snippet_summaries(self, snippet_ids):
+        """
+        Loads the title, language and category of snippets for display in the duplicates dialog.
+
+        Args:
+            snippet_ids (iterable): The IDs of the snippets.
+
+        Returns:
+            dict: Maps each snippet ID to a dictionary with "id", "title", "language" and "category".
+        """
+        query = """SELECT snippets.id, snippets.title, languages.name, categories.name FROM snippets JOIN languages ON snippets.language_id = languages.id JOIN categories ON snippets.category_id = categories.id WHERE snippets.id IN (SELECT value FROM json_each(?))"""
+        rows = self.db_connection.execute(query, (json.dumps([int(snippet_id) for snippet_id in snippet_ids]),))
+        return {row[0]: {"id": row[0], "title": row[1], "language": row[2], "category": row[3]} for row in rows}
+
+    def merge_snippets(self, keep_id, duplicate_ids):
+        """
+        Merges a cluster of near-duplicates by keeping one snippet and deleting the others.
+
+        Args:
+            keep_id (int): The ID of the snippet to keep.
+            duplicate_ids (list): The IDs of the snippets to delete.
+
+        Returns:
+            bool: True if the duplicates were deleted, False otherwise.
+        """
+        duplicate_ids = [int(snippet_id) for snippet_id in duplicate_ids if int(snippet_id) != int(keep_id)]
+        if not duplicate_ids:
+            return False
+        try:
+            self.db_connection.execute("DELETE FROM snippets WHERE id IN (SELECT value FROM json_each(?))",
+                                       (json.dumps(duplicate_ids),))
+            self.remove_signatures(duplicate_ids, commit=False)
+            self.related_model.remove_documents(duplicate_ids, commit=False)
+            self.db_connection.commit()
+            logger.info(f"Merged {len(duplicate_ids)} duplicates into snippet {keep_id}.")
+            return True
+        except Exception as e:
+            self.db_connection.rollback()
+            logger.error(f"Error merging duplicate snippets: {e}")
+            return False
+        finally:
+            query_cache.invalidate("snippets")
+            snippet_cache.invalidate(duplicate_ids)
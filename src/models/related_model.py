@@ -0,0 +1,220 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+
+from src.syntax_highlighting.language_detector import language_detector
+from src.utils.constants import RELATED_INDEX_BATCH_SIZE, RELATED_SNIPPETS_COUNT
+from src.utils.custom_logger import CustomLogger
+from src.utils.tfidf_index import tfidf_index, extract_terms
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+# Language keywords and builtins say which language a snippet is written in, not what it does
+STOP_WORDS = frozenset(token.lower() for token in language_detector.vocabulary)
+
+
+class RelatedModel:
+    """
+    Finds the snippets related to a snippet, across languages, through a TF-IDF index.
+
+    The term counts of every snippet are persisted in the snippet_terms table, so the in-memory index
+    is loaded with one query at startup instead of re-tokenizing the whole library. SnippetModel keeps
+    both the table and the in-memory index current through update_document and remove_documents.
+
+    Attributes:
+        db_connection: The sqlite3 connection used for all queries.
+        index (TfidfIndex): The shared in-memory index.
+    """
+
+    def __init__(self, db_connection):
+        """
+        Initializes the RelatedModel with a database connection.
+
+        Args:
+            db_connection: The database connection resource to be used by the model.
+        """
+        self.db_connection = db_connection.connection
+        self.index = tfidf_index
+
+    def load_index(self):
+        """
+        Fills the in-memory index from the snippet_terms table, indexing any snippet that has no
+        persisted terms yet first. Does nothing if the index is already loaded.
+
+        The library is read without holding the index lock, so edits on other threads are not held up
+        by the first load. The index defers them meanwhile and applies them once it is loaded.
+        """
+        if not self.index.start_loading():
+            return
+        try:
+            self.index_missing_documents()
+
+            labels = {row[0]: (row[1], row[2]) for row in self.db_connection.execute(
+                """SELECT snippets.id, snippets.title, languages.name FROM snippets JOIN languages ON snippets.language_id = languages.id""")}
+            terms = {}
+            for snippet_id, term, count in self.db_connection.execute(
+                    """SELECT snippet_id, term, count FROM snippet_terms ORDER BY snippet_id"""):
+                terms.setdefault(snippet_id, {})[term] = count
+        except Exception:
+            self.index.cancel_loading()
+            raise
+        self.index.load([(snippet_id, terms.get(snippet_id, {}), title, language)
+                         for snippet_id, (title, language) in labels.items()])
+        logger.info(f"Related snippets index loaded with {len(labels)} snippets.")
+
+    def index_missing_documents(self, batch_size=RELATED_INDEX_BATCH_SIZE):
+        """
+        Persists the terms of snippets that have none stored yet, such as snippets created before the
+        related snippets index existed.
+
+        The snippets are read in batches by increasing ID, each starting after the last ID of the one
+        before, so only one batch of code is held in memory at a time.
+
+        Args:
+            batch_size (int): The number of snippets indexed per transaction.
+
+        Returns:
+            int: The number of snippets indexed.
+        """
+        query = """SELECT snippets.id, snippets.title, snippets.code FROM snippets WHERE snippets.id > ? AND NOT EXISTS (SELECT 1 FROM snippet_terms WHERE snippet_terms.snippet_id = snippets.id) ORDER BY snippets.id LIMIT ?"""
+        count = 0
+        last_id = 0
+        try:
+            while True:
+                batch = self.db_connection.execute(query, (last_id, batch_size)).fetchall()
+                if not batch:
+                    break
+                for snippet_id, title, code in batch:
+                    self.write_terms(snippet_id, extract_terms(title, code, STOP_WORDS))
+                self.db_connection.commit()
+                count += len(batch)
+                last_id = batch[-1][0]
+        except Exception as e:
+            self.db_connection.rollback()
+            logger.error(f"Error indexing snippet terms: {e}")
+        if count:
+            logger.info(f"Indexed the terms of {count} snippets.")
+        return count
+
+    def write_terms(self, snippet_id, term_counts):
+        """Replaces the persisted terms of one snippet."""
+        cursor = self.db_connection.cursor()
+        cursor.execute("DELETE FROM snippet_terms WHERE snippet_id = ?", (snippet_id,))
+        cursor.executemany("INSERT INTO snippet_terms (snippet_id, term, count) VALUES (?, ?, ?)",
+                           ((snippet_id, term, count) for term, count in term_counts.items()))
+
+    def update_document(self, snippet_id, title, language, code, commit=True):
+        """
+        Re-indexes one snippet after it was added or edited.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            title (str): The title of the snippet.
+            language (str): The language name of the snippet.
+            code (str): The code of the snippet.
+            commit (bool): Commit straight away. Pass False when the caller commits its own transaction.
+        """
+        term_counts = extract_terms(title, code, STOP_WORDS)
+        self.write_terms(snippet_id, term_counts)
+        if commit:
+            self.db_connection.commit()
+        if self.index.active:
+            self.index.set_document(snippet_id, term_counts, title, language)
+
+    def remove_documents(self, snippet_ids, commit=True):
+        """
+        Removes deleted snippets from the index.
+
+        Args:
+            snippet_ids (list): The IDs of the snippets.
+            commit (bool): Commit straight away. Pass False when the caller commits its own transaction.
+        """
+        self.db_connection.execute("DELETE FROM snippet_terms WHERE snippet_id IN (SELECT value FROM json_each(?))",
+                                   (json.dumps([int(snippet_id) for snippet_id in snippet_ids]),))
+        if commit:
+            self.db_connection.commit()
+        if self.index.active:
+            for snippet_id in snippet_ids:
+                self.index.remove_document(int(snippet_id))
+
+    def copy_documents(self, copies, commit=True):
+        """
+        Indexes copied snippets with the terms of their originals.
+
+        Args:
+            copies (dict): Maps the ID of each original snippet to the ID of its copy.
+            commit (bool): Commit straight away. Pass False when the caller commits its own transaction.
+        """
+        pairs = json.dumps({str(snippet_id): copy_id for snippet_id, copy_id in copies.items()})
+        self.db_connection.execute("""INSERT INTO snippet_terms (snippet_id, term, count) SELECT pair.value, snippet_terms.term, snippet_terms.count FROM json_each(?) AS pair JOIN snippet_terms ON snippet_terms.snippet_id = CAST(pair.key AS INTEGER)""", (pairs,))
+        if commit:
+            self.db_connection.commit()
+        if self.index.active:
+            copy_ids = json.dumps(list(copies.values()))
+            terms = {}
+            for snippet_id, term, count in self.db_connection.execute(
+                    """SELECT snippet_id, term, count FROM snippet_terms WHERE snippet_id IN (SELECT value FROM json_each(?))""",
+                    (copy_ids,)):
+                terms.setdefault(snippet_id, {})[term] = count
+            for snippet_id, title, language in self.db_connection.execute(
+                    """SELECT snippets.id, snippets.title, languages.name FROM snippets JOIN languages ON snippets.language_id = languages.id WHERE snippets.id IN (SELECT value FROM json_each(?))""",
+                    (copy_ids,)):
+                self.index.set_document(snippet_id, terms.get(snippet_id, {}), title, language)
+
+    def relabel_documents(self, snippet_ids):
+        """
+        Refreshes the title and language shown for snippets whose language changed. Their terms are unchanged.
+
+        Args:
+            snippet_ids (list): The IDs of the snippets.
+        """
+        if not self.index.active:
+            return
+        rows = self.db_connection.execute(
+            """SELECT snippets.id, snippets.title, languages.name FROM snippets JOIN languages ON snippets.language_id = languages.id WHERE snippets.id IN (SELECT value FROM json_each(?))""",
+            (json.dumps([int(snippet_id) for snippet_id in snippet_ids]),))
+        for snippet_id, title, language in rows:
+            self.index.relabel_document(snippet_id, title, language)
+
+    def get_related(self, snippet_id, count=RELATED_SNIPPETS_COUNT):
+        """
+        Finds the snippets most similar to one snippet.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            count (int): The maximum number of related snippets to return.
+
+        Returns:
+            list: Dictionaries with "id", "title", "language" and "similarity", most similar first.
+        """
+        self.load_index()
+        related = []
+        # Held across the search and the label lookups, so an edit on another thread cannot change the
+        # index in between
+        with self.index.lock:
+            for other_id, similarity in self.index.most_similar(int(snippet_id), count):
+                title, language = self.index.labels.get(other_id, ("", ""))
+                related.append({"id": other_id, "title": title, "language": language, "similarity": similarity})
+        return related
@@ -21,6 +21,14 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import json
+
+from src.models.application_model import read_snippet_details, build_selection_filter, picks_tree_nodes
+from src.models.duplicate_model import DuplicateModel
+from src.models.related_model import RelatedModel
+from src.syntax_highlighting.language_detector import language_detector
+from src.utils.query_cache import query_cache
+from src.utils.snippet_cache import snippet_cache
 
 
 class SnippetModel:
@@ -37,6 +45,8 @@ class SnippetModel:
             db_connection: An active database connection.
         """
         self.db_connection = db_connection.connection
+        self.duplicate_model = DuplicateModel(db_connection)
+        self.related_model = RelatedModel(db_connection)
 
     def add_snippet(self, snippet_data):
         """
@@ -48,17 +58,24 @@ class SnippetModel:
         Returns:
             The ID of the newly created snippet or None if the operation failed.
         """
-        query = "INSERT INTO snippets (title, language, code, category_id) VALUES (?, ?, ?, ?)"
-        params = (snippet_data['title'], snippet_data['language'], snippet_data['code'], snippet_data.get('category_id'))
+        query = "INSERT INTO snippets (title, code, language_id, category_id) VALUES (?, ?, (SELECT id FROM languages WHERE name = ?), COALESCE(?, (SELECT id FROM categories WHERE name = 'General')))"
+        params = (snippet_data['title'], snippet_data['code'], snippet_data['language'], snippet_data.get('category_id'))
 
         try:
             cursor = self.db_connection.cursor()
             cursor.execute(query, params)
+            self.duplicate_model.update_signature(cursor.lastrowid, snippet_data['code'], commit=False)
+            self.related_model.update_document(cursor.lastrowid, snippet_data['title'], snippet_data['language'],
+                                               snippet_data['code'], commit=False)
             self.db_connection.commit()
             return cursor.lastrowid
         except Exception as e:
+            self.db_connection.rollback()
             print(f"Error adding snippet: {e}")
             return None
+        finally:
+            # Read results may hold rows this write changed, or rows read before it was rolled back
+            query_cache.invalidate("snippets")
 
     def update_snippet(self, snippet_id, snippet_data):
         """
@@ -71,17 +88,27 @@ class SnippetModel:
         Returns:
             True if the snippet was successfully updated, False otherwise.
         """
-        query = "UPDATE snippets SET title = ?, language = ?, code = ?, category_id = ? WHERE id = ?"
-        params = (snippet_data['title'], snippet_data['language'], snippet_data['code'], snippet_data.get('category_id'), snippet_id)
+        query = "UPDATE snippets SET title = ?, code = ?, language_id = (SELECT id FROM languages WHERE name = ?), category_id = COALESCE(?, category_id) WHERE id = ?"
+        params = (snippet_data['title'], snippet_data['code'], snippet_data['language'], snippet_data.get('category_id'), snippet_id)
 
         try:
             cursor = self.db_connection.cursor()
             cursor.execute(query, params)
+            updated = cursor.rowcount > 0
+            if updated:
+                # Keep the near-duplicate and related snippets indexes in step with the new content
+                self.duplicate_model.update_signature(snippet_id, snippet_data['code'], commit=False)
+                self.related_model.update_document(int(snippet_id), snippet_data['title'], snippet_data['language'],
+                                                   snippet_data['code'], commit=False)
             self.db_connection.commit()
-            return True if cursor.rowcount > 0 else False
+            return updated
         except Exception as e:
+            self.db_connection.rollback()
             print(f"Error updating snippet: {e}")
             return False
+        finally:
+            query_cache.invalidate("snippets")
+            snippet_cache.invalidate([snippet_id])
 
     def delete_snippet(self, snippet_id):
         """
@@ -99,11 +126,165 @@ class SnippetModel:
         try:
             cursor = self.db_connection.cursor()
             cursor.execute(query, params)
+            deleted = cursor.rowcount > 0
+            self.duplicate_model.remove_signatures([snippet_id], commit=False)
+            self.related_model.remove_documents([snippet_id], commit=False)
             self.db_connection.commit()
-            return True if cursor.rowcount > 0 else False
+            return deleted
         except Exception as e:
+            self.db_connection.rollback()
             print(f"Error deleting snippet: {e}")
             return False
+        finally:
+            query_cache.invalidate("snippets")
+            snippet_cache.invalidate([snippet_id])
+
+    def select_snippet_ids(self, cursor, selection):
+        """
+        Resolves a selection, including whole language and category subtrees, to the IDs of its snippets.
+
+        Parameters:
+            cursor: The cursor of the transaction the IDs are used in.
+            selection (dict): A selection as understood by build_selection_filter.
+
+        Returns:
+            A list of snippet IDs in ascending order. Empty for a selection that picks no snippet or subtree
+            in the tree, such as an empty one or one with only unknown keys, never every snippet.
+        """
+        if not picks_tree_nodes(selection):
+            return []
+        where_clause, params = build_selection_filter(selection)
+        cursor.execute(f"SELECT snippets.id FROM snippets {where_clause} ORDER BY snippets.id", params)
+        return [row[0] for row in cursor.fetchall()]
+
+    def delete_snippets(self, selection):
+        """
+        Deletes every snippet in a selection in one transaction.
+
+        Parameters:
+            selection (dict): A selection as understood by build_selection_filter.
+
+        Returns:
+            The list of deleted snippet IDs, or None if the operation failed.
+        """
+        snippet_ids = []
+        try:
+            cursor = self.db_connection.cursor()
+            snippet_ids = self.select_snippet_ids(cursor, selection)
+            cursor.execute("DELETE FROM snippets WHERE id IN (SELECT value FROM json_each(?))",
+                           (json.dumps(snippet_ids),))
+            self.duplicate_model.remove_signatures(snippet_ids, commit=False)
+            self.related_model.remove_documents(snippet_ids, commit=False)
+            self.db_connection.commit()
+            return snippet_ids
+        except Exception as e:
+            self.db_connection.rollback()
+            print(f"Error deleting snippets: {e}")
+            return None
+        finally:
+            query_cache.invalidate("snippets")
+            snippet_cache.invalidate(snippet_ids)
+
+    def move_snippets(self, selection, category_id):
+        """
+        Files every snippet in a selection under another category in one transaction.
+
+        Parameters:
+            selection (dict): A selection as understood by build_selection_filter.
+            category_id (int): The ID of the category to move the snippets to.
+
+        Returns:
+            The list of moved snippet IDs, or None if the operation failed.
+        """
+        snippet_ids = []
+        try:
+            cursor = self.db_connection.cursor()
+            snippet_ids = self.select_snippet_ids(cursor, selection)
+            cursor.execute("UPDATE snippets SET category_id = ? WHERE id IN (SELECT value FROM json_each(?))",
+                           (category_id, json.dumps(snippet_ids)))
+            self.db_connection.commit()
+            return snippet_ids
+        except Exception as e:
+            self.db_connection.rollback()
+            print(f"Error moving snippets: {e}")
+            return None
+        finally:
+            query_cache.invalidate("snippets")
+            snippet_cache.invalidate(snippet_ids)
+
+    def change_snippets_language(self, selection, language_id):
+        """
+        Changes the language of every snippet in a selection in one transaction.
+
+        Snippets filed under a category specific to another language are moved to the General category,
+        so they stay under a category their new language shows.
+
+        Parameters:
+            selection (dict): A selection as understood by build_selection_filter.
+            language_id (int): The ID of the new language.
+
+        Returns:
+            The list of changed snippet IDs, or None if the operation failed.
+        """
+        query = """UPDATE snippets SET language_id = :language_id,
+                       category_id = CASE
+                           WHEN EXISTS (SELECT 1 FROM languages_categories lc WHERE lc.language_id = :language_id AND lc.category_id = snippets.category_id)
+                             OR NOT EXISTS (SELECT 1 FROM languages_categories g WHERE g.category_id = snippets.category_id)
+                           THEN category_id
+                           ELSE (SELECT id FROM categories WHERE name = 'General')
+                       END
+                   WHERE id IN (SELECT value FROM json_each(:snippet_ids))"""
+
+        snippet_ids = []
+        try:
+            cursor = self.db_connection.cursor()
+            snippet_ids = self.select_snippet_ids(cursor, selection)
+            cursor.execute(query, {"language_id": language_id, "snippet_ids": json.dumps(snippet_ids)})
+            self.related_model.relabel_documents(snippet_ids)
+            self.db_connection.commit()
+            return snippet_ids
+        except Exception as e:
+            self.db_connection.rollback()
+            print(f"Error changing the language of snippets: {e}")
+            return None
+        finally:
+            query_cache.invalidate("snippets")
+            snippet_cache.invalidate(snippet_ids)
+
+    def duplicate_snippets(self, selection):
+        """
+        Copies every snippet in a selection in one transaction. The copies keep the language, category and
+        code of their originals, and share their duplicate signatures and related snippets terms.
+
+        Parameters:
+            selection (dict): A selection as understood by build_selection_filter.
+
+        Returns:
+            The list of the new snippet IDs, or None if the operation failed.
+        """
+        query = """INSERT INTO snippets (title, code, language_id, category_id)
+                   SELECT title || ' (Copy)', code, language_id, category_id FROM snippets
+                   WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id"""
+
+        try:
+            cursor = self.db_connection.cursor()
+            snippet_ids = self.select_snippet_ids(cursor, selection)
+            if not snippet_ids:
+                return []
+            cursor.execute(query, (json.dumps(snippet_ids),))
+            # One statement takes consecutive IDs from the sequence, in the order rows were selected
+            first_id = cursor.lastrowid - len(snippet_ids) + 1
+            copies = {snippet_id: first_id + offset for offset, snippet_id in enumerate(snippet_ids)}
+            self.duplicate_model.copy_signatures(copies, commit=False)
+            self.related_model.copy_documents(copies, commit=False)
+            self.db_connection.commit()
+            return list(copies.values())
+        except Exception as e:
+            self.db_connection.rollback()
+            print(f"Error duplicating snippets: {e}")
+            return None
+        finally:
+            query_cache.invalidate("snippets")
 
     def get_snippet(self, snippet_id):
         """
@@ -115,20 +296,17 @@ class SnippetModel:
         Returns:
             A dictionary containing the snippet data or None if not found.
         """
-        params = (snippet_id,)
-        query = """SELECT snippets.id, snippets.title, snippets.code, languages.name AS language, categories.name AS category FROM snippets JOIN languages ON snippets.language_id = languages.id JOIN categories ON snippets.category_id = categories.id WHERE snippets.id = ?"""
-
+        if snippet_id is None:
+            return None
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute(query, params)
-            snippet = cursor.fetchone()
+            snippet = read_snippet_details(self.db_connection, [snippet_id]).get(int(snippet_id))
             if snippet is not None:
                 return {
                     "id": snippet[0],
                     "title": snippet[1],
                     "code": snippet[2],
-                    "language": snippet[3],
-                    "category": snippet[4]
+                    "language": snippet[4],
+                    "category": snippet[6]
                 }
             return None
         except Exception as e:
@@ -180,3 +358,30 @@ class SnippetModel:
         except Exception as e:
             print(f"Error retrieving snippets by category: {e}")
             return []
+
+    def detect_language(self, code):
+        """
+        Detects the programming language of a piece of code.
+
+        Parameters:
+            code (str): The code to classify.
+
+        Returns:
+            A dictionary with the detected "language" name (None if nothing identifying was found)
+            and a "confidence" between 0 and 1.
+        """
+        language, confidence = language_detector.detect(code)
+        return {"language": language, "confidence": confidence}
+
+    def detect_languages(self, codes):
+        """
+        Detects the programming language of many pieces of code in one batch, e.g. for an import.
+
+        Parameters:
+            codes (list): The pieces of code to classify.
+
+        Returns:
+            A list of dictionaries shaped like the result of detect_language, in the order of `codes`.
+        """
+        return [{"language": language, "confidence": confidence}
+                for language, confidence in language_detector.detect_batch(codes)]
@@ -21,44 +21,191 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-import json
-import os
-import tkinter as tk
+import bisect
+from array import array
+from itertools import accumulate
+
+from src.syntax_highlighting.lexer import TOKEN_TAGS, get_grammar
+from src.utils.token_cache import token_cache
+
+# The kind stored for each tag in token span arrays
+TOKEN_KINDS = {tag: kind for kind, tag in enumerate(TOKEN_TAGS)}
+
+
+def line_start_table(code):
+    """
+    Lists the offset at which each line of a text starts.
+
+    Args:
+        code (str): The text.
+
+    Returns:
+        array: The start offset of each line, in order.
+    """
+    return array('q', accumulate(map((1).__add__, map(len, code.split('\n')[:-1])), initial=0))
+
+
+def tag_indexes(spans, line_starts, start, stop, first=0):
+    """
+    Maps token spans to Tk text indexes, grouped by tag, ready to be added with one tag_add per tag.
+
+    Spans are clipped to a range of the code, so a window of a snippet or a chunk being inserted can be
+    tagged on its own. The line of each offset is found by walking the line start table alongside the
+    spans, which are in order, rather than asking Tk.
+
+    Args:
+        spans (iterable): The (start, end, kind) spans, in order, the kind an index into TOKEN_TAGS.
+        line_starts (Sequence): The start offset of each line of the code.
+        start (int): The offset where the range starts.
+        stop (int): The offset where the range stops.
+        first (int): The line of the table shown on the first line of the widget.
+
+    Returns:
+        dict: The flat list of start and end indexes of each tag.
+    """
+    indexes = {tag: [] for tag in TOKEN_TAGS}
+    line = max(first, bisect.bisect_right(line_starts, start) - 1)
+    lines = len(line_starts)
+
+    def index_of(offset):
+        nonlocal line
+        while line + 1 < lines and line_starts[line + 1] <= offset:
+            line += 1
+        return f"{line - first + 1}.{offset - line_starts[line]}"
+
+    for span_start, span_end, kind in spans:
+        span_start, span_end = max(span_start, start), min(span_end, stop)
+        if span_start < span_end:
+            tag_list = indexes[TOKEN_TAGS[kind]]
+            tag_list.append(index_of(span_start))
+            tag_list.append(index_of(span_end))
+    return indexes
+
+
+def apply_tags(text_widget, indexes):
+    """
+    Adds tags to a text widget, one call per tag.
+
+    Args:
+        text_widget (tk.Text): The text widget.
+        indexes (dict): The flat list of start and end indexes of each tag, as tag_indexes() returns.
+    """
+    for tag, tag_list in indexes.items():
+        if tag_list:
+            text_widget.tag_add(tag, *tag_list)
+
+
+class TokenSpans:
+    """
+    The token spans of a piece of code, kept as three parallel arrays.
+
+    The code is tokenized lazily, only as far as the spans asked for so far, so the first screen of a
+    long snippet is highlighted without waiting for the rest of it to be scanned. Once the whole code
+    is tokenized, the spans are handed to a callback, which caches them.
+
+    Attributes:
+        starts (array): The start offset of each token.
+        ends (array): The end offset of each token.
+        kinds (array): The kind of each token, an index into TOKEN_TAGS.
+        scanned (int): The offset up to which every token is known.
+    """
+
+    def __init__(self, grammar=None, code='', on_complete=None):
+        """
+        Initializes the TokenSpans of a piece of code.
+
+        Args:
+            grammar (Grammar, optional): The grammar to tokenize the code with. Without one the spans are
+                empty until they are filled in.
+            code (str): The code.
+            on_complete (callable, optional): Called with the TokenSpans once the whole code is tokenized.
+        """
+        self.starts = array('q')
+        self.ends = array('q')
+        self.kinds = array('B')
+        self.grammar = grammar
+        self.matches = grammar.pattern.finditer(code) if grammar is not None else None
+        self.scanned = 0
+        self.on_complete = on_complete
+
+    @classmethod
+    def from_arrays(cls, starts, ends, kinds):
+        """
+        Returns complete TokenSpans made of spans tokenized before.
+
+        Args:
+            starts (array): The start offset of each token.
+            ends (array): The end offset of each token.
+            kinds (array): The kind of each token, an index into TOKEN_TAGS.
+        """
+        spans = cls()
+        spans.starts, spans.ends, spans.kinds = starts, ends, kinds
+        spans.scanned = ends[-1] if ends else 0
+        return spans
+
+    @property
+    def complete(self):
+        """bool: Whether the whole code is tokenized."""
+        return self.matches is None
+
+    def scan_to(self, offset):
+        """
+        Tokenizes the code at least up to an offset.
+
+        Args:
+            offset (int): The offset every token before which must be known.
+        """
+        if self.matches is None:
+            return
+        tag_for = self.grammar.tag_for
+        for match in self.matches:
+            tag = tag_for(match)
+            if tag is not None:
+                self.starts.append(match.start())
+                self.ends.append(match.end())
+                self.kinds.append(TOKEN_KINDS[tag])
+            self.scanned = match.end()
+            # A token ending right at the offset may be the last one, which only the next scan tells
+            if self.scanned > offset:
+                return
+        self.matches = None
+        if self.on_complete is not None:
+            self.on_complete(self)
+
+    def between(self, start, stop):
+        """
+        Yields the spans that overlap a range of the code, in order.
+
+        Args:
+            start (int): The offset where the range starts.
+            stop (int): The offset where the range stops.
+
+        Yields:
+            tuple: (start, end, kind) spans.
+        """
+        if self.scanned < stop:
+            self.scan_to(stop)
+        starts, ends, kinds = self.starts, self.ends, self.kinds
+        # Tokens never overlap, so the ends are in order too
+        position = bisect.bisect_right(ends, start)
+        while position < len(starts) and starts[position] < stop:
+            yield starts[position], ends[position], kinds[position]
+            position += 1
 
 
 class Highlighter:
     """
     A syntax highlighting service for Tkinter Text widgets.
 
-    This class provides syntax highlighting functionality by applying text tags
-    to patterns within a Tkinter Text widget. It is designed to be flexible and
-    easily extendable to support various programming languages by loading syntax
-    highlighting rules from JSON files.
-
-    The highlighting rules are expected to define patterns for different syntax
-    elements such as keywords, comments, strings, etc. This class uses regular
-    expressions to match these patterns within the text content of a Text widget
-    and applies the corresponding Tkinter text tags to highlight them.
+    The syntax rules of a language are compiled into a single regular expression, which scans the code
+    once. The offsets of the tokens found are mapped to Tk indexes through a table of line starts, and
+    each kind of token is tagged with a single tag_add call, instead of searching the widget once per
+    keyword.
 
     Attributes:
-        rules (dict): A dictionary containing the syntax highlighting rules loaded
-                      from a JSON file. This includes patterns for keywords, comments,
-                      and other syntax elements specific to the programming language.
-
-    Methods:
-        __init__(language): Initializes the Highlighter with syntax rules for the specified
-                            programming language.
-        load_rules(language): Loads the syntax rules from a JSON file corresponding to
-                              the specified programming language.
-        apply(text_widget): Applies syntax highlighting to the given Text widget based on
-                            the loaded rules.
-        highlight_pattern(text_widget, pattern, tag, nocase, regexp): Searches for the given
-                                                                       pattern in the Text widget
-                                                                       and applies the specified tag
-                                                                       to highlight matches. Supports
-                                                                       case-sensitive and insensitive
-                                                                       searches, and can handle regular
-                                                                       expression patterns.
+        grammar (Grammar): The compiled syntax rules of the language.
+        rules (dict): The syntax highlighting rules loaded from the language's JSON file.
+
     Example:
         >>> from tkinter import Tk, Text
         >>> root = Tk()
@@ -69,10 +216,8 @@ class Highlighter:
         >>> root.mainloop()
 
     Note:
-        - The JSON file containing syntax rules should be placed in a 'syntax' directory
-          relative to this script.
         - Each syntax rule file should be named after the programming language it represents
-          (e.g., 'python.json' for Python syntax rules).
+          (e.g., 'python.json' for Python syntax rules) and placed in the 'syntax' directory.
     """
     def __init__(self, language):
         """
@@ -81,23 +226,27 @@ class Highlighter:
         Args:
             language (str): The programming language to load syntax rules for.
         """
-        self.rules = self.load_rules(language)
+        self.language = language
+        self.grammar = get_grammar(language)
+        self.rules = self.grammar.rules
 
-    def load_rules(self, language):
+    def tokenize(self, code):
         """
-        Load syntax highlighting rules from a JSON file for the specified language.
+        Returns the token spans of a piece of code. Code highlighted before is served from the token
+        cache, other code is tokenized as its spans are asked for and cached once fully tokenized.
 
         Args:
-            language (str): The programming language whose rules are to be loaded.
+            code (str): The code to tokenize.
 
         Returns:
-            dict: The syntax rules for the specified language.
+            TokenSpans: The spans of the code.
         """
-        # Define the directory path where syntax rule JSON files are stored
-        syntax_dir = os.path.join(os.path.dirname(__file__), 'syntax')
-        file_path = os.path.join(syntax_dir, f"{language}.json")
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        key = token_cache.key(self.language, self.grammar.version, code)
+        cached = token_cache.get(key)
+        if cached is not None:
+            return TokenSpans.from_arrays(*cached)
+        return TokenSpans(self.grammar, code,
+                          on_complete=lambda spans: token_cache.put(key, spans.starts, spans.ends, spans.kinds))
 
     def apply(self, text_widget):
         """
@@ -106,52 +255,8 @@ class Highlighter:
         Args:
             text_widget (tk.Text): The text widget to which syntax highlighting is applied.
         """
-        # First, remove any existing tags to reset the highlighting
-        for tag in text_widget.tag_names():
+        code = text_widget.get("1.0", "end-1c")
+        for tag in TOKEN_TAGS:
             text_widget.tag_remove(tag, "1.0", "end")
-
-        # Apply highlighting for each type of syntax rule (e.g., keywords, comments)
-        for rule_type, rules in self.rules.items():
-            if rule_type == "keywords":
-                for keyword in rules:
-                    self.highlight_pattern(text_widget, r'\m{}\M'.format(keyword), "keyword", nocase=0)
-            elif rule_type == "comments":
-                self.highlight_pattern(text_widget, r'{}.*$'.format(rules["single_line"]), "comment", nocase=0)
-
-    def highlight_pattern(self, text_widget, pattern, tag, nocase=1, regexp=False):
-        """
-        Highlight all instances of a specified pattern within a text widget.
-
-        This method uses the text widget's search functionality to find and highlight
-        all occurrences of a given pattern. It allows for both case-sensitive and
-        case-insensitive searches, and can handle regular expression patterns.
-
-        Args: text_widget (tk.Text): The text widget where the pattern is to be highlighted. pattern (str): The regexp
-        pattern to search for within the text widget. tag (str): The name of the tag used to highlight the matched
-        patterns. nocase (int): If set to 1, the search is case-insensitive; if 0, the search is case-sensitive.
-        regexp (bool): If True, the pattern is treated as a regular expression. If False, the pattern is treated as
-        plain text.
-        """
-        # Set the start index for the search to the beginning of the text widget
-        start = text_widget.index("1.0")
-        # Set the end index for the search to the end of the text widget
-        end = text_widget.index("end")
-        # Initialize the search start and end markers in the text widget
-        text_widget.mark_set("matchStart", start)
-        text_widget.mark_set("matchEnd", start)
-        text_widget.mark_set("searchLimit", end)
-
-        # Variable to hold the length of the matched string
-        count = tk.IntVar()
-        while True:
-            # Perform the search from the last match end to the search limit
-            index = text_widget.search(pattern, "matchEnd", "searchLimit", count=count, nocase=nocase, regexp=regexp)
-            if index == "":
-                break  # Exit the loop if no more matches are found
-            if count.get() == 0:
-                break  # Exit the loop if the match length is 0 to prevent infinite loops
-            # Update the match start and end markers based on the current match
-            text_widget.mark_set("matchStart", index)
-            text_widget.mark_set("matchEnd", "%s+%sc" % (index, count.get()))
-            # Apply the specified tag to the current match
-            text_widget.tag_add(tag, "matchStart", "matchEnd")
+        spans = self.tokenize(code)
+        apply_tags(text_widget, tag_indexes(spans.between(0, len(code)), line_start_table(code), 0, len(code)))
@@ -0,0 +1,173 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+import os
+import re
+
+import numpy as np
+
+from src.utils.constants import SYNTAX_DIR, SYNTAX_LANGUAGE_NAMES
+from src.utils.custom_logger import CustomLogger
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+
+def extract_vocabulary(rules):
+    """
+    Collects the tokens that identify a language from its syntax rules.
+
+    Keywords, builtins, comment markers, decorator markers and preprocessor directives are used.
+    String delimiters and other punctuation are left out, since nearly every language shares them.
+
+    Args:
+        rules (dict): The syntax rules loaded from a syntax JSON file.
+
+    Returns:
+        set: The identifying tokens of the language.
+    """
+    vocabulary = set(rules.get("keywords", []))
+    vocabulary.update(rules.get("builtins", []))
+    vocabulary.update(rules.get("preprocessor_directives", []))
+    vocabulary.update(marker for marker in rules.get("comments", {}).values() if marker)
+    if rules.get("decorators", {}).get("start"):
+        vocabulary.add(rules["decorators"]["start"])
+    return vocabulary
+
+
+class LanguageDetector:
+    """
+    Guesses the programming language of a piece of code from the syntax rules used for highlighting.
+
+    Every token in the combined vocabulary of all syntax files gets a weight per language, which is
+    its inverse document frequency across languages when the language uses the token and zero
+    otherwise. Tokens shared by every language therefore carry little evidence, while tokens unique
+    to one language carry the most. A piece of code is scored by summing the weights of the tokens
+    it contains, which for a batch of code is a single weighted bincount per language in NumPy.
+
+    The confidence of a guess is the share of the total evidence that supports the winning language.
+
+    Attributes:
+        languages (list): The language names, in the column order of the weight matrix.
+        vocabulary (dict): Maps each token to its row in the weight matrix.
+        weights (numpy.ndarray): A (tokens x languages) matrix of token weights.
+        token_pattern (re.Pattern): Matches any vocabulary token in a piece of code.
+    """
+
+    def __init__(self, syntax_dir=SYNTAX_DIR):
+        """
+        Builds the detector from every syntax rule file in a directory.
+
+        Args:
+            syntax_dir (str): The directory holding the syntax JSON files.
+        """
+        vocabularies = {}
+        for filename in sorted(os.listdir(syntax_dir)):
+            if not filename.endswith(".json"):
+                continue
+            syntax_name = os.path.splitext(filename)[0]
+            with open(os.path.join(syntax_dir, filename), "r") as file:
+                rules = json.load(file)
+            vocabularies[SYNTAX_LANGUAGE_NAMES.get(syntax_name, syntax_name)] = extract_vocabulary(rules)
+
+        self.languages = list(vocabularies)
+        tokens = sorted(set().union(*vocabularies.values()))
+        self.vocabulary = {token: row for row, token in enumerate(tokens)}
+
+        membership = np.zeros((len(tokens), len(self.languages)), dtype=np.float64)
+        for column, language in enumerate(self.languages):
+            membership[[self.vocabulary[token] for token in vocabularies[language]], column] = 1.0
+        document_frequency = membership.sum(axis=1, keepdims=True)
+        self.weights = membership * np.log1p(len(self.languages) / document_frequency)
+
+        # Word tokens need word boundaries, symbol tokens such as comment markers do not. Longer tokens
+        # come first so that "#define" wins over "#" and "/*" over "/".
+        words = [re.escape(token) for token in tokens if re.fullmatch(r"\w+", token)]
+        symbols = [re.escape(token) for token in sorted(tokens, key=len, reverse=True)
+                   if not re.fullmatch(r"\w+", token)]
+        self.token_pattern = re.compile("|".join(symbols + [rf"\b(?:{'|'.join(words)})\b"]))
+        logger.info(f"Language detector built for {len(self.languages)} languages, {len(tokens)} tokens")
+
+    def score(self, codes):
+        """
+        Scores a batch of code against every known language.
+
+        Args:
+            codes (list): The pieces of code to score.
+
+        Returns:
+            numpy.ndarray: A (codes x languages) matrix of scores.
+        """
+        token_ids = []
+        document_ids = []
+        for index, code in enumerate(codes):
+            ids = [self.vocabulary[token] for token in self.token_pattern.findall(code or "")]
+            token_ids.extend(ids)
+            document_ids.extend([index] * len(ids))
+
+        token_ids = np.asarray(token_ids, dtype=np.intp)
+        document_ids = np.asarray(document_ids, dtype=np.intp)
+        token_weights = self.weights[token_ids]
+
+        scores = np.empty((len(codes), len(self.languages)), dtype=np.float64)
+        for column in range(len(self.languages)):
+            scores[:, column] = np.bincount(document_ids, weights=token_weights[:, column], minlength=len(codes))
+        return scores
+
+    def detect_batch(self, codes):
+        """
+        Detects the language of each piece of code in a batch.
+
+        Args:
+            codes (list): The pieces of code to classify.
+
+        Returns:
+            list: A (language, confidence) tuple per piece of code. The language is None and the
+            confidence 0.0 when the code contains no identifying tokens at all.
+        """
+        if not codes:
+            return []
+        scores = self.score(codes)
+        totals = scores.sum(axis=1)
+        best = scores.argmax(axis=1)
+        confidence = np.divide(scores[np.arange(len(codes)), best], totals,
+                               out=np.zeros(len(codes)), where=totals > 0)
+        return [(self.languages[column] if total > 0 else None, float(value))
+                for column, total, value in zip(best, totals, confidence)]
+
+    def detect(self, code):
+        """
+        Detects the language of a single piece of code.
+
+        Args:
+            code (str): The code to classify.
+
+        Returns:
+            tuple: The detected language name (or None) and the confidence between 0 and 1.
+        """
+        return self.detect_batch([code])[0]
+
+
+# Creating a singleton instance of LanguageDetector to be used across the application.
+language_detector = LanguageDetector()
@@ -0,0 +1,196 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import functools
+import hashlib
+import json
+import os
+import re
+
+from src.utils.constants import SYNTAX_DIR, SYNTAX_LANGUAGE_NAMES
+
+# The tags given to highlighted tokens
+TOKEN_TAGS = ("keyword", "builtin", "string", "comment", "decorator", "preprocessor")
+
+# Bumped whenever the way rules are compiled into tokens changes, so spans cached by an older lexer are not reused
+LEXER_VERSION = 1
+
+# String delimiters that may span several lines. Verbatim strings escape quotes by doubling them.
+MULTI_LINE_STRINGS = ("triple_quotes", "triple_double_quotes", "template_literal", "verbatim")
+
+
+def syntax_name_for(language):
+    """
+    Returns the syntax rule file of a language, or None if there is none.
+
+    Args:
+        language (str): The language name used in the database, such as "C#", or a syntax rule file name.
+    """
+    for syntax_name, language_name in SYNTAX_LANGUAGE_NAMES.items():
+        if language in (syntax_name, language_name):
+            return syntax_name
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_grammar(syntax_name):
+    """
+    Returns the compiled grammar of a syntax rule file, compiling it on first use.
+
+    Args:
+        syntax_name (str): The name of the rule file, without the .json extension.
+    """
+    with open(os.path.join(SYNTAX_DIR, f"{syntax_name}.json"), 'r') as file:
+        return Grammar(json.load(file))
+
+
+class Grammar:
+    """
+    The syntax rules of a language compiled into one regular expression.
+
+    Every construct of the rules is an alternative of a single pattern, so a scan finds the next token of
+    any kind in one pass. Identifiers are matched as a whole and then looked up in the keyword and
+    builtin sets, which is much faster than one alternative per keyword.
+
+    Comments and strings that may span lines end either at their closing delimiter or at the end of the
+    text scanned. A scan of a single line tells which one it was, so a line lexer can carry the open
+    construct over to the next line as its state.
+
+    Attributes:
+        rules (dict): The syntax rules the grammar was compiled from.
+        version (str): Identifies the rules and the lexer that compiled them, for caches of their tokens.
+        pattern (re.Pattern): The alternation of every construct.
+        constructs (dict): (tag, multi-line) pairs of the constructs, by group name.
+        resumes (dict): For each multi-line construct, the pattern finishing it from the start of a line.
+        keywords (frozenset): The keywords.
+        builtins (frozenset): The builtin names.
+    """
+
+    def __init__(self, rules):
+        """
+        Compiles syntax rules.
+
+        Args:
+            rules (dict): The syntax rules loaded from a syntax JSON file.
+        """
+        self.rules = rules
+        rules_json = json.dumps(rules, sort_keys=True)
+        self.version = hashlib.sha1(f"{LEXER_VERSION}:{rules_json}".encode('utf-8')).hexdigest()[:12]
+        self.keywords = frozenset(rules.get("keywords", []))
+        self.builtins = frozenset(rules.get("builtins", []))
+        self.constructs = {}
+        self.resumes = {}
+        alternatives = []
+
+        def add(tag, regex, multi_line=False):
+            name = f"t{len(self.constructs)}"
+            self.constructs[name] = (tag, multi_line)
+            alternatives.append(f"(?P<{name}>{regex})")
+            return name
+
+        def add_multi_line(tag, opening, closing, escapes=False, doubled=False):
+            # The body stops at the closing delimiter, or runs to the end of the scanned text
+            body = r"(?:\\.?|[^\\])*?" if escapes else r".*?"
+            closing = re.escape(closing)
+            if doubled:
+                # A doubled closing delimiter stands for itself
+                body = f"(?:{closing}{closing}|.)*?"
+                closing = f"{closing}(?!{closing})"
+            close = f"(?:(?P<{{name}}_close>{closing})|\\Z)"
+            name = f"t{len(self.constructs)}"
+            add(tag, re.escape(opening) + body + close.format(name=name), multi_line=True)
+            self.resumes[name] = re.compile(body + close.format(name=name), re.S)
+
+        comments = rules.get("comments", {})
+        block_start = comments.get("multi_line_start")
+        if block_start and comments.get("multi_line_end"):
+            add_multi_line("comment", block_start, comments["multi_line_end"])
+        if comments.get("single_line"):
+            add("comment", re.escape(comments["single_line"]) + r"[^\n]*")
+
+        strings = rules.get("strings", {})
+        # Longer delimiters first, so '"""' is not read as an empty '""' string
+        for kind, delimiter in sorted(strings.items(), key=lambda item: -len(item[1])):
+            if not delimiter or delimiter == block_start:
+                continue
+            if kind in MULTI_LINE_STRINGS:
+                verbatim = kind == "verbatim"
+                add_multi_line("string", delimiter, delimiter.lstrip("@"), escapes=not verbatim, doubled=verbatim)
+            else:
+                quote = re.escape(delimiter)
+                add("string", f"{quote}(?:\\\\[^\\n]|[^{quote}\\\\\\n])*{quote}?")
+
+        directives = rules.get("preprocessor_directives", [])
+        if directives:
+            add("preprocessor", r"^[ \t]*(?:" + "|".join(re.escape(directive) for directive in directives) +
+                r")\b[^\n]*")
+        decorator_start = rules.get("decorators", {}).get("start")
+        if decorator_start:
+            add("decorator", r"^[ \t]*" + re.escape(decorator_start) + r"[A-Za-z_][\w.]*")
+
+        self.identifier_group = add(None, r"[A-Za-z_$][\w$]*")
+        self.pattern = re.compile("|".join(alternatives), re.S | re.M)
+
+    def tag_for(self, match):
+        """Returns the tag of a token matched by the pattern, or None for a plain identifier."""
+        name = match.lastgroup
+        if name == self.identifier_group:
+            word = match.group()
+            if word in self.keywords:
+                return "keyword"
+            if word in self.builtins:
+                return "builtin"
+            return None
+        return self.constructs[name][0]
+
+    def lex_line(self, line, state=None):
+        """
+        Splits one line into highlighted spans.
+
+        Args:
+            line (str): The line, without its line break.
+            state (str | None): The multi-line construct left open by the previous line, or None.
+
+        Returns:
+            tuple: The (start, end, tag) spans of the line, with columns as offsets, and the construct
+                left open at its end, or None.
+        """
+        spans = []
+        position = 0
+        if state is not None:
+            match = self.resumes[state].match(line)
+            if match.end():
+                spans.append((0, match.end(), self.constructs[state][0]))
+            if match.group(f"{state}_close") is None:
+                return spans, state
+            position = match.end()
+
+        for match in self.pattern.finditer(line, position):
+            tag = self.tag_for(match)
+            if tag is None:
+                continue
+            spans.append((match.start(), match.end(), tag))
+            name = match.lastgroup
+            if self.constructs[name][1] and match.group(f"{name}_close") is None:
+                return spans, name
+        return spans, None
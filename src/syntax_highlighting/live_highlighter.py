@@ -0,0 +1,331 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import bisect
+import time
+import tkinter as tk
+
+from src.syntax_highlighting.lexer import TOKEN_TAGS, get_grammar, syntax_name_for
+from src.utils.constants import LIVE_HIGHLIGHT_BATCH_LINES, LIVE_HIGHLIGHT_BUDGET_MS, SYNTAX_TAG_COLORS
+
+# The exit state of a line that has not been lexed since it was inserted
+UNKNOWN = object()
+
+
+class DirtyLines:
+    """
+    The lines waiting to be re-highlighted, kept as sorted, disjoint [start, end) ranges of line numbers.
+
+    Attributes:
+        ranges (list): The ranges, in order.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty DirtyLines.
+        """
+        self.ranges = []
+
+    def __bool__(self):
+        return bool(self.ranges)
+
+    def clear(self):
+        """Forgets every dirty line."""
+        self.ranges = []
+
+    def add(self, start, end):
+        """
+        Marks lines as dirty, merging them with the ranges they overlap or touch.
+
+        Args:
+            start (int): The first line.
+            end (int): The line after the last one.
+        """
+        ranges = self.ranges
+        position = bisect.bisect_left(ranges, (start,))
+        # The range before may reach the new one
+        if position > 0 and ranges[position - 1][1] >= start:
+            position -= 1
+        last = position
+        while last < len(ranges) and ranges[last][0] <= end:
+            start = min(start, ranges[last][0])
+            end = max(end, ranges[last][1])
+            last += 1
+        ranges[position:last] = [(start, end)]
+
+    def remap(self, new_line):
+        """
+        Renumbers the dirty lines after lines were inserted or deleted.
+
+        Args:
+            new_line (callable): Maps an old line number to the new one. It must never decrease as the old
+                line number grows.
+        """
+        ranges, self.ranges = self.ranges, []
+        for start, end in ranges:
+            self.add(new_line(start), new_line(end - 1) + 1)
+
+    def take(self, limit):
+        """
+        Removes up to a number of lines from the start of the first range.
+
+        Args:
+            limit (int): The most lines to take.
+
+        Returns:
+            tuple: The first line taken and the line after the last one.
+        """
+        start, end = self.ranges[0]
+        stop = min(end, start + limit)
+        if stop == end:
+            del self.ranges[0]
+        else:
+            self.ranges[0] = (stop, end)
+        return start, stop
+
+
+class LiveHighlighter:
+    """
+    Highlights the code of a tk.Text as it is edited, re-lexing only the lines that changed.
+
+    The Tcl command of the widget is wrapped, as idlelib's WidgetRedirector does, so every insert, delete
+    and replace is seen with the exact lines it touches, whether it comes from typing, pasting or code.
+    The edited lines are marked dirty and re-highlighted from after_idle() in slices that each stay
+    within a time budget, so typing is never held up by highlighting.
+
+    The state a line leaves the lexer in, inside a block comment or a multi-line string or not, is kept
+    for every line. After re-lexing a line, the next one is only re-lexed too when that state changed,
+    so opening a block comment re-highlights the lines after it, and an ordinary edit a single line.
+
+    Attributes:
+        text (tk.Text): The widget highlighted.
+        grammar (Grammar | None): The grammar of the language of the code, or None to leave it plain.
+        states (list): The lexer state at the end of each line, counted from 0 for line 1.
+        dirty (DirtyLines): The lines waiting to be re-highlighted.
+    """
+
+    def __init__(self, text):
+        """
+        Initializes the LiveHighlighter and starts watching the edits of the widget.
+
+        Args:
+            text (tk.Text): The widget to highlight.
+        """
+        self.text = text
+        self.grammar = None
+        self.states = []
+        self.dirty = DirtyLines()
+        self.job = None
+        self.budget = LIVE_HIGHLIGHT_BUDGET_MS / 1000
+        for tag, color in SYNTAX_TAG_COLORS.items():
+            text.tag_configure(tag, foreground=color)
+
+        self.original = f"{text._w}_original"
+        text.tk.call("rename", text._w, self.original)
+        text.tk.createcommand(text._w, self.dispatch)
+        text.bind("<Destroy>", self.on_destroy, add="+")
+
+    def call(self, *args):
+        """Runs a command of the widget without going through the highlighter."""
+        return self.text.tk.call((self.original,) + args)
+
+    def line_count(self):
+        """Returns the number of lines of the widget."""
+        return int(self.call("index", "end-1c").split(".")[0])
+
+    def line_of(self, index):
+        """Returns the line of an index, clamped to the last line as Tk clamps edits."""
+        return min(int(self.call("index", index).split(".")[0]), self.line_count())
+
+    def set_language(self, language):
+        """
+        Highlights the code as a language, or leaves it plain when the language has no syntax rules.
+
+        Args:
+            language (str): The language name, such as "Python".
+        """
+        syntax_name = syntax_name_for(language) if language else None
+        grammar = get_grammar(syntax_name) if syntax_name else None
+        if grammar is self.grammar:
+            return
+        self.grammar = grammar
+        for tag in TOKEN_TAGS:
+            self.call("tag", "remove", tag, "1.0", "end")
+        self.resync()
+
+    def resync(self):
+        """
+        Forgets every lexer state and re-highlights the whole text.
+        """
+        line_count = self.line_count()
+        self.states = [UNKNOWN] * line_count
+        self.dirty.clear()
+        self.dirty.add(1, line_count + 1)
+        self.schedule()
+
+    def schedule(self):
+        """Schedules the next slice of re-highlighting, unless one is pending or there is nothing to do."""
+        if self.grammar is None:
+            self.dirty.clear()
+        elif self.dirty and self.job is None:
+            self.job = self.text.after_idle(self.highlight_dirty)
+
+    def dispatch(self, operation, *args):
+        """
+        Runs a command of the widget, keeping the lexer states and dirty lines in step with the edits.
+
+        Args:
+            operation (str): The widget command, such as "insert".
+            *args: Its arguments.
+
+        Returns:
+            The result of the command.
+        """
+        try:
+            if operation == "insert":
+                first = last = self.line_of(args[0])
+            elif operation in ("delete", "replace"):
+                first = self.line_of(args[0])
+                # Deleting a single character joins two lines when it is a line break
+                last = self.line_of(args[1] if len(args) > 1 else f"{args[0]}+1c")
+                # Tk deletes nothing when the range is reversed
+                last = max(first, last)
+            result = self.call(operation, *args)
+        except tk.TclError:
+            return ""
+
+        if operation in ("delete", "replace"):
+            self.lines_deleted(first, last)
+        if operation in ("insert", "replace"):
+            # The inserted strings alternate with their tag lists
+            chars = "".join(args[1::2] if operation == "insert" else args[2::2])
+            self.lines_inserted(first, chars.count("\n"))
+        elif operation == "edit" and args and args[0] in ("undo", "redo"):
+            self.resync()
+        return result
+
+    def lines_deleted(self, first, last):
+        """
+        Records that the lines from first to last were joined into one by a deletion.
+
+        Args:
+            first (int): The line the deletion started on.
+            last (int): The line the deletion ended on.
+        """
+        # The joined line ends as the last line did, so it keeps that line's state
+        del self.states[first - 1:last - 1]
+        removed = last - first
+        self.dirty.remap(lambda line: line if line <= first else max(first, line - removed))
+        self.dirty.add(first, first + 1)
+        self.schedule()
+
+    def lines_inserted(self, first, added):
+        """
+        Records that a line was split into several by an insertion.
+
+        Args:
+            first (int): The line the insertion was made on.
+            added (int): The number of line breaks inserted.
+        """
+        # The tail of the split line is now the last of them, so it keeps that line's state
+        self.states[first - 1:first - 1] = [UNKNOWN] * added
+        self.dirty.remap(lambda line: line if line <= first else line + added)
+        self.dirty.add(first, first + added + 1)
+        self.schedule()
+
+    def highlight_dirty(self):
+        """Re-highlights dirty lines until the time budget runs out, and schedules the rest."""
+        self.job = None
+        line_count = self.line_count()
+        if len(self.states) != line_count:
+            # An edit was missed, so the states can no longer be trusted
+            self.resync()
+            return
+        started = time.perf_counter()
+        while self.dirty and time.perf_counter() - started < self.budget:
+            first, stop = self.dirty.take(LIVE_HIGHLIGHT_BATCH_LINES)
+            if first > line_count:
+                self.dirty.clear()
+                break
+            last = min(stop, line_count + 1) - 1
+            if self.highlight_lines(first, last) and last < line_count:
+                # The change carries on into the lines below, which are taken a whole batch at a time
+                self.dirty.add(last + 1, min(last + 1 + LIVE_HIGHLIGHT_BATCH_LINES, line_count + 1))
+        self.schedule()
+
+    def highlight_lines(self, first, last):
+        """
+        Re-lexes a run of lines and replaces their tags, with one call per tag.
+
+        Args:
+            first (int): The first line.
+            last (int): The last line.
+
+        Returns:
+            bool: Whether the last line ends in another lexer state than it did, so the line after it
+                must be re-lexed too.
+        """
+        lines = self.call("get", f"{first}.0", f"{last}.end").split("\n")
+        state = self.states[first - 2] if first > 1 else None
+        if state is UNKNOWN:
+            state = None
+        changed = False
+        states = self.states
+        indexes = {tag: [] for tag in TOKEN_TAGS}
+        lex_line = self.grammar.lex_line
+        for line, code in enumerate(lines, first):
+            spans, state = lex_line(code, state)
+            for start, end, tag in spans:
+                indexes[tag].extend((f"{line}.{start}", f"{line}.{end}"))
+            changed = states[line - 1] != state
+            states[line - 1] = state
+
+        for tag, tag_indexes in indexes.items():
+            self.call("tag", "remove", tag, f"{first}.0", f"{last}.end")
+            if tag_indexes:
+                self.call("tag", "add", tag, *tag_indexes)
+        return changed
+
+    def on_destroy(self, event=None):
+        """Stops re-highlighting once the widget is gone."""
+        if event is not None and event.widget is not self.text:
+            return
+        self.close()
+
+    def close(self):
+        """
+        Stops highlighting and gives the widget its own Tcl command back, as idlelib's
+        WidgetRedirector.close does, so neither the wrapper nor the renamed command outlives it.
+        """
+        if self.original is None:
+            return
+        if self.job is not None:
+            self.text.after_cancel(self.job)
+            self.job = None
+        text = self.text
+        text.tk.deletecommand(text._w)
+        try:
+            text.tk.call("rename", self.original, text._w)
+        except tk.TclError:
+            pass  # Tk already deleted the command along with the widget
+        self.original = None
@@ -0,0 +1,136 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import bisect
+import re
+
+# Splits paths and values into the words matched by prefix queries
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def flatten_configuration(config_data, path=()):
+    """
+    Lists every setting of a configuration with the path leading to it.
+
+    Settings with metadata, dictionaries holding a "type", are settings themselves and are yielded
+    whole. Lists are indexed by position.
+
+    Args:
+        config_data (dict | list | any): The configuration data.
+        path (tuple): The path to the data.
+
+    Yields:
+        tuple: (path, value) pairs, the path a tuple of keys and list indexes as strings.
+    """
+    if isinstance(config_data, dict) and 'type' not in config_data:
+        for key, value in config_data.items():
+            yield from flatten_configuration(value, path + (str(key),))
+    elif isinstance(config_data, list):
+        for index, item in enumerate(config_data):
+            yield from flatten_configuration(item, path + (str(index),))
+    else:
+        yield path, config_data
+
+
+class ConfigSearchIndex:
+    """
+    Searches the paths and values of every setting of a set of configurations.
+
+    Each setting is indexed by the text "path/to/key = value", lower-cased, and by the words of that
+    text. A query matches the settings whose text contains it. Settings with a word starting with the
+    query are found by bisecting the sorted words and come first, the other substring matches after
+    them.
+
+    A query that extends the previous one, as typing does, can only match settings the previous one
+    matched, so it is only checked against those.
+
+    Attributes:
+        entries (list): (configuration name, path, value) triples of the settings.
+        texts (list): The searched text of each setting.
+        words (list): (word, entry index) pairs, sorted.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty ConfigSearchIndex.
+        """
+        self.entries = []
+        self.texts = []
+        self.words = []
+        self.last_query = None
+        self.last_matches = None
+
+    def build(self, configurations):
+        """
+        Indexes the settings of configurations, replacing what was indexed before.
+
+        Args:
+            configurations (list): (name, configuration data) pairs.
+        """
+        self.entries = []
+        self.texts = []
+        words = []
+        for name, config_data in configurations:
+            for path, value in flatten_configuration(config_data):
+                shown_value = value.get('value') if isinstance(value, dict) else value
+                text = f"{'/'.join(path)} = {shown_value}".lower()
+                words.extend((word, len(self.entries)) for word in set(WORD_PATTERN.findall(text)))
+                self.entries.append((name, path, value))
+                self.texts.append(text)
+        words.sort()
+        self.words = words
+        self.last_query = None
+        self.last_matches = None
+
+    def search(self, query):
+        """
+        Finds the settings matching a query.
+
+        Args:
+            query (str): The text to look for in the paths and values of the settings.
+
+        Returns:
+            list: The indexes of the matching entries, those with a word starting with the query first,
+                each group in configuration order.
+        """
+        query = query.strip().lower()
+        if not query:
+            self.last_query = self.last_matches = None
+            return []
+
+        if self.last_query is not None and query.startswith(self.last_query):
+            candidates = self.last_matches
+        else:
+            candidates = range(len(self.entries))
+        texts = self.texts
+        matches = [index for index in candidates if query in texts[index]]
+        self.last_query, self.last_matches = query, matches
+
+        prefixed = set()
+        words = self.words
+        position = bisect.bisect_left(words, (query,))
+        while position < len(words) and words[position][0].startswith(query):
+            prefixed.add(words[position][1])
+            position += 1
+        return ([index for index in matches if index in prefixed] +
+                [index for index in matches if index not in prefixed])
@@ -82,6 +82,104 @@ THEMES_DIR = os.path.join(CONFIG_DIR, 'themes')
 ASSETS_DIR = os.path.join(BASE_DIR, 'assets')
 # Images directory
 IMAGES_DIR = os.path.join(ASSETS_DIR, 'images')
+# Syntax rule files used for highlighting and language detection
+SYNTAX_DIR = os.path.join(BASE_DIR, 'syntax_highlighting', 'syntax')
+
+# Syntax Highlighting
+# Maps each syntax rule file (without the .json extension) to the language name used in the database
+SYNTAX_LANGUAGE_NAMES = {
+    "python": "Python",
+    "javascript": "JavaScript",
+    "csharp": "C#"
+}
+# Language detection results below this confidence are not used to prefill the snippet form
+LANGUAGE_DETECTION_MIN_CONFIDENCE = 0.5
+# Foreground color of each kind of highlighted token
+SYNTAX_TAG_COLORS = {
+    "keyword": "#0033b3",
+    "builtin": "#000080",
+    "string": "#067d17",
+    "comment": "#8c8c8c",
+    "decorator": "#9e880d",
+    "preprocessor": "#871094"
+}
+# Time the snippet editor may spend re-highlighting edited lines in one idle slice, in milliseconds
+LIVE_HIGHLIGHT_BUDGET_MS = 10
+# Lines re-highlighted together, with one text fetch and one tag call per token kind
+LIVE_HIGHLIGHT_BATCH_LINES = 200
+
+# Duplicate Detection
+# Estimated similarity above which two snippets are reported as near-duplicates
+DUPLICATE_SIMILARITY_THRESHOLD = 0.8
+# Number of snippets signed per batch when signatures are computed for an existing library
+SIGNATURE_BATCH_SIZE = 500
+# Most distinct signatures in one LSH bucket that are scored pair by pair when clustering the library
+DUPLICATE_BUCKET_LIMIT = 2000
+
+# Related Snippets
+# Number of related snippets listed next to the selected snippet
+RELATED_SNIPPETS_COUNT = 10
+# Number of snippets whose terms are stored per batch when an existing library is indexed
+RELATED_INDEX_BATCH_SIZE = 500
+
+# Query Cache
+# Memory budget for query results kept by the models
+QUERY_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Snippet Cache
+# Memory budget for the titles and code of recently viewed snippets
+SNIPPET_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Token Cache
+# Disk budget for the highlighting token spans of recently viewed snippets
+TOKEN_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Snippet Tree
+# Number of snippets the background loader reads and hands to the tree at a time
+TREE_LOAD_BATCH_SIZE = 500
+# Libraries with more snippets than this fill the tree lazily, one page of a category at a time as it is opened
+TREE_LAZY_THRESHOLD = 20000
+# Number of snippets shown per page of a lazily filled category
+TREE_PAGE_SIZE = 500
+# Most snippet nodes kept in a lazily filled tree before the pages of collapsed categories are released
+TREE_NODE_BUDGET = 50000
+# Time the tree may spend inserting nodes in one idle slice before handing control back to Tk, in milliseconds
+TREE_INSERT_BUDGET_MS = 15
+
+# Snippet Viewer
+# Snippets longer than this many characters are inserted into the code view a chunk at a time across idle slices
+CODE_VIEW_CHUNKED_CHARS = 256 * 1024
+# Snippets longer than this many characters are shown windowed, only the visible lines plus a margin held in the widget
+CODE_VIEW_WINDOWED_CHARS = 2 * 1024 * 1024
+# Number of characters inserted per chunk while a snippet is inserted across idle slices
+CODE_VIEW_CHUNK_CHARS = 64 * 1024
+# Time the code view may spend inserting text in one idle slice, in milliseconds
+CODE_VIEW_INSERT_BUDGET_MS = 15
+# Number of lines kept above and below the visible region of a windowed snippet
+CODE_VIEW_WINDOW_MARGIN = 200
+# Lines longer than this many characters are split into several lines when a snippet is shown windowed
+CODE_VIEW_MAX_LINE_CHARS = 4096
+
+# Delay after the last selection change in the tree before the selected snippet is loaded, in milliseconds
+SELECTION_DEBOUNCE_MS = 120
+# Number of snippets on each side of the selected one whose bodies are read ahead
+PREFETCH_NEIGHBOURS = 5
+
+# Snippet Filter
+# Most snippets shown in the tree while it is filtered by title
+FUZZY_FILTER_LIMIT = 200
+
+# Export Defaults
+# File extension used for each language when snippets are written out as source files
+LANGUAGE_FILE_EXTENSIONS = {
+    "Python": ".py",
+    "JavaScript": ".js",
+    "Java": ".java",
+    "C#": ".cs"
+}
+DEFAULT_FILE_EXTENSION = ".txt"
+# Number of rows pulled from the database cursor per batch while exporting
+EXPORT_BATCH_SIZE = 256
 
 # Error Messages and User Prompts
 ERROR_PERMISSION_DENIED = "You do not have permission to perform this action."
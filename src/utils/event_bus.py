@@ -0,0 +1,192 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from src.utils.custom_logger import CustomLogger
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+
+class Event:
+    """
+    Base class of the events published on the event bus. Subscribers pick events by their class.
+    """
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+class SnippetChanged(Event):
+    """
+    Published after snippets were added, updated or deleted.
+
+    Attributes:
+        snippet_ids (list): The IDs of the snippets.
+        kind (str): ADDED, UPDATED or DELETED.
+    """
+
+    ADDED = "added"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+    def __init__(self, snippet_ids, kind):
+        """
+        Initializes the event.
+
+        Args:
+            snippet_ids (iterable): The IDs of the snippets.
+            kind (str): ADDED, UPDATED or DELETED.
+        """
+        self.snippet_ids = [int(snippet_id) for snippet_id in snippet_ids]
+        self.kind = kind
+
+    @staticmethod
+    def coalesce(events):
+        """
+        Folds a burst of snippet events into the net change of each snippet.
+
+        Args:
+            events (iterable): Events in the order they were published. Events of other types are ignored.
+
+        Returns:
+            dict: Maps each snippet ID to the kind of its latest change.
+        """
+        changes = {}
+        for event in events:
+            if isinstance(event, SnippetChanged):
+                for snippet_id in event.snippet_ids:
+                    changes[snippet_id] = event.kind
+        return changes
+
+
+class CategoryChanged(Event):
+    """
+    Published after categories, or the categories shown for a language, were added, renamed or deleted.
+
+    Attributes:
+        category_ids (list): The IDs of the categories.
+    """
+
+    def __init__(self, category_ids=()):
+        """
+        Initializes the event.
+
+        Args:
+            category_ids (iterable): The IDs of the categories.
+        """
+        self.category_ids = [int(category_id) for category_id in category_ids]
+
+
+class EventBus:
+    """
+    A publish/subscribe hub that lets controllers react to each other's changes without holding
+    references to one another.
+
+    Subscribers register for an event class. Plain subscribers are called with each event as it is
+    published. Coalescing subscribers are called once per Tk idle cycle with the list of events published
+    since, so a bulk operation that publishes hundreds of events still leads to a single UI update.
+
+    Events must be published from the Tk thread. Until a Tk root is attached, coalescing subscribers
+    are called straight away with a one-event list.
+
+    Attributes:
+        root (tk.Misc | None): The widget whose after_idle() schedules the delivery of coalesced events.
+    """
+
+    def __init__(self):
+        """
+        Initializes an EventBus with no subscribers.
+        """
+        self.root = None
+        self.subscribers = {}
+        self.pending = {}
+        self.flush_job = None
+
+    def attach(self, root):
+        """
+        Sets the Tk widget used to schedule coalesced deliveries.
+
+        Args:
+            root (tk.Misc): The widget whose after_idle() schedules the delivery.
+        """
+        self.root = root
+
+    def subscribe(self, event_type, handler, coalesce=False):
+        """
+        Registers a handler for an event class.
+
+        Args:
+            event_type (type): The Event subclass to receive.
+            handler (callable): Called with each event, or with a list of events when coalescing.
+            coalesce (bool): Deliver the events of one idle cycle together.
+        """
+        self.subscribers.setdefault(event_type, []).append((handler, coalesce))
+
+    def unsubscribe(self, event_type, handler):
+        """
+        Removes a handler registered with subscribe(). Events already queued for it are dropped.
+
+        Args:
+            event_type (type): The Event subclass it was registered for.
+            handler (callable): The handler.
+        """
+        self.subscribers[event_type] = [(subscriber, coalesce) for subscriber, coalesce
+                                        in self.subscribers.get(event_type, []) if subscriber != handler]
+        self.pending.pop(handler, None)
+
+    def publish(self, event):
+        """
+        Delivers an event to the handlers subscribed to its class.
+
+        Args:
+            event (Event): The event.
+        """
+        for handler, coalesce in list(self.subscribers.get(type(event), [])):
+            if not coalesce:
+                self.deliver(handler, event)
+            elif self.root is None:
+                self.deliver(handler, [event])
+            else:
+                self.pending.setdefault(handler, []).append(event)
+                if self.flush_job is None:
+                    self.flush_job = self.root.after_idle(self.flush)
+
+    def flush(self):
+        """Delivers the events queued for coalescing subscribers since the last idle cycle."""
+        self.flush_job = None
+        pending, self.pending = self.pending, {}
+        for handler, events in pending.items():
+            self.deliver(handler, events)
+
+    @staticmethod
+    def deliver(handler, payload):
+        """Calls one handler, so a failing subscriber does not keep the event from the others."""
+        try:
+            handler(payload)
+        except Exception as error:
+            logger.error(f"Event handler {handler!r} failed: {error}")
+
+
+# Shared by the controllers, so any of them can publish what it changed
+event_bus = EventBus()
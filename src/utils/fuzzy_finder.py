@@ -0,0 +1,392 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import string
+
+import numpy as np
+
+# Titles are matched on their first MAX_TITLE_LENGTH characters, which keeps positions within int8
+MAX_TITLE_LENGTH = 127
+
+# Characters with their own occurrence tables. All other characters but spaces share one more column, so
+# punctuation in a query only scans the titles that have some.
+INDEXED_CHARACTERS = string.ascii_lowercase + string.digits
+OTHER_COLUMN = len(INDEXED_CHARACTERS)
+
+# Scoring, loosely after fzf: every matched character scores, matches at the start of a word or right after
+# the previous match score extra, and characters skipped inside a term cost a little
+SCORE_MATCH = 16
+BONUS_BOUNDARY = 8
+BONUS_CONSECUTIVE = 6
+PENALTY_GAP = 1
+
+
+def encode_titles(titles, length):
+    """
+    Packs titles into a fixed-width byte matrix, one row per title and one byte per character.
+
+    Characters outside ASCII become "?" so every character keeps its column. Rows are padded with zero bytes.
+
+    Args:
+        titles (list): The titles to pack.
+        length (int): The width of the matrix. Longer titles are cut off.
+
+    Returns:
+        numpy.ndarray: A uint8 matrix of shape (len(titles), length).
+    """
+    if not titles:
+        return np.zeros((0, length), dtype=np.uint8)
+    encoded = [title[:length].encode('ascii', 'replace') for title in titles]
+    return np.array(encoded, dtype=f"S{length}").view(np.uint8).reshape(len(titles), length)
+
+
+def encode_rows(titles, width):
+    """
+    Builds the index rows of a batch of titles.
+
+    Args:
+        titles (list): The titles.
+        width (int): The number of characters of each title to index.
+
+    Returns:
+        tuple: The lower-case characters, word boundaries, first, second and last occurrence tables and
+            lengths of the titles.
+    """
+    original = encode_titles(titles, width)
+    lower = original.copy()
+    upper_case = (original >= ord('A')) & (original <= ord('Z'))
+    lower[upper_case] += ord('a') - ord('A')
+    lengths = np.minimum([len(title) for title in titles], width).astype(np.int16)
+
+    # A word starts at the beginning of the title, after anything that is not a letter or digit, and at
+    # a lower-to-upper case change, as in "parseJson"
+    alphanumeric = np.isin(lower, np.frombuffer(INDEXED_CHARACTERS.encode(), dtype=np.uint8))
+    lower_case = (original >= ord('a')) & (original <= ord('z'))
+    boundaries = alphanumeric.copy()
+    boundaries[:, 1:] &= ~alphanumeric[:, :-1] | (upper_case[:, 1:] & lower_case[:, :-1])
+
+    # First, second and last position of each character in each title. A missing character is first
+    # and second at MAX_TITLE_LENGTH and last at -1, so it never follows any position.
+    count = len(titles)
+    first = np.full((count, OTHER_COLUMN + 1), MAX_TITLE_LENGTH, dtype=np.int8)
+    second = np.full((count, OTHER_COLUMN + 1), MAX_TITLE_LENGTH, dtype=np.int8)
+    last = np.full((count, OTHER_COLUMN + 1), -1, dtype=np.int8)
+    other = ~alphanumeric & (lower != 0) & (lower != ord(' '))
+    for column in range(OTHER_COLUMN + 1):
+        matches = other if column == OTHER_COLUMN else lower == ord(INDEXED_CHARACTERS[column])
+        found = np.flatnonzero(matches.any(axis=1))
+        matches = matches[found]
+        first_found = matches.argmax(axis=1)
+        first[found, column] = first_found
+        last[found, column] = width - 1 - matches[:, ::-1].argmax(axis=1)
+        matches[np.arange(len(found)), first_found] = False
+        repeated = matches.any(axis=1)
+        second[found[repeated], column] = matches[repeated].argmax(axis=1)
+
+    return lower, boundaries, first, second, last, lengths
+
+
+class FuzzyFinder:
+    """
+    An in-memory fuzzy matcher over snippet titles.
+
+    A title matches a query when every whitespace-separated term of the query appears in it as a
+    case-insensitive subsequence, so "lst cmp" finds "List Comprehension". Matches are ranked by how
+    well the characters line up with word starts and with each other.
+
+    For every title and indexed character, the index stores the first and last position where the
+    character occurs. These tables answer the ordered character pair (skip-bigram) test a subsequence
+    match needs, "a occurs somewhere before b", and give the greedy position of most matched characters
+    directly, so the byte matrix of titles is only scanned for the few rows where a character repeats
+    around the previous match.
+
+    Searches are incremental. The state after each query is kept, and a query that extends an earlier
+    one, by typing more characters or removing some, continues from that state, so each keystroke only
+    checks the candidates still left.
+
+    Titles can be added, renamed and removed one at a time. A removed title keeps its row, blanked so it
+    never matches, until the next load() compacts the index.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty finder.
+        """
+        self.load([])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def load(self, entries):
+        """
+        Replaces the indexed titles.
+
+        Args:
+            entries (iterable): (snippet id, title) pairs.
+        """
+        entries = list(entries)
+        self.ids = np.fromiter((snippet_id for snippet_id, _ in entries), dtype=np.int64, count=len(entries))
+        self.rows = {snippet_id: row for row, (snippet_id, _) in enumerate(entries)}
+        self.count = len(entries)
+        titles = [title or "" for _, title in entries]
+        self.width = min(max((len(title) for title in titles), default=1), MAX_TITLE_LENGTH) or 1
+        (self.characters, self.boundaries, self.first, self.second, self.last,
+         self.lengths) = encode_rows(titles, self.width)
+        self.history = []
+
+    def set_title(self, snippet_id, title):
+        """
+        Adds a title to the index, or replaces the title already indexed for a snippet.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            title (str): Its title.
+        """
+        self.set_titles([(snippet_id, title)])
+
+    def set_titles(self, entries):
+        """
+        Adds or replaces many titles at once, encoding them as one batch.
+
+        Args:
+            entries (iterable): (snippet id, title) pairs.
+        """
+        entries = [(snippet_id, title or "") for snippet_id, title in entries]
+        if not entries:
+            return
+        longest = max(len(title) for _, title in entries)
+        if longest > self.width and self.width < MAX_TITLE_LENGTH:
+            self.widen(min(longest, MAX_TITLE_LENGTH))
+        added = sum(1 for snippet_id, _ in entries if snippet_id not in self.rows)
+        if self.count + added > len(self.ids):
+            self.grow(max(self.count * 2, self.count + added, 16))
+        rows = np.empty(len(entries), dtype=np.int64)
+        for index, (snippet_id, _) in enumerate(entries):
+            row = self.rows.get(snippet_id)
+            if row is None:
+                row = self.rows[snippet_id] = self.count
+                self.ids[row] = snippet_id
+                self.count += 1
+            rows[index] = row
+        (self.characters[rows], self.boundaries[rows], self.first[rows], self.second[rows], self.last[rows],
+         self.lengths[rows]) = encode_rows([title for _, title in entries], self.width)
+        self.history = []
+
+    def remove(self, snippet_id):
+        """
+        Removes a title from the index.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+        """
+        row = self.rows.pop(snippet_id, None)
+        if row is None:
+            return
+        self.first[row] = MAX_TITLE_LENGTH
+        self.second[row] = MAX_TITLE_LENGTH
+        self.last[row] = -1
+        self.history = []
+
+    def grow(self, capacity):
+        """
+        Makes room for more rows, so adding titles one at a time does not copy the index every time.
+
+        Args:
+            capacity (int): The number of rows to make room for.
+        """
+        extra = capacity - len(self.ids)
+        self.ids = np.concatenate([self.ids, np.full(extra, -1, dtype=np.int64)])
+        self.characters = np.concatenate([self.characters, np.zeros((extra, self.width), dtype=np.uint8)])
+        self.boundaries = np.concatenate([self.boundaries, np.zeros((extra, self.width), dtype=bool)])
+        self.first = np.concatenate([self.first, np.full((extra, OTHER_COLUMN + 1), MAX_TITLE_LENGTH,
+                                                         dtype=np.int8)])
+        self.second = np.concatenate([self.second, np.full((extra, OTHER_COLUMN + 1), MAX_TITLE_LENGTH,
+                                                           dtype=np.int8)])
+        self.last = np.concatenate([self.last, np.full((extra, OTHER_COLUMN + 1), -1, dtype=np.int8)])
+        self.lengths = np.concatenate([self.lengths, np.zeros(extra, dtype=np.int16)])
+
+    def widen(self, width):
+        """
+        Indexes more characters of each title, for a new title longer than any before it.
+
+        Titles already indexed are not longer than the old width, so their new columns are padding.
+
+        Args:
+            width (int): The new number of characters to index.
+        """
+        extra = width - self.width
+        self.characters = np.pad(self.characters, ((0, 0), (0, extra)))
+        self.boundaries = np.pad(self.boundaries, ((0, 0), (0, extra)))
+        self.width = width
+
+    def search(self, query, limit=None):
+        """
+        Finds the titles matching a query, best match first.
+
+        Args:
+            query (str): The query. Whitespace separates terms that must all match, in any order.
+            limit (int, optional): The most results to return.
+
+        Returns:
+            tuple: A list of the matching snippet IDs, best first, and the total number of matches.
+        """
+        terms = query.lower().split()
+        if not terms:
+            self.history = []
+            return [], 0
+
+        state = self.resume(terms)
+        rows, positions, scores = state['rows'], state['positions'], state['scores']
+        resumed_terms = state['terms']
+        for index in range(max(len(resumed_terms) - 1, 0), len(terms)):
+            if index < len(resumed_terms):
+                # Continue the last term of the resumed state from its stored positions
+                done = resumed_terms[index]
+            else:
+                done = ""
+                positions = np.full(len(rows), -1, dtype=np.int16)
+            previous_character = done[-1] if done else None
+            for character in terms[index][len(done):]:
+                rows, positions, scores = self.match_character(rows, positions, scores, character,
+                                                              previous_character)
+                previous_character = character
+
+        if terms != resumed_terms:
+            self.history.append({'terms': terms, 'rows': rows, 'positions': positions, 'scores': scores})
+
+        # Higher scores first, then shorter titles, then the order the titles were loaded in. The three are
+        # packed into one key so the best results can be picked out without sorting every match.
+        keys = ((-scores.astype(np.int64)) << 40) | (self.lengths[rows].astype(np.int64) << 32) | rows
+        if limit is not None and limit < len(keys):
+            keys = keys[np.argpartition(keys, limit)[:limit]]
+        keys.sort()
+        return self.ids[keys & 0xFFFFFFFF].tolist(), len(rows)
+
+    def resume(self, terms):
+        """
+        Finds the latest search state that a query narrows, and drops the states after it.
+
+        A state can be resumed when its terms are the leading terms of the query, except that the query's
+        version of its last term may be longer. search() then matches the rest of that term from the stored
+        positions.
+
+        Args:
+            terms (list): The lower-case terms of the query.
+
+        Returns:
+            dict: The state to continue from.
+        """
+        while self.history:
+            state = self.history[-1]
+            previous = state['terms']
+            if (len(previous) <= len(terms) and previous[:-1] == terms[:len(previous) - 1]
+                    and terms[len(previous) - 1].startswith(previous[-1])):
+                return state
+            self.history.pop()
+        return {'terms': [], 'rows': np.arange(self.count), 'positions': None,
+                'scores': np.zeros(self.count, dtype=np.int32)}
+
+    def match_character(self, rows, positions, scores, character, previous_character):
+        """
+        Matches the next character of a term on the remaining candidates.
+
+        Each candidate's match is the first occurrence of the character after its previous match. Candidates
+        without one are dropped.
+
+        Args:
+            rows (numpy.ndarray): The indexes of the candidate titles.
+            positions (numpy.ndarray): The position of each candidate's previous match in this term, or -1.
+            scores (numpy.ndarray): The score of each candidate so far.
+            character (str): The lower-case character to match.
+            previous_character (str): The previous character of the term, or None at its start.
+
+        Returns:
+            tuple: The rows, positions and scores of the candidates that still match.
+        """
+        code = ord(character) if ord(character) < 128 else ord('?')
+        column = INDEXED_CHARACTERS.find(character)
+        if column < 0:
+            column = OTHER_COLUMN
+        last = self.last[rows, column]
+        keep = last > positions
+        if previous_character is not None:
+            # The ordered pair test: the previous character must occur before the last occurrence of this one.
+            # It is implied by the check above, but costs only a table lookup and prunes before anything else.
+            previous_column = INDEXED_CHARACTERS.find(previous_character)
+            keep &= self.first[rows, OTHER_COLUMN if previous_column < 0 else previous_column] < last
+        rows, positions, scores, last = rows[keep], positions[keep], scores[keep], last[keep]
+
+        first = self.first[rows, column].astype(np.int16)
+        if column == OTHER_COLUMN:
+            # The shared column only says where some other character is, so look for this one from there
+            matched = self.scan(rows, np.maximum(positions + 1, first), last, code)
+            keep = matched >= 0
+            rows, positions, scores, matched = rows[keep], positions[keep], scores[keep], matched[keep]
+        else:
+            # Most matches are the first or second occurrence after the previous match. Only characters that
+            # occur three or more times, with the previous match past the second, need looking for.
+            second = self.second[rows, column].astype(np.int16)
+            matched = np.where(first > positions, first, second)
+            later = np.flatnonzero(matched <= positions)
+            if len(later):
+                matched[later] = self.scan(rows[later], np.maximum(positions[later] + 1, second[later] + 1),
+                                           last[later], code)
+
+        consecutive = (positions >= 0) & (matched == positions + 1)
+        gaps = np.where(positions >= 0, matched - positions - 1, 0)
+        scores = (scores + SCORE_MATCH + BONUS_BOUNDARY * self.boundaries[rows, matched]
+                  + BONUS_CONSECUTIVE * consecutive - PENALTY_GAP * gaps)
+        return rows, matched, scores
+
+    def scan(self, rows, starts, stops, code):
+        """
+        Finds the first occurrence of a character within a range of each title, column by column.
+
+        Each step only looks at the titles still unresolved, and the ranges come from the occurrence tables,
+        so this touches few bytes.
+
+        Args:
+            rows (numpy.ndarray): The indexes of the titles to scan.
+            starts (numpy.ndarray): The first position to look at in each title.
+            stops (numpy.ndarray): The last position to look at in each title.
+            code (int): The byte to look for.
+
+        Returns:
+            numpy.ndarray: The position of the occurrence in each title, or -1 where there is none.
+        """
+        found = np.full(len(rows), -1, dtype=np.int16)
+        pending = np.arange(len(rows))
+        columns = starts.astype(np.int16)
+        stops = stops.astype(np.int16)
+        while len(pending):
+            inside = columns <= stops
+            pending, columns, stops = pending[inside], columns[inside], stops[inside]
+            hit = self.characters[rows[pending], columns] == code
+            found[pending[hit]] = columns[hit]
+            missed = ~hit
+            pending, columns, stops = pending[missed], columns[missed] + 1, stops[missed]
+        return found
+
+
+# Shared by the snippet tree filter
+fuzzy_finder = FuzzyFinder()
@@ -0,0 +1,151 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import glob
+import hashlib
+import os
+from tkinter import PhotoImage
+
+from src.utils.constants import DEFAULT_SUBDIR
+from src.utils.custom_logger import CustomLogger
+from src.utils.path_utils import get_file_path
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+
+class ImageCache:
+    """
+    Serves resized images from PNG files rendered ahead of time, so building the window never imports
+    PIL or resamples an image.
+
+    Rendered images are stored in the user's cache folder, named after the source image, the size and a
+    digest of the source path, its modification time, the size and the display scale. An image edited,
+    replaced or shown at another scale therefore misses the cache instead of showing a stale render.
+
+    A hit is loaded straight into a PhotoImage, which reads PNG files natively. A miss is shown at once
+    by subsampling the source image in Tk, and the properly resampled render is made with PIL on a
+    background thread. Once it is written, the image already on screen is reloaded from it, and later
+    starts hit the cache.
+
+    Attributes:
+        root (tk.Misc): The widget the images belong to.
+        task_runner (TaskRunner): Runs the renders in the background.
+        cache_dir (str): The folder of the rendered images.
+        scale (float): The display scale, 1.0 at 96 DPI.
+    """
+
+    def __init__(self, root, task_runner, cache_dir=None):
+        """
+        Initializes the ImageCache.
+
+        Args:
+            root (tk.Misc): The widget the images belong to.
+            task_runner (TaskRunner): Runs the renders in the background.
+            cache_dir (str, optional): The folder of the rendered images. Defaults to the "cache" folder
+                of the user's application folder.
+        """
+        self.root = root
+        self.task_runner = task_runner
+        self.cache_dir = cache_dir or os.path.dirname(get_file_path("", "cache", DEFAULT_SUBDIR))
+        # Tk scaling is in pixels per point, which is 96 / 72 on a standard display
+        self.scale = round(float(root.tk.call('tk', 'scaling')) * 72 / 96, 2)
+
+    def get_cache_path(self, path, width, height):
+        """
+        Returns the file a render of an image at a size is cached in.
+
+        Args:
+            path (str): The source image.
+            width (int): The width of the render, in pixels.
+            height (int): The height of the render, in pixels.
+        """
+        source = os.path.abspath(path)
+        key = f"{source}|{os.stat(source).st_mtime_ns}|{width}x{height}|{self.scale}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{width}x{height}-{digest}.png")
+
+    def load(self, path, width, height):
+        """
+        Returns an image resized to a size given at 96 DPI, scaled to the display.
+
+        Args:
+            path (str): The source image.
+            width (int): The width of the image at 96 DPI, in pixels.
+            height (int): The height of the image at 96 DPI, in pixels.
+
+        Returns:
+            PhotoImage: The resized image.
+        """
+        width, height = max(1, round(width * self.scale)), max(1, round(height * self.scale))
+        cache_path = self.get_cache_path(path, width, height)
+        if os.path.exists(cache_path):
+            return PhotoImage(master=self.root, file=cache_path)
+
+        # Shown straight away at roughly the right size, until the proper render is ready
+        source = PhotoImage(master=self.root, file=path)
+        factor_x = max(1, source.width() // width)
+        factor_y = max(1, source.height() // height)
+        image = source.subsample(factor_x, factor_y) if factor_x > 1 or factor_y > 1 else source
+        self.task_runner.submit(render_image, path, width, height, cache_path,
+                                callback=lambda rendered: image.configure(file=rendered),
+                                error_callback=lambda error: logger.warning(
+                                    f"Could not cache a render of {path}: {error}"))
+        return image
+
+
+def render_image(path, width, height, cache_path):
+    """
+    Resizes an image with LANCZOS resampling and writes it to the cache, replacing older renders of the
+    same image at the same size.
+
+    Runs on a worker thread. PIL is only imported here, so it is only loaded when the cache misses.
+
+    Args:
+        path (str): The source image.
+        width (int): The width of the render, in pixels.
+        height (int): The height of the render, in pixels.
+        cache_path (str): The file to write the render to.
+
+    Returns:
+        str: The file the render was written to.
+    """
+    from PIL import Image
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with Image.open(path) as image:
+        rendered = image.resize((width, height), Image.Resampling.LANCZOS)
+    # Written under a temporary name first, so another start never loads a half-written file
+    temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+    rendered.save(temporary_path, format='PNG')
+    os.replace(temporary_path, cache_path)
+
+    stem = os.path.basename(cache_path).rsplit('-', 1)[0]
+    for stale_path in glob.glob(os.path.join(glob.escape(os.path.dirname(cache_path)), f"{glob.escape(stem)}-*.png")):
+        if stale_path != cache_path:
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
+    return cache_path
@@ -24,7 +24,7 @@ SOFTWARE.
 import sqlite3
 from src.db.connection import DatabaseConnection
 from src.utils.custom_logger import CustomLogger
-from src.db.db_schema import TABLES_SQL, INITIAL_DATA_SQL
+from src.db.db_schema import TABLES_SQL, INDEXES_SQL, INITIAL_DATA_SQL
 
 # Instantiate the logger
 logger = CustomLogger(__name__).logger
@@ -62,8 +62,31 @@ class DatabaseInitializer:
             logger.error(f"Error creating table '{table_name}': {e}")
             return False
 
+    def create_index(self, conn, create_index_sql, index_name):
+        """Creates a single index using the provided SQL statement.
+
+        Args:
+            conn (sqlite3.Connection): The database connection object.
+            create_index_sql (str): SQL statement for creating the index.
+            index_name (str): The name of the index to create.
+
+        Returns:
+            bool: True if the index was created successfully, False otherwise.
+        """
+        try:
+            c = conn.cursor()
+            c.execute(create_index_sql)
+            logger.info(f"Index '{index_name}' created successfully.")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error creating index '{index_name}': {e}")
+            return False
+
     def create_tables(self):
-        """Creates all required database tables based on predefined SQL schema definitions.
+        """Creates all required database tables and indexes based on predefined SQL schema definitions.
+
+        Every statement uses IF NOT EXISTS, so this is also safe to run against an existing database to
+        add the tables introduced by newer versions of the application.
 
         Returns:
             bool, list: True if all tables were created successfully, along with any errors encountered.
@@ -79,6 +102,11 @@ class DatabaseInitializer:
             if not success:
                 errors.append(f"Failed to create table {table_name}.")
 
+        for index_name, create_index_sql in INDEXES_SQL.items():
+            success = self.create_index(conn, create_index_sql, index_name)
+            if not success:
+                errors.append(f"Failed to create index {index_name}.")
+
         # Don't close the connection here; keep it open for further operations
         return len(errors) == 0, errors
 
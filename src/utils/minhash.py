@@ -0,0 +1,128 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import re
+import zlib
+
+import numpy as np
+
+# Number of hash permutations in a signature, and how they are split into LSH bands. Snippets whose
+# signatures agree on every row of at least one band share a bucket. With 16 bands of 8 rows, pairs
+# above roughly 70% similarity are very likely to meet in a bucket and pairs far below it rarely do.
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Number of consecutive tokens that make up one shingle
+SHINGLE_SIZE = 3
+
+# Permutations use multiply-add-shift hashing over 32-bit shingle hashes: (a * x + b) modulo 2 ** 64,
+# keeping the upper 32 bits. Unsigned 64-bit NumPy arithmetic wraps around, which gives the modulo
+# for free. With a odd this is a strongly universal family for 32-bit keys.
+HASH_SHIFT = np.uint64(32)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# The permutations must never change, otherwise signatures already stored in the database become
+# incomparable with new ones, so they come from a fixed seed.
+_generator = np.random.default_rng(seed=20240329)
+PERMUTATION_A = _generator.integers(0, 1 << 64, size=NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+PERMUTATION_B = _generator.integers(0, 1 << 64, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def shingle_hashes(code):
+    """
+    Splits code into tokens and hashes every run of SHINGLE_SIZE consecutive tokens.
+
+    Whitespace is ignored, so reformatting a snippet does not change its shingles.
+
+    Args:
+        code (str): The code to shingle.
+
+    Returns:
+        numpy.ndarray: The distinct 32-bit shingle hashes, as unsigned 64-bit integers.
+    """
+    tokens = TOKEN_PATTERN.findall(code or "")
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = {" ".join(tokens[index:index + SHINGLE_SIZE]) for index in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64,
+                       count=len(shingles))
+
+
+def compute_signature(code):
+    """
+    Computes the MinHash signature of a piece of code.
+
+    Args:
+        code (str): The code to sign.
+
+    Returns:
+        numpy.ndarray: NUM_PERMUTATIONS unsigned 32-bit minimum hashes. Code without any tokens gets
+        a signature of all maximum values.
+    """
+    hashes = shingle_hashes(code)
+    if hashes.size == 0:
+        return np.full(NUM_PERMUTATIONS, MAX_HASH, dtype=np.uint32)
+    permuted = (PERMUTATION_A[:, np.newaxis] * hashes[np.newaxis, :] + PERMUTATION_B[:, np.newaxis]) >> HASH_SHIFT
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """
+    Hashes each LSH band of a signature into a bucket number.
+
+    Args:
+        signature (numpy.ndarray): A signature from compute_signature.
+
+    Returns:
+        list: One bucket number per band, in band order.
+    """
+    bands = np.ascontiguousarray(signature, dtype=np.uint32).reshape(LSH_BANDS, LSH_ROWS)
+    return [zlib.crc32(band.tobytes()) for band in bands]
+
+
+def signature_to_blob(signature):
+    """Serializes a signature for storage in a BLOB column."""
+    return np.ascontiguousarray(signature, dtype="<u4").tobytes()
+
+
+def signature_from_blob(blob):
+    """Deserializes a signature stored by signature_to_blob."""
+    return np.frombuffer(blob, dtype="<u4")
+
+
+def estimate_similarity(signature, others):
+    """
+    Estimates the Jaccard similarity between one signature and a batch of others.
+
+    Args:
+        signature (numpy.ndarray): The reference signature.
+        others (numpy.ndarray): A (count x NUM_PERMUTATIONS) matrix of signatures.
+
+    Returns:
+        numpy.ndarray: The estimated similarity to each of the others, between 0 and 1.
+    """
+    return (np.asarray(others) == signature).mean(axis=1)
@@ -0,0 +1,226 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+from src.utils.constants import QUERY_CACHE_MAX_BYTES
+from src.utils.custom_logger import CustomLogger
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+
+def estimate_size(rows, sample_size=64):
+    """
+    Estimates the memory held by a query result from a sample of its rows.
+
+    Args:
+        rows (list): The result rows, as tuples.
+        sample_size (int): The most rows to measure.
+
+    Returns:
+        int: The approximate size in bytes.
+    """
+    if not rows:
+        return sys.getsizeof(rows)
+    sample = rows[::max(len(rows) // sample_size, 1)]
+    sample_bytes = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in sample)
+    return sys.getsizeof(rows) + sample_bytes * len(rows) // len(sample)
+
+
+class QueryCache:
+    """
+    An LRU cache of query results, bounded by the memory the results take.
+
+    Entries are keyed on the normalized SQL and its parameters, and tagged with the write sequence of
+    each table the query reads when it was run. Models bump a table's sequence through invalidate()
+    whenever they write to it, which drops exactly the entries reading that table.
+
+    Writes made through other connections, which the models cannot report, are caught with
+    PRAGMA data_version. SQLite changes that value for a connection whenever another connection commits
+    to the database, and every entry is dropped when it does. The value only tells a connection about
+    commits made since it last looked, so the cache serves a single tracked connection, the long-lived
+    one of the Tk thread. Queries on other connections, such as those of worker threads, go straight to
+    the database, so a new connection never reads results it could not tell are stale.
+
+    All public methods are thread-safe.
+
+    Attributes:
+        max_bytes (int): The memory budget for cached results.
+        size (int): The estimated memory held by the cached results.
+        hits (int): The number of queries answered from the cache.
+        misses (int): The number of queries run against the database.
+    """
+
+    def __init__(self, max_bytes=QUERY_CACHE_MAX_BYTES):
+        """
+        Initializes an empty QueryCache.
+
+        Args:
+            max_bytes (int): The memory budget for cached results.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self.table_versions = {}
+        self.connection = None
+        self.data_version = None
+        self.lock = threading.RLock()
+
+    def track(self, connection):
+        """
+        Makes the cache serve the queries run on a connection, dropping the results of any other.
+
+        Args:
+            connection (sqlite3.Connection): The long-lived connection of the Tk thread.
+        """
+        with self.lock:
+            self.connection = connection
+            self.data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+            self.clear()
+
+    def forget(self, connection):
+        """
+        Stops serving a connection that is being closed. Does nothing for a connection not tracked.
+
+        Args:
+            connection (sqlite3.Connection): The connection.
+        """
+        with self.lock:
+            if connection is not None and connection is self.connection:
+                self.connection = None
+                self.data_version = None
+                self.clear()
+
+    def fetch(self, connection, query, params=(), tables=()):
+        """
+        Returns the rows of a query, from the cache when it holds a current result. Queries on a connection
+        other than the tracked one are always run against the database.
+
+        Args:
+            connection (sqlite3.Connection): The connection to run the query on.
+            query (str): The SQL query.
+            params (tuple): The query parameters.
+            tables (tuple): The tables the query reads.
+
+        Returns:
+            list: The result rows, as tuples. The list is the caller's to change.
+        """
+        if connection is not self.connection:
+            return connection.execute(query, params).fetchall()
+
+        key = (" ".join(query.split()), tuple(params))
+        with self.lock:
+            self.check_data_version()
+            versions = self.current_versions(tables)
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] == versions:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[0])
+
+        rows = connection.execute(query, params).fetchall()
+
+        with self.lock:
+            self.misses += 1
+            # A write may have landed while the query ran, in which case its result is not cached
+            if versions == self.current_versions(tables):
+                self.store(key, rows, tables, versions)
+        return list(rows)
+
+    def current_versions(self, tables):
+        """
+        Returns the tag a result read from the given tables gets now.
+
+        Args:
+            tables (tuple): The tables the query reads.
+
+        Returns:
+            tuple: The cache generation followed by the write sequence of each table.
+        """
+        return (self.generation,) + tuple(self.table_versions.get(table, 0) for table in tables)
+
+    def store(self, key, rows, tables, versions):
+        """
+        Adds a result to the cache, evicting the least recently used results to stay within budget.
+
+        Args:
+            key (tuple): The normalized query and its parameters.
+            rows (list): The result rows.
+            tables (tuple): The tables the query read.
+            versions (tuple): The tag from current_versions() when the query ran.
+        """
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        old_entry = self.entries.pop(key, None)
+        if old_entry is not None:
+            self.size -= old_entry[1]
+        self.entries[key] = (rows, size, versions, frozenset(tables))
+        self.size += size
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted[1]
+
+    def check_data_version(self):
+        """
+        Drops every entry if another connection has committed since the tracked connection last looked.
+        """
+        data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        previous, self.data_version = self.data_version, data_version
+        if previous != data_version:
+            logger.info("Database changed by another connection, clearing the query cache.")
+            self.clear()
+
+    def invalidate(self, *tables):
+        """
+        Drops every cached result that reads any of the given tables, and keeps results of queries already
+        running on them from being cached.
+
+        Args:
+            *tables (str): The tables that were written to.
+        """
+        with self.lock:
+            for table in tables:
+                self.table_versions[table] = self.table_versions.get(table, 0) + 1
+            stale = [key for key, entry in self.entries.items() if not entry[3].isdisjoint(tables)]
+            for key in stale:
+                self.size -= self.entries.pop(key)[1]
+
+    def clear(self):
+        """
+        Drops every cached result.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.generation += 1
+
+
+# Shared by the models, so a write through any of them invalidates the results read through the others
+query_cache = QueryCache()
@@ -0,0 +1,151 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+from src.utils.constants import SNIPPET_CACHE_MAX_BYTES
+
+
+class SnippetCache:
+    """
+    An LRU cache of snippet details, bounded by the bytes of code and titles it holds.
+
+    Entries are the detail rows of single snippets, keyed by snippet ID. A hit never touches the
+    database, so the cache relies on the models to report their writes: updates and deletes
+    invalidate the snippets they change. Every invalidation also bumps a version number, which lets
+    a background read started before a write tell that its rows may be out of date.
+
+    All public methods are thread-safe.
+
+    Attributes:
+        max_bytes (int): The memory budget for cached snippets.
+        size (int): The bytes held by the cached snippets.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not.
+        version (int): Bumped by every invalidation.
+    """
+
+    def __init__(self, max_bytes=SNIPPET_CACHE_MAX_BYTES):
+        """
+        Initializes an empty SnippetCache.
+
+        Args:
+            max_bytes (int): The memory budget for cached snippets.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self.lock = threading.RLock()
+
+    def get(self, snippet_id, count=True):
+        """
+        Returns the cached detail row of a snippet.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            count (bool): Whether the lookup counts towards the hit and miss statistics.
+
+        Returns:
+            tuple | None: The detail row, or None on a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(int(snippet_id))
+            if entry is None:
+                self.misses += count
+                return None
+            self.entries.move_to_end(int(snippet_id))
+            self.hits += count
+            return entry[0]
+
+    def __contains__(self, snippet_id):
+        with self.lock:
+            return int(snippet_id) in self.entries
+
+    def put(self, snippet_id, row, version=None):
+        """
+        Caches the detail row of a snippet, evicting the least recently used snippets to stay within budget.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            row (tuple): Its detail row.
+            version (int, optional): The cache version when the row was read. The row is dropped if a
+                snippet has been invalidated since.
+        """
+        # Titles and code are the only fields of any size
+        size = sum(sys.getsizeof(value) for value in row if isinstance(value, str))
+        with self.lock:
+            if (version is not None and version != self.version) or size > self.max_bytes:
+                return
+            old_entry = self.entries.pop(int(snippet_id), None)
+            if old_entry is not None:
+                self.size -= old_entry[1]
+            self.entries[int(snippet_id)] = (row, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def invalidate(self, snippet_ids):
+        """
+        Drops the cached rows of snippets that were changed or deleted.
+
+        Args:
+            snippet_ids (iterable): The IDs of the snippets.
+        """
+        with self.lock:
+            self.version += 1
+            for snippet_id in snippet_ids:
+                entry = self.entries.pop(int(snippet_id), None)
+                if entry is not None:
+                    self.size -= entry[1]
+
+    def clear(self):
+        """
+        Drops every cached row.
+        """
+        with self.lock:
+            self.version += 1
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: "hits", "misses", "hit_rate", "entries", "size" and "max_bytes".
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self.entries), "size": self.size, "max_bytes": self.max_bytes}
+
+
+# Shared by the models, so a snippet read through one is cached for the others
+snippet_cache = SnippetCache()
@@ -0,0 +1,196 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+import re
+import zipfile
+
+from src.db.connection import DatabaseConnection
+from src.models.application_model import ApplicationModel
+from src.utils.constants import LANGUAGE_FILE_EXTENSIONS, DEFAULT_FILE_EXTENSION, EXPORT_BATCH_SIZE
+from src.utils.custom_logger import CustomLogger
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+# Compression methods that can be named in the "export" section of the application configuration
+COMPRESSION_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA
+}
+
+# Characters that are not allowed in file or folder names on at least one supported platform
+INVALID_PATH_CHARACTERS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+def safe_path_component(name, fallback="untitled"):
+    """
+    Turns a snippet, language or category name into something usable as a file or folder name.
+
+    Args:
+        name (str): The name to clean.
+        fallback (str): The name to use when nothing usable is left after cleaning.
+
+    Returns:
+        str: The cleaned name.
+    """
+    cleaned = INVALID_PATH_CHARACTERS.sub("_", name or "").strip(" .")
+    return cleaned or fallback
+
+
+class SnippetExporter:
+    """
+    Streams snippets out of the database into a directory tree or a zip archive.
+
+    Snippets are laid out as `language/category/title.ext`. Rows are pulled from the database cursor in
+    batches and every body is written out as soon as it is read, so memory use stays flat no matter how
+    large the library is. Zip compression is done by zlib, bz2 or lzma, all of which release the GIL
+    while they work, which keeps the UI thread responsive while an export runs in the background.
+
+    The exporter opens its own database connection, because SQLite connections cannot be shared
+    with the thread that runs the export.
+
+    Attributes:
+        db_file (str): The path of the SQLite database to export from.
+        destination (str): The directory or zip file to write to.
+        archive (bool): True to write a zip archive, False to write a directory tree.
+        compression (int): The zipfile compression method used for archives.
+        compresslevel (int | None): The compression level passed to zipfile, or None for its default.
+        selection (dict | None): Restricts the export to part of the library, see build_selection_filter.
+    """
+
+    def __init__(self, db_file, destination, archive=False, compression="deflated", compresslevel=None,
+                 selection=None, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Initializes the exporter.
+
+        Args:
+            db_file (str): The path of the SQLite database to export from.
+            destination (str): The directory or zip file to write to.
+            archive (bool): True to write a zip archive, False to write a directory tree.
+            compression (str): One of the names in COMPRESSION_METHODS.
+            compresslevel (int, optional): The compression level passed to zipfile.
+            selection (dict, optional): Restricts the export to part of the library.
+            batch_size (int): The number of rows fetched from the database at a time.
+        """
+        if compression not in COMPRESSION_METHODS:
+            raise ValueError(f"Unknown compression method: {compression}")
+        self.db_file = db_file
+        self.destination = destination
+        self.archive = archive
+        self.compression = COMPRESSION_METHODS[compression]
+        self.compresslevel = compresslevel
+        self.selection = selection
+        self.batch_size = batch_size
+        self.used_paths = set()
+
+    def relative_path(self, snippet):
+        """
+        Builds the `language/category/title.ext` path for a snippet, avoiding clashes with paths
+        already written during this export.
+
+        Args:
+            snippet (dict): The snippet being exported.
+
+        Returns:
+            str: The path relative to the export destination, using forward slashes.
+        """
+        language = safe_path_component(snippet["language"])
+        category = safe_path_component(snippet["category"])
+        title = safe_path_component(snippet["title"])
+        extension = LANGUAGE_FILE_EXTENSIONS.get(snippet["language"], DEFAULT_FILE_EXTENSION)
+
+        path = f"{language}/{category}/{title}{extension}"
+        # Compare case-insensitively, since Windows file systems and most unzip tools do
+        if path.lower() in self.used_paths:
+            path = f"{language}/{category}/{title} ({snippet['id']}){extension}"
+        self.used_paths.add(path.lower())
+        return path
+
+    def export(self):
+        """
+        Runs the export.
+
+        Returns:
+            int: The number of snippets written.
+        """
+        self.used_paths = set()
+        db_connection = DatabaseConnection(self.db_file)
+        try:
+            model = ApplicationModel(db_connection)
+            snippets = model.iter_snippets(self.selection, batch_size=self.batch_size)
+            if self.archive:
+                count = self.export_to_zip(snippets)
+            else:
+                count = self.export_to_directory(snippets)
+        finally:
+            db_connection.close_connection()
+
+        logger.info(f"Exported {count} snippets to {self.destination}")
+        return count
+
+    def export_to_directory(self, snippets):
+        """
+        Writes each snippet to its own source file below the destination directory.
+
+        Args:
+            snippets (iterable): The snippets to write.
+
+        Returns:
+            int: The number of snippets written.
+        """
+        count = 0
+        created_dirs = set()
+        for snippet in snippets:
+            file_path = os.path.join(self.destination, *self.relative_path(snippet).split("/"))
+            directory = os.path.dirname(file_path)
+            if directory not in created_dirs:
+                os.makedirs(directory, exist_ok=True)
+                created_dirs.add(directory)
+
+            with open(file_path, "w", encoding="utf-8", newline="") as file:
+                file.write(snippet["code"])
+
+            count += 1
+        return count
+
+    def export_to_zip(self, snippets):
+        """
+        Writes each snippet as a member of a zip archive.
+
+        Args:
+            snippets (iterable): The snippets to write.
+
+        Returns:
+            int: The number of snippets written.
+        """
+        count = 0
+        with zipfile.ZipFile(self.destination, "w", compression=self.compression,
+                             compresslevel=self.compresslevel) as archive:
+            for snippet in snippets:
+                archive.writestr(self.relative_path(snippet), snippet["code"].encode("utf-8"))
+
+                count += 1
+        return count
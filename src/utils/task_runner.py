@@ -0,0 +1,142 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import itertools
+import queue
+import threading
+
+from src.utils.custom_logger import CustomLogger
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+
+class TaskRunner:
+    """
+    Runs work on background threads and delivers the results on the Tk thread.
+
+    Tk widgets may only be touched from the thread running the main loop, so workers never call back
+    into the UI directly. They put their results on a thread-safe queue, which the Tk thread drains
+    with after() while any task is still outstanding.
+
+    Tasks can be submitted under a key. Submitting a new task under the same key makes the result of
+    the previous one stale, and stale results are dropped instead of delivered, so a burst of requests
+    only ever shows the answer to the latest one.
+
+    Attributes:
+        root (tk.Misc): The widget whose after() schedules the queue polling.
+        poll_interval (int): The delay between two polls of the result queue, in milliseconds.
+    """
+
+    def __init__(self, root, poll_interval=30):
+        """
+        Initializes the TaskRunner.
+
+        Args:
+            root (tk.Misc): The widget whose after() schedules the queue polling.
+            poll_interval (int): The delay between two polls of the result queue, in milliseconds.
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.results = queue.Queue()
+        self.latest = {}
+        self.pending = 0
+        self.poll_job = None
+        self.tickets = itertools.count(1)
+
+    def submit(self, func, *args, callback=None, error_callback=None, key=None):
+        """
+        Runs `func(*args)` on a new daemon thread.
+
+        Must be called from the Tk thread.
+
+        Args:
+            func (callable): The work to run in the background. It must not touch any widget.
+            *args: The arguments passed to `func`.
+            callback (callable, optional): Called on the Tk thread with the return value of `func`.
+            error_callback (callable, optional): Called on the Tk thread with the exception raised by
+                `func`. Errors are logged when this is not given.
+            key (str, optional): Makes results of earlier tasks submitted under the same key stale.
+
+        Returns:
+            int: The ticket of the task.
+        """
+        ticket = next(self.tickets)
+        if key is not None:
+            self.latest[key] = ticket
+        threading.Thread(target=self.run_task, args=(ticket, key, func, args, callback, error_callback),
+                         daemon=True).start()
+        self.pending += 1
+        if self.poll_job is None:
+            self.poll_job = self.root.after(self.poll_interval, self.poll)
+        return ticket
+
+    def cancel(self, key):
+        """
+        Drops the result of the outstanding task submitted under `key`, if any.
+
+        The task itself runs to completion, but nothing is delivered for it.
+
+        Args:
+            key (str): The key the task was submitted under.
+        """
+        self.latest.pop(key, None)
+
+    def run_task(self, ticket, key, func, args, callback, error_callback):
+        """Worker thread body: runs the task and queues its outcome for the Tk thread."""
+        try:
+            self.results.put((ticket, key, callback, error_callback, func(*args), None))
+        except Exception as error:
+            self.results.put((ticket, key, callback, error_callback, None, error))
+
+    def poll(self):
+        """Delivers finished results on the Tk thread and keeps polling while tasks are outstanding."""
+        self.poll_job = None
+        try:
+            while True:
+                try:
+                    ticket, key, callback, error_callback, result, error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                self.pending -= 1
+                if key is not None and self.latest.get(key) != ticket:
+                    continue  # A newer task under the same key superseded this one
+                if key is not None:
+                    del self.latest[key]
+                self.deliver(callback, error_callback, result, error)
+        finally:
+            if self.pending > 0:
+                self.poll_job = self.root.after(self.poll_interval, self.poll)
+
+    def deliver(self, callback, error_callback, result, error):
+        """Hands the outcome of a task to its callback, logging a callback that fails instead of stopping."""
+        try:
+            if error is not None:
+                if error_callback is not None:
+                    error_callback(error)
+                else:
+                    logger.error(f"Background task failed: {error}")
+            elif callback is not None:
+                callback(result)
+        except Exception as callback_error:
+            logger.error(f"Handling the result of a background task failed: {callback_error}")
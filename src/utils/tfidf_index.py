@@ -0,0 +1,331 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+# Identifiers are split into their camelCase, PascalCase and snake_case parts, so "parseJsonFile" and
+# "parse_json" share the terms "parse" and "json"
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+WORD_PART_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+")
+
+# Title words describe what a snippet is about better than the identifiers in its body
+TITLE_TERM_WEIGHT = 3
+
+# Edited documents are scored separately from the compacted matrix until there are this many of them,
+# or this share of the index, after which the matrix is rebuilt
+MIN_PENDING_BEFORE_REBUILD = 256
+PENDING_SHARE_BEFORE_REBUILD = 0.05
+
+
+def extract_terms(title, code, stop_words=frozenset()):
+    """
+    Counts the terms of a snippet, taken from its title and the identifiers in its code.
+
+    Args:
+        title (str): The title of the snippet. Its terms count TITLE_TERM_WEIGHT times.
+        code (str): The code of the snippet.
+        stop_words (set): Lower-case terms to leave out, such as language keywords.
+
+    Returns:
+        collections.Counter: Maps each lower-case term to its weighted count.
+    """
+    counts = Counter()
+    for weight, text in ((TITLE_TERM_WEIGHT, title or ""), (1, code or "")):
+        for identifier in IDENTIFIER_PATTERN.findall(text):
+            parts = WORD_PART_PATTERN.findall(identifier)
+            terms = {identifier.lower(), *(part.lower() for part in parts)}
+            for term in terms:
+                if len(term) > 1 and term not in stop_words:
+                    counts[term] += weight
+    return counts
+
+
+class TfidfIndex:
+    """
+    An in-memory TF-IDF index over snippets with cosine top-k retrieval.
+
+    Documents are kept as sparse rows of (term id, count). For querying they are compacted into a
+    column-major sparse matrix of L2-normalized TF-IDF weights held in NumPy arrays, so scoring a query
+    against the whole library is one weighted bincount over the postings of the query's terms.
+
+    Edits do not rebuild the matrix. An edited or new document masks its old row and is scored on its
+    own until enough edits pile up, and only then is the matrix compacted again. IDF values of the
+    compacted rows are refreshed at that point.
+
+    All public methods are thread-safe. The first load reads the whole library without holding the lock.
+    Edits made meanwhile are deferred and replayed once the loaded documents are in place, so an edit
+    committed after the load read its rows is not lost, and the thread making it never waits for the load.
+
+    Attributes:
+        labels (dict): Maps each snippet ID to its (title, language) for display.
+        loaded (bool): True once the index has been filled from the database.
+        loading (bool): True while a thread is reading the library to fill the index.
+    """
+
+    def __init__(self):
+        """Initializes an empty index."""
+        self.lock = threading.RLock()
+        self.load_finished = threading.Condition(self.lock)
+        self.loaded = False
+        self.loading = False
+        self.deferred = []
+        self.clear()
+
+    @property
+    def active(self):
+        """bool: Whether the index is loaded or being loaded, so edits to the library must reach it."""
+        return self.loaded or self.loading
+
+    def start_loading(self):
+        """
+        Claims the first load of the index for the calling thread, waiting for a load another thread is
+        running to finish first.
+
+        Returns:
+            bool: True if the caller must read the library and pass it to load, or call cancel_loading if
+                that fails. False if the index is loaded already.
+        """
+        with self.lock:
+            while self.loading:
+                self.load_finished.wait()
+            if self.loaded:
+                return False
+            self.loading = True
+            self.deferred = []
+            return True
+
+    def cancel_loading(self):
+        """Gives up a load claimed with start_loading, dropping the edits deferred meanwhile."""
+        with self.lock:
+            self.loading = False
+            self.deferred = []
+            self.load_finished.notify_all()
+
+    def clear(self):
+        """Removes every document from the index."""
+        with self.lock:
+            self.term_ids = {}
+            self.documents = {}
+            self.labels = {}
+            self.row_ids = np.empty(0, dtype=np.int64)
+            self.row_of = {}
+            self.removed = np.empty(0, dtype=bool)
+            self.pending = set()
+            self.idf = np.empty(0, dtype=np.float64)
+            self.column_indptr = np.zeros(1, dtype=np.int64)
+            self.column_rows = np.empty(0, dtype=np.int64)
+            self.column_weights = np.empty(0, dtype=np.float64)
+
+    def load(self, entries):
+        """
+        Replaces the contents of the index with a full set of documents and compacts them. Edits deferred
+        while the entries were read are applied on top of them.
+
+        Args:
+            entries (iterable): (snippet_id, term_counts, title, language) tuples.
+        """
+        with self.lock:
+            self.clear()
+            for snippet_id, term_counts, title, language in entries:
+                self.documents[snippet_id] = self.encode(term_counts)
+                self.labels[snippet_id] = (title, language)
+            for operation, snippet_id, args in self.deferred:
+                if operation == 'set':
+                    term_counts, title, language = args
+                    self.documents[snippet_id] = self.encode(term_counts)
+                    self.labels[snippet_id] = (title, language)
+                elif operation == 'remove':
+                    self.documents.pop(snippet_id, None)
+                    self.labels.pop(snippet_id, None)
+                elif snippet_id in self.labels:
+                    self.labels[snippet_id] = args
+            self.deferred = []
+            self.rebuild()
+            self.loaded = True
+            self.loading = False
+            self.load_finished.notify_all()
+
+    def encode(self, term_counts):
+        """Turns a term count mapping into parallel arrays of term ids and counts."""
+        ids = np.fromiter((self.term_ids.setdefault(term, len(self.term_ids)) for term in term_counts),
+                          dtype=np.int64, count=len(term_counts))
+        counts = np.fromiter(term_counts.values(), dtype=np.float64, count=len(term_counts))
+        return ids, counts
+
+    def set_document(self, snippet_id, term_counts, title, language):
+        """
+        Adds a document to the index, or replaces it if it is already indexed.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            term_counts (dict): Maps each term to its count, as returned by extract_terms.
+            title (str): The title of the snippet, kept for display.
+            language (str): The language of the snippet, kept for display.
+        """
+        with self.lock:
+            if self.loading:
+                self.deferred.append(('set', snippet_id, (term_counts, title, language)))
+                return
+            self.documents[snippet_id] = self.encode(term_counts)
+            self.labels[snippet_id] = (title, language)
+            self.mark_pending(snippet_id)
+
+    def remove_document(self, snippet_id):
+        """
+        Removes a document from the index.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+        """
+        with self.lock:
+            if self.loading:
+                self.deferred.append(('remove', snippet_id, None))
+                return
+            self.documents.pop(snippet_id, None)
+            self.labels.pop(snippet_id, None)
+            self.mark_pending(snippet_id)
+
+    def relabel_document(self, snippet_id, title, language):
+        """
+        Changes the title and language shown for an indexed document, leaving its terms as they are.
+
+        Args:
+            snippet_id (int): The ID of the snippet.
+            title (str): The title of the snippet.
+            language (str): The language of the snippet.
+        """
+        with self.lock:
+            if self.loading:
+                self.deferred.append(('relabel', snippet_id, (title, language)))
+            elif snippet_id in self.labels:
+                self.labels[snippet_id] = (title, language)
+
+    def mark_pending(self, snippet_id):
+        """Masks the compacted row of an edited document and schedules a rebuild if too many piled up."""
+        row = self.row_of.get(snippet_id)
+        if row is not None:
+            self.removed[row] = True
+        self.pending.add(snippet_id)
+        if len(self.pending) > max(MIN_PENDING_BEFORE_REBUILD, PENDING_SHARE_BEFORE_REBUILD * len(self.row_ids)):
+            self.rebuild()
+
+    def rebuild(self):
+        """Compacts every document into a fresh column-major matrix of normalized TF-IDF weights."""
+        with self.lock:
+            snippet_ids = list(self.documents)
+            lengths = np.fromiter((self.documents[snippet_id][0].size for snippet_id in snippet_ids),
+                                  dtype=np.int64, count=len(snippet_ids))
+            if snippet_ids:
+                terms = np.concatenate([self.documents[snippet_id][0] for snippet_id in snippet_ids])
+                counts = np.concatenate([self.documents[snippet_id][1] for snippet_id in snippet_ids])
+            else:
+                terms = np.empty(0, dtype=np.int64)
+                counts = np.empty(0, dtype=np.float64)
+            rows = np.repeat(np.arange(len(snippet_ids), dtype=np.int64), lengths)
+
+            document_frequency = np.bincount(terms, minlength=len(self.term_ids))
+            self.idf = np.log((1 + len(snippet_ids)) / (1 + document_frequency)) + 1.0
+
+            weights = (1.0 + np.log(counts)) * self.idf[terms]
+            norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(snippet_ids)))
+            weights /= np.where(norms > 0, norms, 1.0)[rows]
+
+            order = np.argsort(terms, kind="stable")
+            self.column_rows = rows[order]
+            self.column_weights = weights[order]
+            self.column_indptr = np.concatenate(([0], np.cumsum(np.bincount(terms, minlength=len(self.term_ids)))))
+
+            self.row_ids = np.asarray(snippet_ids, dtype=np.int64)
+            self.row_of = {snippet_id: row for row, snippet_id in enumerate(snippet_ids)}
+            self.removed = np.zeros(len(snippet_ids), dtype=bool)
+            self.pending = set()
+
+    def document_vector(self, snippet_id):
+        """Returns the term ids and normalized TF-IDF weights of a document, using the current IDF."""
+        ids, counts = self.documents[snippet_id]
+        # Terms that first appeared after the last rebuild are rare by definition, give them the top IDF
+        idf = np.full(ids.size, np.log(1 + self.row_ids.size) + 1.0)
+        known = ids < self.idf.size
+        idf[known] = self.idf[ids[known]]
+        weights = (1.0 + np.log(counts)) * idf
+        norm = np.sqrt(np.dot(weights, weights))
+        return ids, weights / norm if norm > 0 else weights
+
+    def most_similar(self, snippet_id, k=10):
+        """
+        Finds the documents most similar to one document by cosine similarity.
+
+        Args:
+            snippet_id (int): The ID of the snippet to compare against.
+            k (int): The maximum number of results.
+
+        Returns:
+            list: (snippet_id, similarity) tuples, most similar first. Empty when the snippet is not
+            indexed or shares no terms with any other snippet.
+        """
+        with self.lock:
+            if snippet_id not in self.documents:
+                return []
+            all_query_ids, all_query_weights = self.document_vector(snippet_id)
+            known = all_query_ids < self.column_indptr.size - 1
+            query_ids, query_weights = all_query_ids[known], all_query_weights[known]
+
+            # Score the compacted rows through the postings of every query term at once
+            starts = self.column_indptr[query_ids]
+            ends = self.column_indptr[query_ids + 1]
+            lengths = ends - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            scores = np.bincount(self.column_rows[positions],
+                                 weights=self.column_weights[positions] * np.repeat(query_weights, lengths),
+                                 minlength=self.row_ids.size)
+            scores[self.removed] = 0.0
+            own_row = self.row_of.get(snippet_id)
+            if own_row is not None:
+                scores[own_row] = 0.0
+
+            candidates = []
+            if scores.size:
+                top = min(k, scores.size)
+                best_rows = np.argpartition(-scores, top - 1)[:top]
+                candidates = [(int(self.row_ids[row]), float(scores[row])) for row in best_rows if scores[row] > 0]
+
+            # Edited and new documents are not in the compacted matrix yet, score them one by one
+            query = dict(zip(all_query_ids.tolist(), all_query_weights.tolist()))
+            for other_id in self.pending:
+                if other_id == snippet_id or other_id not in self.documents:
+                    continue
+                other_ids, other_weights = self.document_vector(other_id)
+                score = sum(query.get(term, 0.0) * weight for term, weight in zip(other_ids.tolist(),
+                                                                                  other_weights.tolist()))
+                if score > 0:
+                    candidates.append((other_id, score))
+
+            return sorted(candidates, key=lambda candidate: candidate[1], reverse=True)[:k]
+
+
+# Creating a singleton instance of TfidfIndex to be used across the application.
+tfidf_index = TfidfIndex()
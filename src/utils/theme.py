@@ -70,12 +70,93 @@ def load_theme(theme_name):
         return {}  # Return an empty theme in case of error
 
 
+def style_name_for(widget_style):
+    """
+    Returns the ttk style a theme's settings for a widget style are applied to.
+
+    Args:
+        widget_style (str): The key of the settings under "ttkStyles".
+    """
+    return widget_style + ".TButton" if widget_style != "TButton" else "TButton"
+
+
+def freeze_value(value):
+    """Turns the lists of a theme value, such as fonts and paddings, into tuples, so values compare and hash."""
+    if isinstance(value, list):
+        return tuple(freeze_value(item) for item in value)
+    return value
+
+
+def compile_theme(theme):
+    """
+    Turns a theme into the settings ready to hand to ttk.Style, so applying it does no conversion work.
+
+    Args:
+        theme (dict): The theme, as loaded from its JSON file.
+
+    Returns:
+        dict: The window "background" and the "styles", mapping each ttk style name to a
+            (configure, map) pair. `configure` maps options to values, and `map` maps options to tuples
+            of (state, value) pairs.
+    """
+    styles = {}
+    for widget_style, settings in theme.get('ttkStyles', {}).items():
+        configure = {option: freeze_value(value) for option, value in settings.get('configure', {}).items()}
+        state_map = {option: tuple((state, freeze_value(value)) for state_dict in values
+                                   for state, value in state_dict.items())
+                     for option, values in settings.get('map', {}).items()}
+        styles[style_name_for(widget_style)] = (configure, state_map)
+    return {
+        'background': theme.get('colors', {}).get('background'),
+        'styles': styles
+    }
+
+
+def diff_compiled_themes(active, target, defaults=None):
+    """
+    Lists the style changes that turn one compiled theme into another.
+
+    Options only the active theme sets are put back to the value they had before any theme set them,
+    as recorded in `defaults`. Options with no recorded value are reset to an empty value, or an empty
+    state map.
+
+    Args:
+        active (dict | None): The compiled theme applied now, or None if none is.
+        target (dict): The compiled theme to apply.
+        defaults (dict, optional): The original (configure, map) values of the styles, by style name, in
+            the same form as the styles of a compiled theme.
+
+    Returns:
+        list: (style name, configure changes, map changes) triples, for the styles that change.
+    """
+    active_styles = active['styles'] if active else {}
+    defaults = defaults or {}
+    changes = []
+    dropped = [style_name for style_name in active_styles if style_name not in target['styles']]
+    for style_name in [*target['styles'], *dropped]:
+        old_configure, old_map = active_styles.get(style_name, ({}, {}))
+        new_configure, new_map = target['styles'].get(style_name, ({}, {}))
+        default_configure, default_map = defaults.get(style_name, ({}, {}))
+        configure = {option: value for option, value in new_configure.items() if old_configure.get(option) != value}
+        configure.update((option, default_configure.get(option, ''))
+                         for option in old_configure.keys() - new_configure.keys())
+        state_map = {option: states for option, states in new_map.items() if old_map.get(option) != states}
+        state_map.update((option, default_map.get(option, ()))
+                         for option in old_map.keys() - new_map.keys())
+        if configure or state_map:
+            changes.append((style_name, configure, state_map))
+    return changes
+
+
 class ThemeManager:
     """Manages application themes, including loading and applying themes."""
 
     def __init__(self):
         """Initializes the ThemeManager with the current theme."""
         self.current_theme = {}
+        self.current_theme_name = None
+        # Compiled themes by name, each with the modification time of the file it was compiled from
+        self.compiled_themes = {}
         self.apply_theme()
 
     def apply_theme(self):
@@ -85,8 +166,41 @@ class ThemeManager:
         user_preferences = ConfigurationManager("preferences_config")
 
         user_theme = user_preferences.get_configuration("theme", "light_theme")
+        self.current_theme_name = user_theme
         self.current_theme = load_theme(user_theme)
 
+    def set_theme(self, theme_name):
+        """
+        Makes a theme the current one and saves it as the user's selected theme.
+
+        Args:
+            theme_name (str): The name of the theme.
+        """
+        user_preferences = ConfigurationManager("preferences_config")
+        user_preferences.set_configuration("theme", theme_name)
+        self.current_theme_name = theme_name
+        self.current_theme = load_theme(theme_name)
+
+    def get_compiled_theme(self):
+        """
+        Returns the current theme compiled for ttk.Style. Compiled themes are cached until their file
+        changes.
+
+        Returns:
+            dict: The compiled theme, as returned by compile_theme().
+        """
+        theme_path = get_file_path(f"{self.current_theme_name}.json", "themes", "CodeKeeper")
+        modified = os.stat(theme_path).st_mtime_ns if os.path.exists(theme_path) else None
+        cached = self.compiled_themes.get(self.current_theme_name)
+        if cached is not None and cached[0] == modified:
+            return cached[1]
+        if cached is not None:
+            # The file changed since it was compiled
+            self.current_theme = load_theme(self.current_theme_name)
+        compiled = compile_theme(self.current_theme)
+        self.compiled_themes[self.current_theme_name] = (modified, compiled)
+        return compiled
+
     def get_current_theme(self):
         """
         Returns the currently applied theme.
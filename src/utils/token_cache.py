@@ -0,0 +1,231 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import hashlib
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+
+from src.utils.constants import DEFAULT_SUBDIR, TOKEN_CACHE_MAX_BYTES
+from src.utils.custom_logger import CustomLogger
+from src.utils.path_utils import get_file_path
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+# Starts a cache file, followed by the number of spans
+HEADER = struct.Struct('<4sQ')
+MAGIC = b'TSP1'
+# Bytes a span takes on disk: its start and end offsets and its kind
+SPAN_BYTES = 2 * array('q').itemsize + array('B').itemsize
+
+
+class TokenCache:
+    """
+    A persistent LRU cache of the token spans of highlighted code, bounded by the bytes it takes on disk.
+
+    Entries are keyed by the language, the version of its grammar and the SHA-1 of the code, so code
+    that was edited, or highlighted under rules that changed since, misses the cache instead of getting
+    stale spans. Each entry is a file holding the start, end and kind arrays of the spans as raw bytes,
+    which load straight back into arrays.
+
+    The order of use is kept in the modification times of the files, touched on every hit, so it
+    survives restarts. The files are listed the first time the cache is used.
+
+    All public methods are thread-safe.
+
+    Attributes:
+        max_bytes (int): The disk budget for cached spans.
+        disabled (bool): Whether the cache folder could not be used, so every lookup misses.
+        size (int): The bytes held by the cached spans.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=TOKEN_CACHE_MAX_BYTES):
+        """
+        Initializes the TokenCache.
+
+        Args:
+            cache_dir (str, optional): The folder of the cache files. Defaults to the "tokens" folder in the
+                cache folder of the user's application folder.
+            max_bytes (int): The disk budget for cached spans.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.entries = None
+        self.disabled = False
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def key(language, grammar_version, code):
+        """
+        Returns the key of the spans of a piece of code.
+
+        Args:
+            language (str): The syntax rule file the code is highlighted with.
+            grammar_version (str): The version of the compiled grammar.
+            code (str): The code.
+        """
+        digest = hashlib.sha1(code.encode('utf-8', 'surrogatepass')).hexdigest()
+        return f"{language}-{grammar_version}-{digest}"
+
+    def load_entries(self):
+        """
+        Lists the cache files, least recently used first, the first time the cache is used. A folder
+        that cannot be created or read leaves the cache empty, so every lookup misses.
+        """
+        if self.entries is not None:
+            return
+        files = []
+        try:
+            if self.cache_dir is None:
+                self.cache_dir = os.path.join(os.path.dirname(get_file_path("", "cache", DEFAULT_SUBDIR)), "tokens")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.tok'):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, entry.name[:-4], stat.st_size))
+        except OSError as e:
+            logger.warning(f"Token cache folder {self.cache_dir} is not usable: {e}")
+            self.disabled = True
+            files = []
+        files.sort()
+        self.entries = OrderedDict((key, size) for _, key, size in files)
+        self.size = sum(self.entries.values())
+
+    def path(self, key):
+        """Returns the file the spans of a key are cached in."""
+        return os.path.join(self.cache_dir, f"{key}.tok")
+
+    def get(self, key):
+        """
+        Returns the cached spans of a key.
+
+        Args:
+            key (str): The key, as key() returns it.
+
+        Returns:
+            tuple | None: The start, end and kind arrays of the spans, or None on a miss.
+        """
+        with self.lock:
+            try:
+                self.load_entries()
+                if self.disabled or key not in self.entries:
+                    self.misses += 1
+                    return None
+                path = self.path(key)
+                with open(path, 'rb') as file:
+                    data = file.read()
+                magic, count = HEADER.unpack_from(data)
+                if magic != MAGIC or len(data) != HEADER.size + count * SPAN_BYTES:
+                    raise ValueError("malformed cache file")
+                os.utime(path)
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Dropping cached token spans {key}: {e}")
+                self.discard(key)
+                self.misses += 1
+                return None
+
+            starts, ends, kinds = array('q'), array('q'), array('B')
+            offset = HEADER.size
+            for values in (starts, ends, kinds):
+                length = count * values.itemsize
+                values.frombytes(data[offset:offset + length])
+                offset += length
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return starts, ends, kinds
+
+    def put(self, key, starts, ends, kinds):
+        """
+        Caches the spans of a key, evicting the least recently used spans to stay within budget.
+
+        Args:
+            key (str): The key, as key() returns it.
+            starts (array): The start offset of each span, an array of type 'q'.
+            ends (array): The end offset of each span, an array of type 'q'.
+            kinds (array): The kind of each span, an array of type 'B'.
+        """
+        size = HEADER.size + len(starts) * SPAN_BYTES
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            self.load_entries()
+            if self.disabled:
+                return
+            try:
+                path = self.path(key)
+                # Written under a temporary name first, so a crash never leaves a half-written file
+                temporary_path = f"{path}.{os.getpid()}.tmp"
+                with open(temporary_path, 'wb') as file:
+                    file.write(HEADER.pack(MAGIC, len(starts)))
+                    for values in (starts, ends, kinds):
+                        values.tofile(file)
+                os.replace(temporary_path, path)
+            except OSError as e:
+                logger.warning(f"Could not cache token spans {key}: {e}")
+                return
+            self.size += size - self.entries.pop(key, 0)
+            self.entries[key] = size
+            while self.size > self.max_bytes:
+                self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        """
+        Deletes the cached spans of a key.
+
+        Args:
+            key (str): The key.
+        """
+        with self.lock:
+            if self.entries is not None:
+                self.size -= self.entries.pop(key, 0)
+            if self.disabled:
+                return
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: "hits", "misses", "hit_rate", "entries", "size" and "max_bytes".
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self.entries or ()), "size": self.size, "max_bytes": self.max_bytes}
+
+
+# Shared by every highlighter, so spans computed for one view are reused by the others
+token_cache = TokenCache()
@@ -0,0 +1,194 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import queue
+import threading
+
+from src.db.connection import DatabaseConnection
+from src.models.application_model import ApplicationModel
+from src.utils.constants import TREE_LOAD_BATCH_SIZE, TREE_LAZY_THRESHOLD
+from src.utils.custom_logger import CustomLogger
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+
+class TreeLoader:
+    """
+    Loads the snippet tree data on a worker thread and streams it to the Tk thread in chunks.
+
+    The worker reads the languages and categories first, then the snippets in batches, and puts each
+    on a thread-safe queue. The Tk thread drains the queue with after(), handing over one chunk per
+    poll so the window keeps painting and responding between chunks.
+
+    A load can be cancelled, and starting a new one cancels the one in progress. Every load has its
+    own generation number, and chunks still queued from an older generation are dropped.
+
+    Libraries larger than the lazy threshold are not streamed at all: the load stops after the languages
+    and categories, and the tree fills each category when it is opened.
+
+    Attributes:
+        root (tk.Misc): The widget whose after() schedules the queue polling.
+        db_file (str): The database file the worker opens its own connection to.
+        on_categories (callable): Called with the rows of ApplicationModel.get_treeview_categories, the
+            total number of snippets and whether the tree is filled lazily.
+        on_snippets (callable): Called with each batch of snippet rows and the number loaded so far.
+        on_done (callable): Called once every snippet has been handed over.
+        on_error (callable): Called with the exception if the load fails.
+    """
+
+    def __init__(self, root, db_file, on_categories, on_snippets, on_done, on_error=None,
+                 batch_size=TREE_LOAD_BATCH_SIZE, poll_interval=30, lazy_threshold=TREE_LAZY_THRESHOLD):
+        """
+        Initializes the TreeLoader.
+
+        Args:
+            root (tk.Misc): The widget whose after() schedules the queue polling.
+            db_file (str): The database file the worker opens its own connection to.
+            on_categories (callable): Receives the category rows, the total number of snippets and whether
+                the tree is filled lazily.
+            on_snippets (callable): Receives each batch of snippet rows and the number loaded so far.
+            on_done (callable): Called once every snippet has been handed over.
+            on_error (callable, optional): Receives the exception if the load fails.
+            batch_size (int): The number of snippets per chunk.
+            poll_interval (int): The delay between two polls of an empty queue, in milliseconds.
+            lazy_threshold (int): The number of snippets above which the snippets are not streamed.
+        """
+        self.root = root
+        self.db_file = db_file
+        self.on_categories = on_categories
+        self.on_snippets = on_snippets
+        self.on_done = on_done
+        self.on_error = on_error
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lazy_threshold = lazy_threshold
+        # Bounded, so a worker reading faster than the tree fills up waits instead of buffering the library
+        self.chunks = queue.Queue(maxsize=8)
+        self.generation = 0
+        self.cancel_event = None
+        self.poll_job = None
+
+    @property
+    def running(self):
+        """bool: Whether a load is in progress."""
+        return self.cancel_event is not None
+
+    def start(self):
+        """
+        Starts loading the tree data, cancelling any load already in progress.
+
+        Must be called from the Tk thread.
+        """
+        self.cancel()
+        self.generation += 1
+        self.cancel_event = threading.Event()
+        threading.Thread(target=self.run, args=(self.generation, self.cancel_event), daemon=True).start()
+        if self.poll_job is None:
+            self.poll_job = self.root.after(self.poll_interval, self.poll)
+
+    def cancel(self):
+        """
+        Cancels the load in progress, if any. Chunks it has already queued are dropped.
+        """
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_event = None
+
+    def run(self, generation, cancel_event):
+        """Worker thread body: reads the tree data and queues it chunk by chunk."""
+        db_connection = DatabaseConnection(self.db_file)
+        try:
+            model = ApplicationModel(db_connection)
+            total = model.count_snippets()
+            lazy = total > self.lazy_threshold
+            if not self.put(cancel_event, (generation, 'categories', (model.get_treeview_categories(), total, lazy))):
+                return
+            loaded = 0
+            if not lazy:
+                for rows in model.iter_treeview_snippets(self.batch_size):
+                    loaded += len(rows)
+                    if not self.put(cancel_event, (generation, 'snippets', (rows, loaded))):
+                        return
+            self.put(cancel_event, (generation, 'done', ()))
+        except Exception as error:
+            self.put(cancel_event, (generation, 'error', (error,)))
+        finally:
+            db_connection.close_connection()
+
+    def put(self, cancel_event, chunk):
+        """
+        Queues a chunk for the Tk thread, waiting for room unless the load is cancelled meanwhile.
+
+        Returns:
+            bool: False if the load was cancelled.
+        """
+        while not cancel_event.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def poll(self):
+        """Hands the next chunk of the current load to its callback on the Tk thread."""
+        self.poll_job = None
+        delay = self.poll_interval
+        try:
+            while True:
+                try:
+                    generation, kind, args = self.chunks.get_nowait()
+                except queue.Empty:
+                    break
+                if generation != self.generation or self.cancel_event is None:
+                    continue  # Left over from a cancelled or superseded load
+                if kind in ('done', 'error'):
+                    self.cancel_event = None
+                # Let the window paint and handle input before the next chunk
+                delay = 1
+                self.dispatch(kind, args)
+                break
+        finally:
+            if self.running or not self.chunks.empty():
+                self.poll_job = self.root.after(delay, self.poll)
+
+    def dispatch(self, kind, args):
+        """
+        Hands a chunk to its callback. A callback that fails cancels the load, as the tree would be left
+        missing whatever it did not get to, and the error is logged instead of escaping the Tk callback.
+        """
+        try:
+            if kind == 'categories':
+                self.on_categories(*args)
+            elif kind == 'snippets':
+                self.on_snippets(*args)
+            elif kind == 'done':
+                self.on_done()
+            elif self.on_error is not None:
+                self.on_error(*args)
+            else:
+                logger.error(f"Loading the snippet tree failed: {args[0]}")
+        except Exception as error:
+            logger.error(f"Handling the loaded snippet tree data failed: {error}")
+            self.cancel()
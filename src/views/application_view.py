@@ -26,11 +26,17 @@ from ctypes import windll
 import tkinter
 import tkinter as tk
 from tkinter import ttk, messagebox, PhotoImage, Toplevel
-from PIL import Image, ImageTk
-from src.utils.theme import theme_manager
+from src.syntax_highlighting.highlighter import Highlighter
+from src.syntax_highlighting.lexer import syntax_name_for
+from src.utils.theme import theme_manager, diff_compiled_themes
 from src.utils.constants import MAIN_WINDOW_SIZE, APPLICATION_NAME, IMAGES_DIR
 from src.utils.custom_logger import CustomLogger
+from src.utils.image_cache import ImageCache
+from src.utils.task_runner import TaskRunner
 from src.views.menu_manager import MenuManager
+from src.views.code_viewer import CodeViewer
+from src.views.node_index import NodeIndex
+from src.views.tree_inserter import TreeInserter
 
 # Instantiate the logger
 logger = CustomLogger(__name__).logger
@@ -87,6 +93,14 @@ class ApplicationView:
         self.callbacks = controller_callbacks
         self.app = tk.Tk()
         self.style = ttk.Style(self.app)
+        # The compiled theme the styles were last set from, so a theme switch only applies what changed
+        self.applied_theme = None
+        # The values the styles and the window background had before a theme first set them, restored
+        # when a theme no longer sets them
+        self.style_defaults = {}
+        self.default_background = None
+        # Resized title bar images, rendered once and reused by later starts
+        self.image_cache = ImageCache(self.app, TaskRunner(self.app))
         self.initialize_ui()
 
     # UI Initialization
@@ -136,40 +150,50 @@ class ApplicationView:
         """
         Applies the currently selected theme to the application's UI elements.
 
-        This method retrieves the current theme settings from the ThemeManager and applies these settings
-        to various UI components of the application, such as background colors, fonts, and other stylistic elements.
-        It ensures that the application's appearance is consistent with the user's theme preferences.
+        This method retrieves the current theme, compiled into ready-to-apply style settings, from the
+        ThemeManager and applies these settings to various UI components of the application, such as
+        background colors, fonts, and other stylistic elements. Only the styles whose settings differ from
+        the theme applied before are touched, so switching themes is instant and rebuilds no widgets.
         """
         logger.info("Applying current theme")
         # Access the current theme from theme_manager
-        current_theme = theme_manager.get_current_theme()
+        compiled_theme = theme_manager.get_compiled_theme()
+        applied_theme = self.applied_theme or {}
 
         # Apply theme to tk widgets
-        self.app.configure(background=current_theme['colors']['background'])
+        if self.default_background is None:
+            self.default_background = self.app.cget('background')
+        background = compiled_theme['background'] or self.default_background
+        if background != (applied_theme.get('background') or self.default_background):
+            self.app.configure(background=background)
+
+        # Apply theme to ttk widgets through styles
+        for style_name, configure, state_map in diff_compiled_themes(self.applied_theme, compiled_theme,
+                                                                     self.style_defaults):
+            try:
+                self.record_style_defaults(style_name, configure, state_map)
+                if configure:
+                    self.style.configure(style_name, **configure)
+                if state_map:
+                    self.style.map(style_name, **{option: list(states) for option, states in state_map.items()})
+            except Exception as e:
+                logger.error(f"Error applying theme to {style_name}: {e}")
+        self.applied_theme = compiled_theme
+
+    def record_style_defaults(self, style_name, configure, state_map):
+        """
+        Records the values a style has before a theme first sets its options, so they can be restored.
 
-        # Initialize a ttk Style
-        self.style = ttk.Style(self.app)
-
-        try:
-            # Apply theme to ttk widgets through styles
-            for widget_style, settings in current_theme['ttkStyles'].items():
-                style_name = widget_style + ".TButton" if widget_style != "TButton" else "TButton"
-                try:
-                    map_settings = settings.get('map', {})
-
-                    # Convert the 'map' settings back to the expected format (list of tuples)
-                    converted_map_settings = {
-                        key: [(state, value) for state_dict in values for state, value in state_dict.items()] for
-                        key, values in map_settings.items()}
-
-                    self.style.configure(style_name, **settings.get('configure', {}))
-                    self.style.map(style_name, **converted_map_settings)
-                except Exception as e:
-                    logger.error(f"Error applying theme to {style_name}: {e}")
-        except Exception as e:
-            logger.error(f"Error applying theme: {e}")
-            # Optionally, apply a default style or handle the error in a way that
-            # ensures the application remains usable.
+        Args:
+            style_name (str): The ttk style.
+            configure (dict): The configured options about to be set.
+            state_map (dict): The mapped options about to be set.
+        """
+        default_configure, default_map = self.style_defaults.setdefault(style_name, ({}, {}))
+        for option in configure.keys() - default_configure.keys():
+            default_configure[option] = self.style.lookup(style_name, option)
+        for option in state_map.keys() - default_map.keys():
+            default_map[option] = tuple(tuple(states) for states in self.style.map(style_name, option))
 
     def center_window(self, window):
         """
@@ -185,9 +209,9 @@ class ApplicationView:
     def setup_custom_title_bar(self):
         """Configures the custom title bar with minimize, maximize, and close buttons."""
         # Setup for minimize, maximize, and close buttons
-        self.minimize_img = self.load_image_with_pil(os.path.join(IMAGES_DIR, 'minimize-window-48.png'), width=16, height=16)
-        self.maximize_img = self.load_image_with_pil(os.path.join(IMAGES_DIR, 'maximize-window-48.png'), width=16, height=16)
-        self.close_img = self.load_image_with_pil(os.path.join(IMAGES_DIR, 'close-window-48.png'), width=16, height=16)
+        self.minimize_img = self.load_image(os.path.join(IMAGES_DIR, 'minimize-window-48.png'), width=16, height=16)
+        self.maximize_img = self.load_image(os.path.join(IMAGES_DIR, 'maximize-window-48.png'), width=16, height=16)
+        self.close_img = self.load_image(os.path.join(IMAGES_DIR, 'close-window-48.png'), width=16, height=16)
 
         self.title_bar = ttk.Frame(self.app, relief="raised")
         self.title_bar.pack(side="top", fill=tk.X)
@@ -214,12 +238,13 @@ class ApplicationView:
         """Updates the treeview with the provided list of snippets."""
         # Update UI elements based on new preferences
 
-    def display_snippet_code(self, code):
+    def display_snippet_code(self, code, language=None):
         """
-        Summary
+        Shows the code of the selected snippet, highlighted when its language has syntax rules. Large
+        snippets are inserted across idle slices or shown windowed, so they never freeze the window.
         """
-        self.code_text.delete('1.0', tk.END)  # Clear the current content
-        self.code_text.insert('1.0', code)  # Insert the new code
+        syntax_name = syntax_name_for(language) if language else None
+        self.code_viewer.show(code, Highlighter(syntax_name) if syntax_name else None)
 
     # Widget Creation and Layout
     def create_widgets(self):
@@ -247,10 +272,29 @@ class ApplicationView:
         treeview_label = ttk.Label(treeview_frame, text='Snippets')
         treeview_label.pack(side='top', pady=5)
 
+        # Filter box narrowing the treeview by snippet title as the user types
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(treeview_frame, textvariable=self.filter_var)
+        filter_entry.pack(side='top', fill='x', padx=5, pady=(0, 5))
+        filter_entry.bind('<Escape>', lambda event: self.filter_var.set(''))
+        self.filter_var.trace_add('write', self.on_filter_change)
+
+        self.filter_status_label = ttk.Label(treeview_frame, text='')
+        self.filter_status_label.pack(side='top', fill='x', padx=5)
+
         # Treeview for displaying snippets
         self.treeview = ttk.Treeview(treeview_frame)
         self.treeview.pack(side='top', fill='both', expand=True)
         self.treeview.bind('<<TreeviewSelect>>', self.on_selection_change)
+        self.treeview.bind('<<TreeviewOpen>>', self.on_tree_open)
+        # Every node in the treeview, so lookups by iid or by name never walk the tree
+        self.node_index = NodeIndex()
+        # Fills the treeview a slice at a time while the window keeps handling events
+        self.tree_inserter = TreeInserter(self.treeview, self.node_index)
+
+        # Progress of the background load of the library, shown only while it runs
+        self.load_status_label = ttk.Label(treeview_frame, text='')
+        self.load_progress = ttk.Progressbar(treeview_frame, mode='determinate')
 
         # Frame for code text
         code_text_frame = ttk.Frame(snippet_display_frame)
@@ -261,10 +305,28 @@ class ApplicationView:
         code_text_label.pack(side='top', pady=5)
 
         # Textblock for displaying code
+        code_scrollbar = ttk.Scrollbar(code_text_frame, orient='vertical')
+        code_scrollbar.pack(side='right', fill='y')
         self.code_text = tk.Text(code_text_frame)
         self.code_text.pack(side='top', fill='both', expand=True)
+        # Keeps large snippets from blocking the window while they are shown
+        self.code_viewer = CodeViewer(self.code_text, code_scrollbar)
+
+        # Frame for the snippets related to the selected one
+        related_frame = ttk.Frame(snippet_display_frame)
+        related_frame.pack(side='left', fill='y')
+
+        related_label = ttk.Label(related_frame, text='Related Snippets')
+        related_label.pack(side='top', pady=5)
+
+        self.related_snippet_ids = []
+        self.related_listbox = tk.Listbox(related_frame, width=30)
+        self.related_listbox.pack(side='top', fill='both', expand=True)
+        self.related_listbox.bind('<Double-1>', self.on_related_snippet_open)
 
         self.treeview.bind('<Button-1>', self.on_tree_click)
+        self.treeview.bind('<Button-3>', self.on_tree_context_menu)
+        self.treeview.bind('<Delete>', lambda event: self.callbacks["delete_snippet"]())
 
     # Window Management
     def minimize_window(self):
@@ -339,13 +401,9 @@ class ApplicationView:
         self.maximize_restore_window()
 
     # Helpers and Utilities Methods
-    def load_image_with_pil(self, path, width, height):
-        # Open the image file
-        img = Image.open(path)
-        # Resize it to the width and height specified using LANCZOS resampling
-        img = img.resize((width, height), Image.Resampling.LANCZOS)
-        # Convert to a format Tkinter can handle
-        return ImageTk.PhotoImage(img)
+    def load_image(self, path, width, height):
+        # Served from the image cache, so only a cache miss resamples the image, in the background
+        return self.image_cache.load(path, width, height)
 
     def print_style_info(self, widget_style):
         """
@@ -364,9 +422,26 @@ class ApplicationView:
         print("Background Color:", self.style.lookup(widget_style, 'background'))
         print("Foreground Color:", self.style.lookup(widget_style, 'foreground'))
 
+    def show_related_snippets(self, related):
+        """
+        Fills the related snippets panel.
+
+        Args:
+            related (list | None): Dictionaries with "id", "title" and "language", most similar first,
+                or None while the related snippets are still being looked up.
+        """
+        self.related_listbox.delete(0, tk.END)
+        self.related_snippet_ids = []
+        if related is None:
+            self.related_listbox.insert(tk.END, "Loading...")
+            return
+        for snippet in related:
+            self.related_listbox.insert(tk.END, f"{snippet['title']} ({snippet['language']})")
+            self.related_snippet_ids.append(snippet['id'])
+
     def clear_code_text(self):
         """Clears the contents of the code_text widget."""
-        self.code_text.delete('1.0', tk.END)
+        self.code_viewer.clear()
 
     def get_pos(self, event):
         """ summary """
@@ -398,6 +473,53 @@ class ApplicationView:
 
         self.last_clicked_item = item  # Update the last clicked item
 
+    def on_tree_context_menu(self, event):
+        """
+        Shows the bulk operations for the selected snippets, language and category nodes on right-click.
+
+        Right-clicking an item outside the selection selects that item alone first.
+        """
+        item = self.treeview.identify_row(event.y)
+        if not item:
+            return
+        if item not in self.treeview.selection():
+            self.treeview.selection_set(item)
+            self.last_clicked_item = item
+
+        targets = self.callbacks["get_bulk_targets"]()
+        menu = tk.Menu(self.treeview, tearoff=0)
+        menu.add_command(label="Duplicate", command=self.callbacks["duplicate_snippets"])
+
+        move_menu = tk.Menu(menu, tearoff=0)
+        for category_id, name in targets['categories']:
+            move_menu.add_command(label=name, command=lambda category_id=category_id:
+                                  self.callbacks["move_snippets"](category_id))
+        menu.add_cascade(label="Move to Category", menu=move_menu,
+                         state='normal' if targets['categories'] else 'disabled')
+
+        language_menu = tk.Menu(menu, tearoff=0)
+        for language_id, name in targets['languages']:
+            language_menu.add_command(label=name, command=lambda language_id=language_id:
+                                      self.callbacks["change_snippets_language"](language_id))
+        menu.add_cascade(label="Change Language", menu=language_menu,
+                         state='normal' if targets['languages'] else 'disabled')
+
+        menu.add_separator()
+        menu.add_command(label="Delete", command=self.callbacks["delete_snippet"])
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+
+    def on_tree_open(self, event=None):
+        """
+        Asks for the children of a node of a lazily filled tree the first time it is opened.
+        """
+        item = self.treeview.focus()
+        children = self.treeview.get_children(item) if item else ()
+        if children and children[0].startswith("placeholder-"):
+            self.callbacks["expand_tree_node"](item)
+
     def on_selection_change(self, event=None):
         """
         Called when the selection changes in the treeview. It updates the application
@@ -420,6 +542,41 @@ class ApplicationView:
             self.clear_code_text()
             self.last_selected_item = None  # Clear the last selected item tracking
 
+    def on_filter_change(self, *args):
+        """
+        Filters the treeview by the text in the filter box. Called on every keystroke.
+        """
+        query = self.filter_var.get()
+        if not query.strip():
+            self.filter_status_label.config(text='')
+        self.callbacks['filter_snippets'](query)
+
+    def show_filter_matches(self, shown, total):
+        """
+        Shows how many snippets match the filter.
+
+        Args:
+            shown (int): The number of matching snippets in the treeview.
+            total (int): The number of snippets matching the filter.
+        """
+        if shown < total:
+            self.filter_status_label.config(text=f"Best {shown} of {total} matches")
+        else:
+            self.filter_status_label.config(text=f"{total} matches")
+
+    def on_related_snippet_open(self, event=None):
+        """
+        Selects the related snippet that was double-clicked in the main treeview.
+        """
+        selection = self.related_listbox.curselection()
+        if not selection or selection[0] >= len(self.related_snippet_ids):
+            return
+        item = f"snippet-{self.related_snippet_ids[selection[0]]}"
+        if item in self.node_index:
+            self.treeview.see(item)
+            self.treeview.selection_set(item)
+            self.treeview.focus(item)
+
     def onrooticonify(self, event):
         """
         Handles the event when the main application window is minimized. This method is triggered
@@ -445,40 +602,199 @@ class ApplicationView:
     def edit_snippet(self, treeview, item_id, new_name):
         """Edit the name of an existing snippet."""
         logger.info(f"Editing snippet: {item_id} with new name: {new_name}")
-        treeview.item(item_id, text=new_name)
+        self.rename_node(item_id, new_name)
+
+    def show_duplicate_clusters(self, clusters):
+        """
+        Shows groups of near-duplicate snippets and lets the user merge each group into one snippet.
+
+        Args:
+            clusters (list): Groups of snippet summaries, each a dictionary with "id", "title",
+                "language" and "category".
+        """
+        if not clusters:
+            show_info_message("No near-duplicate snippets were found.")
+            return
+
+        window = Toplevel(self.app)
+        window.title("Near-Duplicate Snippets")
+        window.geometry("600x400")
+
+        ttk.Label(window, text="Select the snippet to keep, then merge to delete the others in its group.").pack(
+            side='top', fill='x', padx=5, pady=5)
+
+        tree = ttk.Treeview(window, columns=("language", "category"), selectmode='browse')
+        tree.heading("#0", text="Title")
+        tree.heading("language", text="Language")
+        tree.heading("category", text="Category")
+        tree.pack(side='top', fill='both', expand=True, padx=5)
+
+        snippet_ids = {}
+        for index, cluster in enumerate(clusters, start=1):
+            group_node = tree.insert('', 'end', text=f"Group {index} ({len(cluster)} snippets)", open=True)
+            for snippet in cluster:
+                item = tree.insert(group_node, 'end', text=snippet['title'],
+                                   values=(snippet['language'], snippet['category']))
+                snippet_ids[item] = snippet['id']
+
+        def merge_selected():
+            selection = tree.selection()
+            if not selection or selection[0] not in snippet_ids:
+                messagebox.showerror("Selection Required", "Please select the snippet to keep.", parent=window)
+                return
+            keep_item = selection[0]
+            group_node = tree.parent(keep_item)
+            duplicate_ids = [snippet_ids[item] for item in tree.get_children(group_node) if item != keep_item]
+            if not messagebox.askyesno("Merge Duplicates",
+                                       f"Delete {len(duplicate_ids)} duplicate snippets and keep "
+                                       f"'{tree.item(keep_item, 'text')}'?", parent=window):
+                return
+            if self.callbacks["merge_duplicates"](snippet_ids[keep_item], duplicate_ids):
+                tree.delete(group_node)
+
+        ttk.Button(window, text="Merge", command=merge_selected).pack(side='right', padx=5, pady=5)
+        ttk.Button(window, text="Close", command=window.destroy).pack(side='right', pady=5)
+
+    def append_snippet_nodes(self, filed):
+        """
+        Adds a chunk of snippets at the end of their categories, as the background load delivers them. The
+        nodes are queued behind any still being inserted.
+
+        Args:
+            filed (list): (snippet, category) pairs, in treeview order.
+        """
+        self.tree_inserter.extend((f"category-{snippet['language_id']}-{category['id']}", f"snippet-{snippet['id']}",
+                                   snippet['title'], (snippet['id'],), False) for snippet, category in filed)
+
+    def show_load_progress(self, loaded, total):
+        """
+        Shows the progress of the background load under the treeview.
+
+        Args:
+            loaded (int): The number of snippets loaded so far.
+            total (int | None): The number of snippets to load, or None while it is not known yet.
+        """
+        if not self.load_progress.winfo_manager():
+            self.load_progress.pack(side='bottom', fill='x', padx=5, pady=(0, 5))
+            self.load_status_label.pack(side='bottom', fill='x', padx=5)
+        if total is None:
+            self.load_progress.config(mode='indeterminate')
+            self.load_progress.start()
+            self.load_status_label.config(text="Loading snippets...")
+        else:
+            self.load_progress.stop()
+            self.load_progress.config(mode='determinate', maximum=max(total, 1), value=loaded)
+            self.load_status_label.config(text=f"Loading snippets... {loaded} of {total}")
+
+    def hide_load_progress(self):
+        """
+        Hides the progress of the background load.
+        """
+        self.load_progress.stop()
+        self.load_progress.pack_forget()
+        self.load_status_label.pack_forget()
 
-    def add_snippet(self, snippet_data):
-        """Adds a new snippet to the treeview under the specified parent."""
-        logger.info(f"Adding new snippet: {snippet_data['title']}")
-        language = snippet_data['language']
-        category = snippet_data['category'] if snippet_data['category'] else "No Category"
-        snippet_title = snippet_data['title']
-        snippet_id = snippet_data['id']  # Assuming each snippet has a unique ID
+    def remove_snippet_nodes(self, snippet_ids):
+        """
+        Removes the nodes of many snippets from the treeview in one call.
 
-        # Find or create the language node
-        language_node = self.find_or_create_node('', language)
+        Args:
+            snippet_ids (iterable): The IDs of the snippets.
+        """
+        self.tree_inserter.finish()
+        self.delete_nodes([f"snippet-{snippet_id}" for snippet_id in snippet_ids])
 
-        # Find or create the category node, under the language node
-        category_node = self.find_or_create_node(language_node, category)
+    def patch_snippet_nodes(self, snippet_ids, categories, placed):
+        """
+        Applies a change to many snippets to the treeview. Nodes of snippets no longer shown are removed,
+        and the others are inserted, moved or renamed to their positions in the categories they were filed
+        under. Moved nodes keep their selection, and the rest of the tree is left as it is.
 
-        # Add the snippet under the category node
-        self.treeview.insert(category_node, 'end', iid=f"snippet-{snippet_id}", text=snippet_title,
-                             values=(snippet_id,))
+        Args:
+            snippet_ids (iterable): The IDs of every snippet the change touched.
+            categories (list): (language_id, language_name, category, positions) tuples of the categories
+                the snippets were filed under. positions lists the (index, snippet) pairs of the snippets
+                placed in the category, by increasing index among the category's snippets.
+            placed (set): The IDs of the snippets filed under one of those categories.
+        """
+        self.remove_snippet_nodes(snippet_id for snippet_id in snippet_ids if snippet_id not in placed)
+        # Changed nodes are taken out of the tree first, so every category holds exactly its unchanged
+        # snippets in order, and each changed node goes in at its index with no lookup of its neighbours
+        moved = [f"snippet-{snippet_id}" for snippet_id in placed if f"snippet-{snippet_id}" in self.node_index]
+        if moved:
+            self.treeview.detach(*moved)
+        for language_id, language_name, category, positions in categories:
+            language_node = f"language-{language_id}"
+            if language_node not in self.node_index:
+                self.insert_node('', 'end', iid=language_node, text=language_name)
+            category_node = f"category-{language_id}-{category['id']}"
+            if category_node not in self.node_index:
+                self.insert_node(language_node, 'end', iid=category_node, text=category['name'])
+            for index, snippet in positions:
+                item = f"snippet-{snippet['id']}"
+                if item in self.node_index:
+                    self.move_node(item, category_node, index)
+                    self.rename_node(item, snippet['title'])
+                else:
+                    self.insert_node(category_node, index, iid=item, text=snippet['title'], values=(snippet['id'],))
 
     def delete_snippet(self, treeview, item_id):
         """Deletes an existing snippet from the treeview."""
         logger.info(f"Deleting snippet: {item_id}")
-        treeview.delete(item_id)
-
-    def find_or_create_node(self, parent, title):
-        """Finds or creates a node in the treeview, based on the given title."""
-        logger.info(f"Finding or creating node: {title}")
-        for child in self.treeview.get_children(parent):
-            if self.treeview.item(child, 'text') == title:
-                return child  # Node exists, return its ID
-        # If node does not exist, create it
-        return self.treeview.insert(parent, 'end', text=title)
-    
+        self.delete_nodes([item_id])
+
+    def insert_node(self, parent, index, iid=None, text='', values=(), open=False):
+        """
+        Inserts a node in the treeview and records it in the node index.
+
+        Args:
+            parent (str): The iid of the parent node, '' for a top-level node.
+            index (int | str): The position among the parent's children, or 'end'.
+            iid (str | None): The iid of the node, or None to let the treeview pick one.
+            text (str): The text of the node.
+            values (tuple): The values of the node.
+            open (bool): Whether the node shows its children.
+
+        Returns:
+            str: The iid of the node.
+        """
+        iid = self.treeview.insert(parent, index, iid=iid, text=text, values=values, open=open)
+        self.node_index.add(parent, iid)
+        return iid
+
+    def move_node(self, iid, parent, index):
+        """
+        Moves a node of the treeview to a position under a parent, keeping the node index in step.
+        """
+        self.treeview.move(iid, parent, index)
+        self.node_index.move(iid, parent)
+
+    def rename_node(self, iid, text):
+        """
+        Changes the text of a node of the treeview.
+        """
+        self.treeview.item(iid, text=text)
+
+    def delete_nodes(self, iids):
+        """
+        Deletes nodes and their descendants from the treeview in one call, skipping those not in it, and
+        drops them from the node index.
+
+        Args:
+            iids (iterable): The iids of the nodes.
+        """
+        iids = [iid for iid in iids if iid in self.node_index]
+        if iids:
+            self.treeview.delete(*iids)
+            for iid in iids:
+                self.node_index.remove(iid)
+
+    def delete_child_nodes(self, parent):
+        """
+        Deletes all the children of a node, keeping the node index in step.
+        """
+        self.delete_nodes(list(self.node_index.children.get(parent, ())))
+
     # Treeview and Data Management
     def update_general_categories(self, general_categories_returned):
         """ summary
@@ -489,22 +805,149 @@ class ApplicationView:
         """Updates the stored language-specific categories with the provided dictionary."""
         self.language_specific_categories = language_specific_categories_returned
 
-    def refresh_treeview(self, structured_data):
-        """ refresh the treeview with the provided structured """
+    def refresh_treeview(self, structured_data, expand=False, lazy=False, opened=()):
+        """
+        refresh the treeview with the provided structured
+
+        The nodes are inserted in idle-time slices, and a newer refresh cancels the insertion of an older one.
+
+        Args:
+            structured_data (dict): The languages, their categories and their snippets.
+            expand (bool): Whether to open the language and category nodes, as for filter results.
+            lazy (bool): Only insert the language nodes, each with a placeholder child, and fill them in as
+                they are opened.
+            opened (iterable): (language_id, category_id) pairs of the categories of a lazily filled tree
+                whose pages were read, which are shown open with those pages.
+        """
+        self.tree_inserter.cancel()
         self.treeview.delete(*self.treeview.get_children())
+        self.node_index.clear()
+        self.tree_inserter.start(self.iter_tree_nodes(structured_data, expand, lazy, set(opened)))
 
+    @staticmethod
+    def iter_tree_nodes(structured_data, expand, lazy, opened=frozenset()):
+        """
+        Lists the nodes of the tree data as (parent, iid, text, values, open) tuples, parents first.
+
+        Args:
+            structured_data (dict): The languages, their categories and their snippets.
+            expand (bool): Whether the language and category nodes are open.
+            lazy (bool): Only list the language nodes, each with a placeholder child, except for the
+                languages holding an opened category.
+            opened (set): (language_id, category_id) pairs of the categories of a lazily filled tree whose
+                pages were read.
+        """
         for lang_id, lang_info in structured_data.items():
             # Add language node
-            lang_node = self.treeview.insert('', 'end', text=lang_info['name'])
+            lang_node = f"language-{lang_id}"
+            if lazy:
+                categories = lang_info['categories'].values()
+                if not any((lang_id, cat_info['id']) in opened for cat_info in categories):
+                    yield '', lang_node, lang_info['name'], (), expand
+                    yield lang_node, f"placeholder-{lang_node}", "Loading...", (), False
+                    continue
+                # The language was opened before, so it is shown as it was, with its read pages
+                yield '', lang_node, lang_info['name'], (), True
+                for cat_info in categories:
+                    cat_node = f"category-{lang_id}-{cat_info['id']}"
+                    is_opened = (lang_id, cat_info['id']) in opened
+                    yield lang_node, cat_node, cat_info['name'], (), is_opened
+                    if not is_opened:
+                        yield cat_node, f"placeholder-{cat_node}", "Loading...", (), False
+                        continue
+                    for snippet in cat_info['snippets']:
+                        yield cat_node, f"snippet-{snippet['id']}", snippet['title'], (snippet['id'],), False
+                    if not cat_info['complete']:
+                        yield cat_node, f"more-{lang_id}-{cat_info['id']}", "Show more...", (), False
+                continue
+
+            yield '', lang_node, lang_info['name'], (), expand
 
             # Add category nodes under language
             for cat_key, cat_info in lang_info['categories'].items():
-                cat_node = self.treeview.insert(lang_node, 'end', text=cat_info['name'])
+                cat_node = f"category-{lang_id}-{cat_info['id']}"
+                yield lang_node, cat_node, cat_info['name'], (), expand
 
                 # Add snippet nodes under category
                 for snippet in cat_info['snippets']:
-                    self.treeview.insert(cat_node, 'end', iid=f"snippet-{snippet['id']}", text=snippet['title'],
-                                         values=(snippet['id'],))
+                    yield cat_node, f"snippet-{snippet['id']}", snippet['title'], (snippet['id'],), False
+
+    def insert_placeholder(self, node):
+        """
+        Gives a node of a lazily filled tree a placeholder child, so it shows as expandable before its real
+        children are inserted.
+
+        Args:
+            node (str): The iid of the node.
+        """
+        self.insert_node(node, 'end', iid=f"placeholder-{node}", text="Loading...")
+
+    def show_category_nodes(self, language_id, categories):
+        """
+        Replaces the placeholder of a language node with its categories, each with a placeholder of its own.
+
+        Args:
+            language_id (int): The ID of the language.
+            categories (list): The "id" and "name" of each category, in treeview order.
+        """
+        language_node = f"language-{language_id}"
+        # Nodes still queued would otherwise land after, or under, the ones changed here
+        self.tree_inserter.finish()
+        self.delete_child_nodes(language_node)
+        for category in categories:
+            category_node = self.insert_node(language_node, 'end', iid=f"category-{language_id}-{category['id']}",
+                                             text=category['name'])
+            self.insert_placeholder(category_node)
+
+    def show_snippet_page(self, language_id, category, snippets, more):
+        """
+        Appends a page of snippets to a category node of a lazily filled tree.
+
+        Args:
+            language_id (int): The ID of the language.
+            category (dict): The "id" and "name" of the category.
+            snippets (list): The snippets of the page, in title order.
+            more (bool): Whether further pages follow, in which case a node to read the next one is added.
+        """
+        category_node = f"category-{language_id}-{category['id']}"
+        more_node = f"more-{language_id}-{category['id']}"
+        self.tree_inserter.finish()
+        self.delete_nodes((f"placeholder-{category_node}", more_node))
+        for snippet in snippets:
+            self.insert_node(category_node, 'end', iid=f"snippet-{snippet['id']}", text=snippet['title'],
+                             values=(snippet['id'],))
+        if more:
+            self.insert_node(category_node, 'end', iid=more_node, text="Show more...")
+
+    def release_category_node(self, language_id, category_id):
+        """
+        Drops the snippet nodes of a category of a lazily filled tree and puts its placeholder back.
+
+        Args:
+            language_id (int): The ID of the language.
+            category_id (int): The ID of the category.
+        """
+        category_node = f"category-{language_id}-{category_id}"
+        self.tree_inserter.finish()
+        if category_node in self.node_index:
+            self.delete_child_nodes(category_node)
+            self.insert_placeholder(category_node)
+
+    def is_expanded(self, node):
+        """
+        Tells whether a node is shown with its children visible, that is open along with all its ancestors.
+
+        Args:
+            node (str): The iid of the node.
+
+        Returns:
+            bool: True if the node and every ancestor are open.
+        """
+        while node:
+            if node not in self.node_index or not self.treeview.item(node, 'open'):
+                return False
+            node = self.node_index.parent(node)
+        return True
 
     # Miscellaneous
 
@@ -0,0 +1,285 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import time
+from array import array
+from itertools import accumulate
+from tkinter import font as tkfont
+
+from src.syntax_highlighting.highlighter import apply_tags, line_start_table, tag_indexes
+from src.utils.constants import (CODE_VIEW_CHUNKED_CHARS, CODE_VIEW_WINDOWED_CHARS, CODE_VIEW_CHUNK_CHARS,
+                                 CODE_VIEW_INSERT_BUDGET_MS, CODE_VIEW_WINDOW_MARGIN, CODE_VIEW_MAX_LINE_CHARS,
+                                 SYNTAX_TAG_COLORS)
+
+
+def build_line_index(code, max_length=CODE_VIEW_MAX_LINE_CHARS):
+    """
+    Lists the offset at which each line of a text starts. Lines longer than the maximum length are split
+    into several, so no single line of a windowed view is too long to render quickly.
+
+    Args:
+        code (str): The text.
+        max_length (int): The longest line, in characters.
+
+    Returns:
+        array: The start offset of each line, in order.
+    """
+    lengths = [len(line) for line in code.split('\n')]
+    # Each line starts one past the end of the one before, which runs entirely in C
+    starts = array('q', accumulate(map((1).__add__, lengths[:-1]), initial=0))
+    long_lines = [line for line, length in enumerate(lengths) if length > max_length]
+    if not long_lines:
+        return starts
+    split = array('q')
+    previous = 0
+    for line in long_lines:
+        split.extend(starts[previous:line])
+        split.extend(range(starts[line], starts[line] + lengths[line], max_length))
+        previous = line + 1
+    split.extend(starts[previous:])
+    return split
+
+
+class CodeViewer:
+    """
+    Shows snippet code in a read-mostly tk.Text without blocking the Tk event loop on large snippets.
+
+    Small snippets are inserted in one call. Longer ones are inserted a chunk at a time from
+    after_idle(), each slice within a time budget. The longest are shown windowed: a line index over the
+    code lets the widget hold only the visible lines plus a margin on either side, and the window is
+    moved as the view scrolls near its edges. The scrollbar is driven by the viewer, so it reflects the
+    position in the whole snippet rather than in the window. A windowed view is read-only, since edits
+    to the window would be lost when it moves.
+
+    Code shown with a highlighter is tokenized lazily, and each part of it is tagged as it is inserted:
+    the whole snippet at once, each chunk, or each window.
+
+    Attributes:
+        text (tk.Text): The widget showing the code.
+        scrollbar (ttk.Scrollbar): The vertical scrollbar of the widget.
+        code (str): The code shown.
+        spans (TokenSpans | None): The token spans of the code, when it is highlighted.
+        chunk_line_starts (array | None): The start offset of each line of a highlighted snippet inserted
+            in chunks.
+        line_starts (array | None): The start offset of each line of a windowed snippet.
+        first (int): The first line of the snippet held in the widget while windowed.
+        last (int): The line after the last one held in the widget while windowed.
+    """
+
+    def __init__(self, text, scrollbar, margin=CODE_VIEW_WINDOW_MARGIN):
+        """
+        Initializes the CodeViewer and takes over the scrolling of the widget.
+
+        Args:
+            text (tk.Text): The widget showing the code.
+            scrollbar (ttk.Scrollbar): The vertical scrollbar of the widget.
+            margin (int): The number of lines held above and below the visible region while windowed.
+        """
+        self.text = text
+        self.scrollbar = scrollbar
+        self.margin = margin
+        self.budget = CODE_VIEW_INSERT_BUDGET_MS / 1000
+        self.code = ''
+        self.position = 0
+        self.job = None
+        self.spans = None
+        self.chunk_line_starts = None
+        self.line_starts = None
+        self.first = self.last = 0
+        for tag, color in SYNTAX_TAG_COLORS.items():
+            self.text.tag_configure(tag, foreground=color)
+        self.text.config(yscrollcommand=self.on_text_scroll)
+        self.scrollbar.config(command=self.on_scrollbar)
+
+    @property
+    def windowed(self):
+        """bool: Whether the snippet shown is windowed."""
+        return self.line_starts is not None
+
+    def show(self, code, highlighter=None):
+        """
+        Replaces the code shown, picking how to insert it from its length.
+
+        Args:
+            code (str): The code to show.
+            highlighter (Highlighter, optional): Highlights the code. Without one the code is shown plain.
+        """
+        self.clear()
+        self.code = code
+        self.spans = highlighter.tokenize(code) if highlighter is not None else None
+        if len(code) > CODE_VIEW_WINDOWED_CHARS:
+            self.line_starts = build_line_index(code)
+            self.text.config(state='disabled')
+            self.show_window(0)
+        elif len(code) > CODE_VIEW_CHUNKED_CHARS:
+            self.chunk_line_starts = line_start_table(code) if self.spans is not None else None
+            self.insert_chunks()
+        else:
+            self.text.insert('1.0', code)
+            if self.spans is not None:
+                self.highlight(line_start_table(code), 0, len(code))
+
+    def highlight(self, line_starts, start, stop, first=0):
+        """
+        Tags the tokens of a range of the code, which the widget holds from a line of a line start table.
+
+        Args:
+            line_starts (Sequence): The start offset of each line of the code.
+            start (int): The offset where the range starts.
+            stop (int): The offset where the range stops.
+            first (int): The line of the table shown on the first line of the widget.
+        """
+        apply_tags(self.text, tag_indexes(self.spans.between(start, stop), line_starts, start, stop, first))
+
+    def clear(self):
+        """
+        Empties the widget and stops any insertion in progress.
+        """
+        if self.job is not None:
+            self.text.after_cancel(self.job)
+            self.job = None
+        self.code = ''
+        self.position = 0
+        self.spans = None
+        self.chunk_line_starts = None
+        self.line_starts = None
+        self.first = self.last = 0
+        self.text.config(state='normal')
+        self.text.delete('1.0', 'end')
+
+    def insert_chunks(self):
+        """Inserts chunks of the code until the time budget runs out, and schedules the rest."""
+        self.job = None
+        code = self.code
+        length = len(code)
+        started = time.perf_counter()
+        while self.position < length and time.perf_counter() - started < self.budget:
+            end = min(self.position + CODE_VIEW_CHUNK_CHARS, length)
+            if end < length:
+                # Chunks end on a line break where there is one, so Tk lays out whole lines
+                line_end = code.rfind('\n', self.position, end)
+                if line_end >= 0:
+                    end = line_end + 1
+            self.text.insert('end-1c', code[self.position:end])
+            if self.spans is not None:
+                self.highlight(self.chunk_line_starts, self.position, end)
+            self.position = end
+        if self.position < length:
+            self.job = self.text.after_idle(self.insert_chunks)
+
+    # Windowed View
+
+    @property
+    def line_count(self):
+        """int: The number of lines of a windowed snippet."""
+        return len(self.line_starts)
+
+    def get_lines(self, first, last):
+        """
+        Returns lines of a windowed snippet as one string.
+
+        Args:
+            first (int): The first line.
+            last (int): The line after the last one.
+        """
+        starts = self.line_starts
+        code = self.code
+        lines = []
+        for line in range(first, last):
+            end = starts[line + 1] if line + 1 < len(starts) else len(code)
+            lines.append(code[starts[line]:end].rstrip('\n'))
+        return '\n'.join(lines)
+
+    def visible_lines(self):
+        """Returns the number of lines the widget shows at its current height."""
+        line_height = tkfont.Font(font=self.text.cget('font')).metrics('linespace')
+        return max(1, self.text.winfo_height() // max(line_height, 1))
+
+    def widget_line(self, index):
+        """Returns the line, counted from 1, of a widget index such as '@0,0'."""
+        return int(self.text.index(index).split('.')[0])
+
+    def show_window(self, top):
+        """
+        Fills the widget with the lines around a line of a windowed snippet and scrolls that line to the
+        top of the view.
+
+        Args:
+            top (int): The line to show at the top.
+        """
+        visible = self.visible_lines()
+        top = max(0, min(top, self.line_count - visible))
+        self.first = max(0, top - self.margin)
+        self.last = min(self.line_count, top + visible + self.margin)
+        self.text.config(state='normal')
+        self.text.delete('1.0', 'end')
+        self.text.insert('1.0', self.get_lines(self.first, self.last))
+        if self.spans is not None:
+            stop = self.line_starts[self.last] if self.last < self.line_count else len(self.code)
+            self.highlight(self.line_starts, self.line_starts[self.first], stop, self.first)
+        self.text.config(state='disabled')
+        self.text.yview(f"{top - self.first + 1}.0")
+
+    def on_text_scroll(self, first, last):
+        """
+        Updates the scrollbar as the widget scrolls. A windowed view moves its window when the visible
+        region comes within a quarter of the margin of either edge.
+
+        Args:
+            first (str): The fraction of the widget's content above the visible region.
+            last (str): The fraction of the widget's content above the end of the visible region.
+        """
+        if not self.windowed:
+            self.scrollbar.set(first, last)
+            return
+        top = self.widget_line('@0,0') - 1
+        bottom = self.widget_line(f"@0,{self.text.winfo_height()}")
+        slack = self.margin // 4
+        if (top < slack and self.first > 0) or (self.last - self.first - bottom < slack
+                                                 and self.last < self.line_count):
+            self.show_window(self.first + top)
+            return
+        self.scrollbar.set((self.first + top) / self.line_count, (self.first + bottom) / self.line_count)
+
+    def on_scrollbar(self, *args):
+        """
+        Scrolls the view from the scrollbar. A windowed view is scrolled within the whole snippet, and
+        the window is refilled when the target lies outside it.
+
+        Args:
+            *args: The arguments of a yview command, ('moveto', fraction) or ('scroll', number, what).
+        """
+        if not self.windowed:
+            self.text.yview(*args)
+            return
+        visible = self.visible_lines()
+        top = self.first + self.widget_line('@0,0') - 1
+        if args[0] == 'moveto':
+            target = int(float(args[1]) * self.line_count)
+        else:
+            target = top + int(args[1]) * (visible if args[2].startswith('page') else 1)
+        target = max(0, min(target, self.line_count - visible))
+        if self.first <= target and target + visible <= self.last:
+            self.text.yview(f"{target - self.first + 1}.0")
+        else:
+            self.show_window(target)
@@ -25,6 +25,8 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter.ttk import Scrollbar
 from src.custom_widgets.toplevel import Toplevel
+from src.custom_widgets.widget_pool import WidgetPool
+from src.utils.config_search import ConfigSearchIndex
 # from src.utils.configuration_manager import ConfigurationManager
 
 
@@ -43,87 +45,55 @@ def add_tooltip(widget, text):
     # Add additional logic to hide tooltip on "<Leave>" if using Toplevel for tooltips
 
 
-def create_category_ui(parent, category_name, path):
+def build_field_row(master, kind):
     """
-    Creates a UI section or category to group related configuration settings.
+    Builds a pooled row for one configuration setting: a label and the widget editing the value.
 
     Args:
-        parent (tk.Widget): The parent widget.
-        category_name (str): The name of the category.
-        path (str): The path to the category within the configuration structure.
-    """
-    frame = ttk.LabelFrame(parent, text=category_name, padding="10 10 10 10")
-    frame.pack(fill='x', expand=True, padx=5, pady=5)
-    return frame
-
-
-def create_subsection_ui(parent, subsection_name):
-    """
-    Creates a UI subsection for nested configuration data.
-
-    Args:
-        parent (tk.Widget): The parent widget.
-        subsection_name (str): The name of the subsection.
+        master (tk.Widget): The parent of the row.
+        kind (str): "bool" for a checkbutton, "int" for a spinbox, "list" for a combobox, or "text" for
+            an entry.
 
     Returns:
-        tk.Widget: The created subsection UI element, ready for adding further elements.
+        ttk.Frame: The row, with its `label`, `entry` and `var` attributes set.
     """
-    frame = ttk.Frame(parent, padding="10 10 10 10")
-    frame.pack(fill='x', expand=True, padx=5, pady=5)
-    label = ttk.Label(frame, text=subsection_name, font=('TkDefaultFont', 10, 'bold'))
-    label.pack(side="top", fill='x')
-    return frame
-
-
-def create_list_item_ui(parent, index, path):
+    row = ttk.Frame(master)
+    row.label = ttk.Label(row)
+    row.label.pack(side='left', padx=5)
+
+    if kind == "bool":
+        row.var = tk.BooleanVar(row)
+        row.entry = ttk.Checkbutton(row, variable=row.var)
+    elif kind == "int":
+        row.var = tk.IntVar(row)
+        row.entry = ttk.Spinbox(row, from_=0, to=100, textvariable=row.var)
+    elif kind == "list":
+        row.var = tk.StringVar(row)
+        row.entry = ttk.Combobox(row, textvariable=row.var)
+    else:
+        row.var = tk.StringVar(row)
+        row.entry = ttk.Entry(row, textvariable=row.var)
+
+    row.entry.pack(side='right', expand=True, fill='x')
+    return row
+
+
+def build_section(master):
     """
-    Optionally creates a UI element for a list item in the configuration.
+    Builds a pooled subsection for nested configuration data: a header that expands and collapses it,
+    and a body holding its settings.
 
     Args:
-        parent (tk.Widget): The parent widget.
-        index (int): The index of the item in the list.
-        path (str): The path to the item within the configuration structure.
-    """
-    label = ttk.Label(parent, text=f"Item {index + 1}", font=('TkDefaultFont', 9, 'italic'))
-    label.pack(side="top", fill='x', pady=2)
-    return label
+        master (tk.Widget): The parent of the subsection.
 
-
-def create_config_widget(parent, label, value, path):
-    """
-    Creates UI widgets dynamically based on the configuration data type and its path.
-
-    Args:
-        parent (tk.Widget): The parent widget where this config widget will be placed.
-        label (str): The label for the configuration setting.
-        value: The current value of the configuration setting.
-        path (str): The hierarchical path to this setting within the configuration structure.
+    Returns:
+        ttk.Frame: The subsection, with its `header` and `body` attributes set.
     """
-    frame = ttk.Frame(parent)
-    frame.pack(fill='x', padx=5, pady=2)
-
-    lbl = ttk.Label(frame, text=label)
-    lbl.pack(side='left')
-
-    # Optional: Tooltip displaying the full path for clarity
-    tooltip = f"Path: {path}\nClick for more options."
-    add_tooltip(lbl, f"Config key: {label}")
-
-    # Handling different types of values with appropriate UI elements
-    if isinstance(value, bool):
-        var = tk.BooleanVar(value=value)
-        entry = ttk.Checkbutton(frame, variable=var)
-    elif isinstance(value, int):
-        var = tk.IntVar(value=value)
-        entry = ttk.Spinbox(frame, from_=0, to=100, textvariable=var)
-    elif isinstance(value, list):  # Example for a dropdown
-        var = tk.StringVar(value=value[0])
-        entry = ttk.Combobox(frame, values=value, textvariable=var)
-    else:  # Default to text entry for other types
-        var = tk.StringVar(value=str(value))
-        entry = ttk.Entry(frame, textvariable=var)
-
-    entry.pack(side='right', expand=True, fill='x')
+    section = ttk.Frame(master, padding="10 5 10 5")
+    section.header = ttk.Button(section, style="Toolbutton")
+    section.header.pack(side="top", anchor='w')
+    section.body = ttk.Frame(section, padding="10 0 0 0")
+    return section
 
 
 def center_window(window):
@@ -153,6 +123,16 @@ class ConfigurationView:
         self.logging_config = self.callbacks["load_configuration"]("logging")
         self.preferences_config = self.callbacks["load_configuration"]("preferences")
 
+        # Every setting of the three configurations, searched by the search bar
+        self.search_index = ConfigSearchIndex()
+        self.search_index.build([
+            ("Application", self.application_config),
+            ("Preferences", self.preferences_config),
+            ("Logging", self.logging_config),
+        ])
+        # The configuration name and path of each search result shown in the TreeView
+        self.search_results = {}
+
         self.setup_search_bar()
         self.create_widgets()
         center_window(self.window)
@@ -197,6 +177,12 @@ class ConfigurationView:
 
         # self.content_frame.pack(side="right", expand=True, fill="both")
 
+        # Rows and subsections of the details panel, reused from one selection to the next
+        self.widget_pool = WidgetPool(self.content_frame)
+        for kind in ("bool", "int", "list", "text"):
+            self.widget_pool.register(kind, lambda master, kind=kind: self.build_pooled_row(master, kind))
+        self.widget_pool.register("section", build_section)
+
         # Setup TreeView
         self.tree = ttk.Treeview(self.navigation_frame, selectmode='browse')
         self.tree.pack(expand=True, fill="both")
@@ -318,6 +304,10 @@ class ConfigurationView:
         """
         summary
         """
+        if selected_item in self.search_results:
+            # A single setting, shown under its own key
+            name, path, value = self.search_index.entries[self.search_results[selected_item]]
+            return {path[-1] if path else name: value}
         # Assuming 'configurations' attribute contains the data
         for config in (self.preferences_config, self.application_config, self.logging_config):
             if selected_item in config:
@@ -335,9 +325,8 @@ class ConfigurationView:
             # Update the breadcrumb to just show the root item name
             item_text = self.tree.item(selected_item, 'text')
             self.update_breadcrumb(item_text)
-            # Clear existing widgets
-            for widget in self.content_frame.winfo_children():
-                widget.destroy()
+            # Hide the widgets of the previous selection
+            self.widget_pool.release_all()
             # Skip widget generation for root-level nodes
             return
 
@@ -346,9 +335,8 @@ class ConfigurationView:
         # Update the breadcrumb UI using the root item's name as the starting point
         self.update_breadcrumb(f"{root_item_name} > {' > '.join(breadcrumb_path)}")
 
-        # Clear existing widgets
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        # Hide the widgets of the previous selection, keeping them for reuse
+        self.widget_pool.release_all()
 
         # Get the configuration data for the selected item
         config_data = self.get_config_data(selected_item)
@@ -399,6 +387,9 @@ class ConfigurationView:
         """
         Dynamically creates UI elements to display and edit configuration settings.
 
+        Nested dictionaries and lists are shown as collapsed subsections, whose settings are only
+        created when they are expanded, so the cost of a selection follows the number of visible fields.
+
         Args:
             parent (tk.Widget): The parent widget to contain the generated UI elements.
             config_data (dict | list | any): The configuration data to be displayed. Can be a dictionary,
@@ -413,30 +404,100 @@ class ConfigurationView:
                 # Check if 'value' is a simple type or a dict with metadata
                 if isinstance(value, dict) and 'type' in value:
                     # 'value' is a dict with metadata indicating a dynamic field
-                    self.create_dynamic_field(self.sub_frame if 'sub_frame' in locals() else parent, key, value,
-                                              new_path)
+                    self.create_dynamic_field(parent, key, value, new_path)
                 elif isinstance(value, (dict, list)):
                     # Create a sub-section for nested structures
-                    create_category_ui(parent, key, new_path)
-                    self.sub_frame = create_subsection_ui(parent, key)
-                    self.populate_details_ui(self.sub_frame, value, new_path)
+                    self.create_section(parent, key, value, new_path)
                 else:
                     # 'value' is a simple type without explicit metadata
-                    create_config_widget(self.sub_frame if 'sub_frame' in locals() else parent, key, value,
-                                              new_path)
+                    self.create_config_widget(parent, key, value, new_path)
         elif isinstance(config_data, list):
             for index, item in enumerate(config_data):
                 new_path = f"{path}/{index}"
-                create_list_item_ui(parent, index, new_path)
                 if isinstance(item, (dict, list)):
-                    self.sub_frame = create_subsection_ui(parent, f"Item {index}")
-                    self.populate_details_ui(self.sub_frame, item, new_path)
+                    self.create_section(parent, f"Item {index + 1}", item, new_path)
                 else:
-                    create_config_widget(self.sub_frame if 'sub_frame' in locals() else parent, f"Item {index}",
-                                              item, new_path)
+                    self.create_config_widget(parent, f"Item {index + 1}", item, new_path)
         else:
             # Single non-dict, non-list item
-            create_config_widget(parent, path.split('/')[-1] if path else "Value", config_data, path)
+            self.create_config_widget(parent, path.split('/')[-1] if path else "Value", config_data, path)
+
+    def create_section(self, parent, name, config_data, path):
+        """
+        Shows a collapsed subsection for nested configuration data. Its settings are created the first
+        time it is expanded, and kept while it is collapsed again.
+
+        Args:
+            parent (tk.Widget): The parent widget where this subsection will be placed.
+            name (str): The name of the subsection.
+            config_data (dict | list): The nested configuration data.
+            path (str): The hierarchical path to the subsection within the configuration structure.
+        """
+        section = self.widget_pool.acquire("section", parent, fill='x', padx=5, pady=2)
+        section.body.pack_forget()
+        section.populated = False
+
+        def toggle():
+            if section.body.winfo_manager():
+                section.body.pack_forget()
+                section.header.configure(text=f"\u25b8 {name}")
+                return
+            if not section.populated:
+                self.populate_details_ui(section.body, config_data, path)
+                section.populated = True
+            section.body.pack(side="top", fill='x')
+            section.header.configure(text=f"\u25be {name}")
+
+        section.header.configure(text=f"\u25b8 {name}", command=toggle)
+
+    def acquire_field_row(self, parent, kind, label):
+        """
+        Shows a pooled row for a setting and labels it.
+
+        Args:
+            parent (tk.Widget): The parent widget where the row will be placed.
+            kind (str): The kind of row, as taken by build_field_row().
+            label (str): The label for the configuration setting.
+
+        Returns:
+            ttk.Frame: The row.
+        """
+        row = self.widget_pool.acquire(kind, parent, fill='x', padx=5, pady=2)
+        row.label.configure(text=label)
+        # The row may have shown another setting before, with its tooltip on another widget
+        row.label.unbind("<Enter>")
+        row.entry.unbind("<Enter>")
+        if kind == "int":
+            row.entry.configure(validate="none")
+        return row
+
+    def create_config_widget(self, parent, label, value, path):
+        """
+        Creates UI widgets dynamically based on the configuration data type and its path.
+
+        Args:
+            parent (tk.Widget): The parent widget where this config widget will be placed.
+            label (str): The label for the configuration setting.
+            value: The current value of the configuration setting.
+            path (str): The hierarchical path to this setting within the configuration structure.
+        """
+        # Handling different types of values with appropriate UI elements
+        if isinstance(value, bool):
+            row = self.acquire_field_row(parent, "bool", label)
+            row.var.set(value)
+        elif isinstance(value, int):
+            row = self.acquire_field_row(parent, "int", label)
+            row.var.set(value)
+        elif isinstance(value, list):  # Example for a dropdown
+            row = self.acquire_field_row(parent, "list", label)
+            row.entry.configure(values=value)
+            row.var.set(value[0] if value else '')
+        else:  # Default to text entry for other types
+            row = self.acquire_field_row(parent, "text", label)
+            row.var.set(str(value))
+
+        # Optional: Tooltip displaying the config key
+        add_tooltip(row.label, f"Config key: {label}")
 
     def create_dynamic_field(self, parent, label, value, path):
         """
@@ -448,35 +509,35 @@ class ConfigurationView:
             value (dict): A dictionary containing the field's type, actual value, and possibly other metadata.
             path (str): The hierarchical path to this setting within the configuration structure.
         """
-        frame = ttk.Frame(parent)
-        frame.pack(fill='x', padx=5, pady=2)
-
-        lbl = ttk.Label(frame, text=label)
-        lbl.pack(side='left', padx=5)
-
         # Assume 'value' is a dict containing the type and actual value or options
         field_type = value.get("type")
         field_value = value.get("value")
         options = value.get("options", [])
 
         if field_type == "bool":
-            var = tk.BooleanVar(value=field_value)
-            entry = ttk.Checkbutton(frame, variable=var)
+            row = self.acquire_field_row(parent, "bool", label)
+            row.var.set(bool(field_value))
         elif field_type == "int":
-            var = tk.IntVar(value=field_value)
-            entry = ttk.Spinbox(frame, from_=0, to=100, textvariable=var, validate="key",
-                                validatecommand=(parent.register(self.is_valid_integer), '%P'))
+            row = self.acquire_field_row(parent, "int", label)
+            row.entry.configure(validate="key")
+            row.var.set(field_value if field_value is not None else 0)
         elif field_type == "list":
-            var = tk.StringVar(value=field_value)
-            entry = ttk.Combobox(frame, values=options, textvariable=var)
+            row = self.acquire_field_row(parent, "list", label)
+            row.entry.configure(values=options)
+            row.var.set(field_value if field_value is not None else '')
         else:
-            var = tk.StringVar(value=str(field_value))
-            entry = ttk.Entry(frame, textvariable=var)
-
-        entry.pack(side='right', expand=True, fill='x')
+            row = self.acquire_field_row(parent, "text", label)
+            row.var.set(str(field_value))
 
         # Optional: Add a tooltip for the field
-        add_tooltip(entry, f"Config key: {label}")
+        add_tooltip(row.entry, f"Config key: {label}")
+
+    def build_pooled_row(self, master, kind):
+        """Builds a row for the widget pool, giving spinboxes the integer check used by typed fields."""
+        row = build_field_row(master, kind)
+        if kind == "int":
+            row.entry.configure(validatecommand=(row.register(self.is_valid_integer), '%P'))
+        return row
 
     def is_valid_integer(self, P):
         """Summary"""
@@ -539,48 +600,36 @@ class ConfigurationView:
 
     def filter_treeview(self, search_query):
         """
-        Filters the TreeView to only display items matching the search query.
+        Filters the TreeView to only display the settings matching the search query, in the paths to them
+        or in their values. Each match is listed by its full path under its configuration.
         If the search query is empty, the TreeView is reset to show all items.
 
         Args:
-            search_query (str): The text to search for within the TreeView items.
+            search_query (str): The text to search for within the settings.
         """
         # Clear the TreeView
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        matched_items = []  # List to keep track of items that match the query
+        self.tree.delete(*self.tree.get_children())
+        self.search_results = {}
 
         if not search_query.strip():
             # If search query is empty, reset TreeView to show all items
+            self.search_index.search('')
             self.setup_treeview()
-        else:
-            # Create a temporary dictionary to hold filtered data by categories
-            filtered_data_by_category = {}
-            for item in self.original_treeview_data:
-                if item['type'] == 'item' and search_query.lower() in item['text'].lower():
-                    # If the item matches the search query, add it under the appropriate category
-                    parent = item['parent']
-                    if parent not in filtered_data_by_category:
-                        filtered_data_by_category[parent] = [item]
-                    else:
-                        filtered_data_by_category[parent].append(item)
-
-            # Re-populate TreeView with filtered items, including their parent categories
-            for parent_id, items in filtered_data_by_category.items():
-                # Find the parent item's text from original data
-                parent_text = next((item['text'] for item in self.original_treeview_data if item['id'] == parent_id),
-                                   None)
-                if parent_text:
-                    parent_in_tree = self.tree.insert("", "end", text=parent_text, open=True)
-                    for item in items:
-                        id = self.tree.insert(parent_in_tree, "end", text=item['text'], iid=item['id'], open=True)
-                        matched_items.append(id)
-
-            if matched_items:
-                self.tree.selection_set(matched_items[0])  # Select the first match
-                self.tree.see(matched_items[0])  # Ensure the selected item is visible
-                self.on_tree_selection(None)  # Manually trigger the selection event handler if needed
+            return
+
+        category_nodes = {}
+        matched_items = []  # List to keep track of items that match the query
+        for index in self.search_index.search(search_query):
+            name, path, _ = self.search_index.entries[index]
+            if name not in category_nodes:
+                category_nodes[name] = self.tree.insert("", "end", text=name, open=True)
+            item_id = self.tree.insert(category_nodes[name], "end", iid=f"search-{index}", text=" > ".join(path))
+            self.search_results[item_id] = index
+            matched_items.append(item_id)
+
+        if matched_items:
+            self.tree.selection_set(matched_items[0])  # Select the first match
+            self.tree.see(matched_items[0])  # Ensure the selected item is visible
 
     def show(self):
         """
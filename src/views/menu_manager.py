@@ -45,7 +45,8 @@ class MenuManager(tk.Menu):
         file_menu = tk.Menu(self, tearoff=False)
         file_menu.add_command(label="New Snippet", command=self.new_snippet, accelerator="Ctrl+N")
         file_menu.add_command(label="Import Snippets")
-        file_menu.add_command(label="Export Snippets")
+        file_menu.add_command(label="Export Snippets", command=self.export_snippet)
+        file_menu.add_command(label="Export Snippets to Folder", command=self.export_snippet_to_folder)
         file_menu.add_separator()
         # add Exit menu item
         file_menu.add_separator()
@@ -70,6 +71,9 @@ class MenuManager(tk.Menu):
         tools_menu.add_command(label="Manage Languages", command=self.about)
         tools_menu.add_command(label="Manage Categories", command=self.about)
         tools_menu.add_command(label="Configuration Settings", command=self.about)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Find Duplicate Snippets", command=self.find_duplicates)
+        tools_menu.add_command(label="Find Similar Snippets", command=self.find_similar_snippets)
         self.add_cascade(label="Tools", menu=tools_menu)
         # create the Help menu
         help_menu = tk.Menu(self, tearoff=0)
@@ -83,6 +87,18 @@ class MenuManager(tk.Menu):
     def new_snippet(self):
         self.callbacks["new_snippet"]()
 
+    def export_snippet(self):
+        self.callbacks["export_snippet"]()
+
+    def export_snippet_to_folder(self):
+        self.callbacks["export_snippet"](archive=False)
+
+    def find_duplicates(self):
+        self.callbacks["find_duplicates"]()
+
+    def find_similar_snippets(self):
+        self.callbacks["find_similar_snippets"]()
+
     def quit(self):
         self.callbacks["file_quit"]()
 
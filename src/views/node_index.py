@@ -0,0 +1,100 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+class NodeIndex:
+    """
+    Mirrors the structure of a treeview in Python dictionaries, so checking whether a node exists or
+    finding its parent or children never makes a round trip to Tcl.
+
+    The order of siblings is not mirrored. Positions in the treeview follow the order the controller
+    keeps each category's snippets in. The index only stays true if every insert, move and delete on
+    the treeview is reported to it.
+
+    Attributes:
+        parents (dict): The parent iid of each node.
+        children (dict): The child iids of each node, as a dictionary used as an ordered set.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty NodeIndex.
+        """
+        self.parents = {}
+        self.children = {'': {}}
+
+    def __contains__(self, iid):
+        return iid in self.parents
+
+    def __len__(self):
+        return len(self.parents)
+
+    def parent(self, iid):
+        """
+        Returns the parent of a node, '' for a top-level node, or None if the node is not in the tree.
+        """
+        return self.parents.get(iid)
+
+    def add(self, parent, iid):
+        """
+        Records a node inserted in the treeview.
+
+        Args:
+            parent (str): The iid of the parent node, '' for a top-level node.
+            iid (str): The iid of the node.
+        """
+        self.parents[iid] = parent
+        self.children.setdefault(parent, {})[iid] = None
+
+    def move(self, iid, parent):
+        """
+        Records a node moved under another parent.
+        """
+        previous = self.parents[iid]
+        if previous == parent:
+            return
+        del self.children[previous][iid]
+        self.children.setdefault(parent, {})[iid] = None
+        self.parents[iid] = parent
+
+    def remove(self, iid):
+        """
+        Records a node deleted from the treeview, along with all its descendants.
+        """
+        parent = self.parents.get(iid)
+        if parent is None:
+            return
+        del self.children[parent][iid]
+        stack = [iid]
+        while stack:
+            node = stack.pop()
+            stack.extend(self.children.pop(node, ()))
+            del self.parents[node]
+
+    def clear(self):
+        """
+        Records that every node was deleted from the treeview.
+        """
+        self.parents.clear()
+        self.children = {'': {}}
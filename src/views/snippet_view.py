@@ -25,7 +25,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
 from src.custom_widgets.toplevel import Toplevel
+from src.syntax_highlighting.live_highlighter import LiveHighlighter
 from src.utils.configuration_manager import ConfigurationManager
+from src.utils.constants import LANGUAGE_DETECTION_MIN_CONFIDENCE
+
+# Delay between the last edit in the code box and running language detection, in milliseconds
+DETECTION_DELAY_MS = 300
 
 
 class SnippetView:
@@ -39,6 +44,8 @@ class SnippetView:
         """
         self.callbacks = controller_callbacks
         self.master = master
+        self.detection_job = None
+        self.language_chosen_by_user = False
         self.frame = Toplevel(master, modal=False, called_from=self)
         self.languages = self.load_languages()
         self.create_widgets()
@@ -74,16 +81,23 @@ class SnippetView:
         self.title_var = tk.StringVar()
         self.language_var = tk.StringVar()
         self.code_text = tk.Text(self.frame, height=15, width=50)
+        self.code_highlighter = LiveHighlighter(self.code_text)
+        # The code is highlighted as the language picked, detected or loaded with the snippet
+        self.language_var.trace_add("write", lambda *args: self.code_highlighter.set_language(self.language_var.get()))
 
         ttk.Label(self.frame, text="Title:").grid(row=0, column=0, sticky="w")
         ttk.Entry(self.frame, textvariable=self.title_var).grid(row=0, column=1, sticky="ew")
 
         self.language_dropdown = ttk.Combobox(self.frame, textvariable=self.language_var, values=self.languages, state="readonly")
         self.language_dropdown.grid(row=1, column=1, sticky="ew")
+        self.language_dropdown.bind("<<ComboboxSelected>>", self.on_language_selected)
         ttk.Label(self.frame, text="Language:").grid(row=1, column=0, sticky="w")
+        self.detected_language_label = ttk.Label(self.frame, text="")
+        self.detected_language_label.grid(row=1, column=2, sticky="w", padx=5)
 
         ttk.Label(self.frame, text="Code:").grid(row=2, column=0, sticky="nw")
         self.code_text.grid(row=2, column=1, sticky="nsew")
+        self.code_text.bind("<<Modified>>", self.on_code_modified)
 
         submit_btn = ttk.Button(self.frame, text="Submit", command=self.on_submit_click)
         submit_btn.grid(row=3, column=1, sticky="e")
@@ -91,6 +105,43 @@ class SnippetView:
         self.frame.columnconfigure(1, weight=1)
         self.frame.rowconfigure(2, weight=1)
 
+    def on_language_selected(self, event=None):
+        """
+        Remembers that the user picked a language, so detection stops overriding it.
+        """
+        self.language_chosen_by_user = True
+        self.detected_language_label.config(text="")
+
+    def on_code_modified(self, event=None):
+        """
+        Schedules language detection shortly after the code changes, so a burst of typing or a paste
+        triggers a single detection.
+        """
+        if not self.code_text.edit_modified():
+            return
+        self.code_text.edit_modified(False)
+        if self.language_chosen_by_user:
+            return
+        if self.detection_job is not None:
+            self.frame.after_cancel(self.detection_job)
+        self.detection_job = self.frame.after(DETECTION_DELAY_MS, self.detect_language)
+
+    def detect_language(self):
+        """
+        Prefills the language dropdown with the language detected from the code.
+        """
+        self.detection_job = None
+        if self.language_chosen_by_user:
+            return
+        result = self.callbacks["detect_language"](self.code_text.get("1.0", "end-1c"))
+        if result["language"] and result["confidence"] >= LANGUAGE_DETECTION_MIN_CONFIDENCE:
+            self.language_var.set(result["language"])
+            self.detected_language_label.config(
+                text=f"Detected ({result['confidence']:.0%} confidence)")
+        else:
+            self.language_var.set("")
+            self.detected_language_label.config(text="")
+
     def on_submit_click(self):
         """
         Summary
@@ -117,6 +168,8 @@ class SnippetView:
         """
         self.title_var.set("")
         self.language_var.set("")
+        self.language_chosen_by_user = False
+        self.detected_language_label.config(text="")
         self.code_text.delete("1.0", "end")
 
     def populate_form(self, snippet):
@@ -126,6 +179,8 @@ class SnippetView:
         print(snippet)
         self.title_var.set(snippet['title'])
         self.language_var.set(snippet['language'])
+        # The stored language is the user's choice, don't let detection replace it
+        self.language_chosen_by_user = bool(snippet['language'])
         self.code_text.delete('1.0', tk.END)
         self.code_text.insert(tk.END, snippet['code'])
 
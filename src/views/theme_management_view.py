@@ -21,6 +21,7 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import copy
 import tkinter as tk
 from tkinter import ttk, messagebox, PhotoImage, colorchooser, font
 from tkinter.colorchooser import askcolor
@@ -33,6 +34,98 @@ from src.utils.custom_logger import CustomLogger
 logger = CustomLogger(__name__).logger
 
 
+def setting_kind(key, value):
+    """
+    Tells how a theme setting is edited: "color" for a color picker, "font" for a font picker, or "text".
+
+    Args:
+        key (str): The name of the setting.
+        value: The value of the setting.
+    """
+    if "color" in key.lower() or re.match(r'^#(?:[0-9a-fA-F]{3}){1,2}$', str(value)):
+        return "color"
+    if "font" in key.lower():
+        return "font"
+    return "text"
+
+
+def theme_schema(theme_data, key=""):
+    """
+    Describes the layout of a theme's settings, its keys and how each setting is edited, without the
+    values. Themes with the same schema are shown with the same widgets.
+
+    Args:
+        theme_data (dict | list | any): The theme data.
+        key (str): The name of the setting, for a single value.
+
+    Returns:
+        tuple | str: A hashable description of the layout.
+    """
+    if isinstance(theme_data, dict):
+        return tuple((name, theme_schema(value, name)) for name, value in theme_data.items())
+    if isinstance(theme_data, list) and any(isinstance(item, dict) for item in theme_data):
+        return ('list',) + tuple(theme_schema(item, key) for item in theme_data)
+    return setting_kind(key, theme_data)
+
+
+class ThemeTabs:
+    """
+    The notebook showing themes of one schema, with the tabs not built yet and the entries of those
+    that were.
+
+    Attributes:
+        notebook (ttk.Notebook): The top-level notebook of the tabs.
+        theme_data (dict): The theme shown.
+        builders (dict): (builder, frame, path) triples of the tabs not built yet, by tab widget name.
+        entries (dict): The entry of each setting built, by path into the theme data.
+    """
+
+    def __init__(self, notebook, theme_data):
+        self.notebook = notebook
+        self.theme_data = theme_data
+        self.builders = {}
+        self.entries = {}
+
+    def get_value(self, path):
+        """Returns the value at a path into the theme data."""
+        value = self.theme_data
+        for key in path:
+            value = value[key]
+        return value
+
+    def add_entry(self, path, entry):
+        """Records the entry built for a setting."""
+        self.entries[path] = entry
+
+    def edited_data(self):
+        """
+        Returns a copy of the theme data with the values of the entries built written in by path. Settings
+        whose entry still shows their value keep it as it is, so numbers and lists are not turned into text.
+        """
+        theme_data = copy.deepcopy(self.theme_data)
+        for path, entry in self.entries.items():
+            container = theme_data
+            for key in path[:-1]:
+                container = container[key]
+            text = entry.get()
+            if str(container[path[-1]]) != text:
+                container[path[-1]] = text
+        return theme_data
+
+    def update(self, theme_data):
+        """
+        Shows another theme of the same schema, writing its values into the entries built so far.
+        Tabs not built yet read the new theme when they are.
+        """
+        self.theme_data = theme_data
+        for path, entry in self.entries.items():
+            state = str(entry.cget('state'))
+            entry.configure(state='normal')
+            entry.delete(0, 'end')
+            entry.insert(0, str(self.get_value(path)))
+            entry.configure(state=state)
+
+
 class ThemeView:
     """
     summary
@@ -47,7 +140,7 @@ class ThemeView:
         self.frame = Toplevel(master, modal=False, called_from=self)
         self.frame.title("Theme Management")
         self.frame.geometry("1280x800")
-        self.theme_data_widgets = {}
+        self.tabs = None
         self.create_widgets()
 
         self.frame.grab_set()
@@ -79,13 +172,16 @@ class ThemeView:
         self.details_frame.grid_columnconfigure(0, weight=1)  # Allow content in details_frame to expand
         self.details_frame.grid_rowconfigure(0, weight=1)  # Allow vertical expansion within details_frame
 
-        # Notebook configuration
-        self.notebook = ttk.Notebook(self.details_frame)
-        self.notebook.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        # Notebook of the selected theme, one per schema of the themes shown so far
+        self.notebook = None
+        self.theme_tabs = {}
 
         save_button = ttk.Button(self.frame, text="Save", command=self.save_theme)
         save_button.grid(row=1, column=0, sticky="ew", padx=10, pady=5)
 
+        apply_button = ttk.Button(self.frame, text="Apply", command=self.apply_theme)
+        apply_button.grid(row=2, column=0, sticky="ew", padx=10, pady=5)
+
     def list_themes(self, themes):
         """
         summary
@@ -95,92 +191,103 @@ class ThemeView:
             self.theme_listbox.insert(tk.END, theme)
 
     def display_theme_data(self, theme_data):
-        """Displays theme data with enhanced UI for editing, using notebook tabs for categories."""
-        # Assuming self.notebook is already defined in the class
-        for tab in self.notebook.tabs():
-            self.notebook.forget(tab)
-        self.theme_data_widgets.clear()  # Clear existing widgets
-
-        for category, settings in theme_data.items():
-            tab_frame = ttk.Frame(self.notebook)
-            tab_frame.grid_rowconfigure(0, weight=0)
-            tab_frame.grid_rowconfigure(1, weight=0)
-            tab_frame.grid_rowconfigure(2, weight=0)
-            tab_frame.grid_rowconfigure(3, weight=0)
-            tab_frame.grid_rowconfigure(4, weight=0)
-            tab_frame.grid_rowconfigure(5, weight=0)
-            tab_frame.grid_rowconfigure(6, weight=0)
-            tab_frame.grid_rowconfigure(7, weight=0)
-            tab_frame.grid_columnconfigure(0, weight=0)
-            tab_frame.grid_columnconfigure(1, weight=0)
-            tab_frame.grid_columnconfigure(2, weight=0)
-            tab_frame.grid_columnconfigure(3, weight=0)
-            tab_frame.grid_columnconfigure(4, weight=0)
-            tab_frame.grid_columnconfigure(5, weight=0)
-            tab_frame.grid_columnconfigure(6, weight=0)
-            tab_frame.grid_columnconfigure(7, weight=0)
-            self.notebook.add(tab_frame, text=category.capitalize())
-
-            if category == "ttkStyles":
-                # Special handling for ttkStyles to create nested tabs
-                self.display_ttk_styles_settings(tab_frame, settings)
-            elif category == "colors":
-                self.display_colors_in_notebook(tab_frame, settings)
-            else:
-                self.display_category_settings(tab_frame, settings)
-
-    def display_ttk_styles_settings(self, parent_frame, ttk_styles):
-        """Handles the display of ttkStyles settings, including nested 'map' settings."""
-        ttk_styles_notebook = ttk.Notebook(parent_frame)
-        ttk_styles_notebook.grid(row=0, column=0, sticky="nsew", padx=5)
-
-        for widget_style, style_details in ttk_styles.items():
-            style_tab_frame = ttk.Frame(ttk_styles_notebook)
-            ttk_styles_notebook.add(style_tab_frame, text=widget_style)
-
-            # Display 'configure' settings directly in the tab
-            if "configure" in style_details:
-                configure_frame = ttk.LabelFrame(style_tab_frame, text="Configure")
-                configure_frame.grid(row=0, column=0,  columnspan=2, sticky="nsew", padx=5)
-
-                self.display_category_settings(configure_frame, style_details["configure"])
+        """
+        Displays theme data with enhanced UI for editing, using notebook tabs for categories.
 
-            # Handle 'map' settings separately due to their nested nature
-            if "map" in style_details:
-                self.display_map_settings(style_tab_frame, style_details["map"])
+        Tabs are built the first time they are shown. The tabs of a theme are kept, and a theme with the
+        same layout of settings is shown in them by updating their entries in place, so selecting a theme
+        builds at most the tab on screen.
+        """
+        schema = theme_schema(theme_data)
+        tabs = self.theme_tabs.get(schema)
+        if tabs is None:
+            tabs = ThemeTabs(ttk.Notebook(self.details_frame), theme_data)
+            tabs.notebook.bind('<<NotebookTabChanged>>', lambda event: self.build_selected_tab(tabs, event.widget))
+            self.theme_tabs[schema] = tabs
+            for category, settings in theme_data.items():
+                tab_frame = ttk.Frame(tabs.notebook)
+                tabs.notebook.add(tab_frame, text=category.capitalize())
+                tabs.builders[str(tab_frame)] = (self.display_category_tab, tab_frame, (category,))
+        else:
+            tabs.update(theme_data)
+
+        if self.notebook is not tabs.notebook:
+            if self.notebook is not None:
+                self.notebook.grid_remove()
+            tabs.notebook.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+            self.notebook = tabs.notebook
+        self.tabs = tabs
+        self.build_selected_tab(tabs, tabs.notebook)
+
+    def build_selected_tab(self, tabs, notebook):
+        """Builds the contents of the tab a notebook shows, unless they were built before."""
+        selected = notebook.select()
+        if selected in tabs.builders:
+            builder, frame, path = tabs.builders.pop(selected)
+            builder(tabs, frame, path)
+
+    def add_lazy_tab(self, tabs, notebook, text, builder, path):
+        """Adds a tab to a nested notebook, to be built by `builder(tabs, frame, path)` when first shown."""
+        tab_frame = ttk.Frame(notebook)
+        notebook.add(tab_frame, text=text)
+        tabs.builders[str(tab_frame)] = (builder, tab_frame, path)
+
+    def add_lazy_notebook(self, tabs, parent_frame, **grid_options):
+        """Creates a nested notebook whose tabs are built when first shown."""
+        notebook = ttk.Notebook(parent_frame)
+        notebook.grid(**grid_options)
+        notebook.bind('<<NotebookTabChanged>>', lambda event: self.build_selected_tab(tabs, event.widget))
+        return notebook
+
+    def display_category_tab(self, tabs, tab_frame, path):
+        """Builds the tab of a top-level category of the theme."""
+        category = path[0]
+        settings = tabs.get_value(path)
+        if category == "ttkStyles":
+            # Special handling for ttkStyles to create nested tabs
+            self.display_ttk_styles_settings(tabs, tab_frame, settings, path)
+        elif category == "colors":
+            self.display_colors_in_notebook(tabs, tab_frame, settings, path)
+        else:
+            self.display_category_settings(tabs, tab_frame, settings, path)
 
-    def display_colors_in_notebook(self, tab_frame, colors_settings):
+    def display_ttk_styles_settings(self, tabs, parent_frame, ttk_styles, path):
+        """Handles the display of ttkStyles settings, including nested 'map' settings."""
+        ttk_styles_notebook = self.add_lazy_notebook(tabs, parent_frame, row=0, column=0, sticky="nsew", padx=5)
+        for widget_style in ttk_styles:
+            self.add_lazy_tab(tabs, ttk_styles_notebook, widget_style, self.display_style_tab, path + (widget_style,))
+        self.build_selected_tab(tabs, ttk_styles_notebook)
+
+    def display_style_tab(self, tabs, style_tab_frame, path):
+        """Builds the tab of one ttk style."""
+        style_details = tabs.get_value(path)
+        # Display 'configure' settings directly in the tab
+        if "configure" in style_details:
+            configure_frame = ttk.LabelFrame(style_tab_frame, text="Configure")
+            configure_frame.grid(row=0, column=0,  columnspan=2, sticky="nsew", padx=5)
+
+            self.display_category_settings(tabs, configure_frame, style_details["configure"], path + ("configure",))
+
+        # Handle 'map' settings separately due to their nested nature
+        if "map" in style_details:
+            self.display_map_settings(tabs, style_tab_frame, style_details["map"], path + ("map",))
+
+    def display_colors_in_notebook(self, tabs, tab_frame, colors_settings, path):
         """Displays the 'Colors' category settings in a nested notebook for each subcategory."""
-        colors_notebook = ttk.Notebook(tab_frame)
-        colors_notebook.grid(row=0, column=4,rowspan=4, sticky="ew", padx=10, pady=5)
+        colors_notebook = self.add_lazy_notebook(tabs, tab_frame, row=0, column=4, rowspan=4, sticky="ew", padx=10,
+                                                 pady=5)
         row = 0
         for color_category, color_settings in colors_settings.items():
             if isinstance(color_settings, dict):  # For nested settings like 'button', 'treeview', etc.
-                color_tab_frame = ttk.Frame(colors_notebook)
-                color_tab_frame.grid_rowconfigure(0, weight=0)
-                color_tab_frame.grid_rowconfigure(1, weight=0)
-                color_tab_frame.grid_rowconfigure(2, weight=0)
-                color_tab_frame.grid_rowconfigure(3, weight=0)
-                color_tab_frame.grid_rowconfigure(4, weight=0)
-                color_tab_frame.grid_rowconfigure(5, weight=0)
-                color_tab_frame.grid_rowconfigure(6, weight=0)
-                color_tab_frame.grid_rowconfigure(7, weight=0)
-                color_tab_frame.grid_columnconfigure(0, weight=0)
-                color_tab_frame.grid_columnconfigure(1, weight=0)
-                color_tab_frame.grid_columnconfigure(2, weight=0)
-                color_tab_frame.grid_columnconfigure(3, weight=0)
-                color_tab_frame.grid_columnconfigure(4, weight=0)
-                color_tab_frame.grid_columnconfigure(5, weight=0)
-                color_tab_frame.grid_columnconfigure(6, weight=0)
-                color_tab_frame.grid_columnconfigure(7, weight=0)
-                colors_notebook.add(color_tab_frame, text=color_category.capitalize())
-                self.display_subcategory_settings(color_tab_frame, color_settings)
+                self.add_lazy_tab(tabs, colors_notebook, color_category.capitalize(),
+                                  self.display_subcategory_settings, path + (color_category,))
             else:
                 # Direct color settings, not expected but handled for completeness
-                self.create_setting_widget(tab_frame, color_category, color_settings, row)
+                self.create_setting_widget(tabs, tab_frame, color_category, color_settings, row, path + (color_category,))
             row += 1
+        self.build_selected_tab(tabs, colors_notebook)
 
-    def display_category_settings(self, frame, settings):
+    def display_category_settings(self, tabs, frame, settings, path):
         """Displays settings for a given category, with handling for nested dictionaries."""
         row = 0
         for key, value in settings.items():
@@ -188,13 +295,13 @@ class ThemeView:
                 # This could be a nested dictionary like in ttkStyles
                 sub_frame = ttk.LabelFrame(frame, text=key.capitalize())
                 sub_frame.grid(row=row, column=5, sticky="nsew", padx=10, pady=5)
-                self.display_category_settings(sub_frame, value)
+                self.display_category_settings(tabs, sub_frame, value, path + (key,))
             else:
                 # Display simple settings directly
-                self.create_setting_widget(frame, key, value, row)
+                self.create_setting_widget(tabs, frame, key, value, row, path + (key,))
             row += 1
 
-    def create_setting_widget(self, frame, key, value, row):
+    def create_setting_widget(self, tabs, frame, key, value, row, path):
         """Creates a setting widget for a given theme setting, with special handling for color values."""
         label = ttk.Label(frame, text=f"{key}:")
         label.grid(row=row, column=0, sticky="w", padx=(10, 2), pady=2)
@@ -203,28 +310,30 @@ class ThemeView:
         entry.insert(0, str(value))
         entry.grid(row=row, column=1, sticky="w", padx=5, pady=2)
 
-        if "color" in key.lower() or re.match(r'^#(?:[0-9a-fA-F]{3}){1,2}$', str(value)):
+        kind = setting_kind(key, value)
+        if kind == "color":
             entry.configure(state='readonly')  # Optionally make entry read-only
-            color_button = ttk.Button(frame, text="Choose Color", width=15, command=lambda: self.choose_color(key, value))
+            color_button = ttk.Button(frame, text="Choose Color", width=15,
+                                      command=lambda: self.choose_color(entry))
             color_button.grid(row=row, column=2, sticky="w", padx=5, pady=2)
-        elif "font" in key.lower():
+        elif kind == "font":
             entry.configure(state='readonly')  # Optionally make entry read-only
-            font_button = ttk.Button(frame, text="Choose Font", width=15, command=lambda: self.choose_font(key, str(value)))
+            font_button = ttk.Button(frame, text="Choose Font", width=15,
+                                     command=lambda: self.choose_font(entry))
             font_button.grid(row=row, column=2, sticky="w", padx=5, pady=2)
 
         # Store the widget for later reference
-        self.theme_data_widgets[key] = entry
+        tabs.add_entry(path, entry)
 
-    def display_subcategory_settings(self, frame, settings):
+    def display_subcategory_settings(self, tabs, frame, path):
         """Displays settings for a given subcategory within a frame, especially for nested dictionaries."""
         row = 0
-        for key, value in settings.items():
-            self.create_setting_widget(frame, key, value, row)
+        for key, value in tabs.get_value(path).items():
+            self.create_setting_widget(tabs, frame, key, value, row, path + (key,))
             row += 1
 
-    def display_map_settings(self, parent_frame, map_settings):
+    def display_map_settings(self, tabs, parent_frame, map_settings, path):
         """Displays detailed settings for 'map', considering its nested structure."""
-        s = ttk.Style()
         map_frame = ttk.LabelFrame(parent_frame, text="Map")
         map_frame.grid(row=0, column=5, sticky="nsew", padx=5)
         map_frame.columnconfigure(0, weight=1)
@@ -235,11 +344,11 @@ class ThemeView:
             setting_frame.grid(row=row, column=1, sticky="e", padx=5)
             row += 1
             # Display each state and its value within the setting
-            for state_dict in states:
+            for index, state_dict in enumerate(states):
                 for state, value in state_dict.items():
-                    self.create_map_setting_widget(setting_frame, state, value)
+                    self.create_map_setting_widget(tabs, setting_frame, state, value, path + (setting, index, state))
 
-    def create_map_setting_widget(self, frame, state, value):
+    def create_map_setting_widget(self, tabs, frame, state, value, path):
         """Creates widgets for each state in a 'map' setting."""
         state_label_text = f"{state}:"
         state_label = ttk.Label(frame, text=state_label_text)
@@ -250,35 +359,34 @@ class ThemeView:
         entry.grid(row=0, column=1, sticky="ew", padx=5, pady=2)
         frame.grid_columnconfigure(1, weight=1)
 
-        if "color" in state.lower() or re.match(r'^#(?:[0-9a-fA-F]{3}){1,2}$', str(value)):
+        kind = setting_kind(state, value)
+        if kind == "color":
             entry.configure(state='readonly')  # Optionally make entry read-only
-            color_button = ttk.Button(frame, text="Choose Color", command=lambda: self.choose_color(state, value))
+            color_button = ttk.Button(frame, text="Choose Color", command=lambda: self.choose_color(entry))
             color_button.grid(row=0, column=2, sticky="w", padx=5, pady=2)
-        elif "font" in state.lower():
+        elif kind == "font":
             entry.configure(state='readonly')  # Optionally make entry read-only
-            font_button = ttk.Button(frame, text="Choose Font", command=lambda: self.choose_font(state, str(value)))
+            font_button = ttk.Button(frame, text="Choose Font", command=lambda: self.choose_font(entry))
             font_button.grid(row=0, column=2, sticky="w", padx=5, pady=2)
 
-        self.theme_data_widgets[state] = entry
+        tabs.add_entry(path, entry)
 
-    def choose_color(self, key, current_color):
-        """Opens a color picker dialog and updates the corresponding entry widget."""
+    def choose_color(self, entry_widget):
+        """Opens a color picker dialog and updates the entry widget of the setting."""
         # Open the color chooser dialog and get the chosen color
-        chosen_color = colorchooser.askcolor(title="Choose color", initialcolor=current_color)[1]
+        chosen_color = colorchooser.askcolor(title="Choose color", initialcolor=entry_widget.get())[1]
         if chosen_color:
-            # Update the corresponding entry widget with the new color value
-            entry_widget = self.theme_data_widgets[key]
+            # Update the entry widget with the new color value
             entry_widget.configure(state='normal')  # Temporarily make the widget writable to update its value
             entry_widget.delete(0, 'end')
             entry_widget.insert(0, chosen_color)
             entry_widget.configure(state='readonly')  # Make the widget read-only again
 
-    def choose_font(self, key, current_font):
-        """ Opens a font picker dialog and updates the corresponding entry widget."""
-        dialog = FontSelectorDialog(self.frame, "Choose Font", current_font)
+    def choose_font(self, entry_widget):
+        """ Opens a font picker dialog and updates the entry widget of the setting."""
+        dialog = FontSelectorDialog(self.frame, "Choose Font", entry_widget.get())
         if dialog.result:
-            # Update the corresponding entry widget with the new color value
-            entry_widget = self.theme_data_widgets[key]
+            # Update the entry widget with the new font value
             entry_widget.configure(state='normal')  # Temporarily make the widget writable to update its value
             entry_widget.delete(0, 'end')
             entry_widget.insert(0, dialog.result)
@@ -293,11 +401,19 @@ class ThemeView:
             theme_name = self.theme_listbox.get(selection[0])
             self.callbacks['theme_selected'](theme_name)
 
+    def apply_theme(self):
+        """
+        Switches the application to the selected theme without restarting it.
+        """
+        selection = self.theme_listbox.curselection()
+        if selection:
+            self.callbacks['apply_theme'](self.theme_listbox.get(selection[0]))
+
     def save_theme(self):
         """
-        summary
+        Saves the theme shown, with the values edited in its entries.
         """
-        theme_data = {key: widget.get() for key, widget in self.theme_data_widgets.items()}
+        theme_data = self.tabs.edited_data() if self.tabs is not None else {}
         self.callbacks['save_theme'](theme_data)
 
     def show_message(self, message, success=True):
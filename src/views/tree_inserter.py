@@ -0,0 +1,159 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import time
+import tkinter as tk
+from collections import deque
+
+from src.utils.constants import TREE_INSERT_BUDGET_MS
+from src.utils.custom_logger import CustomLogger
+
+# Instantiate the logger
+logger = CustomLogger(__name__).logger
+
+# Bounds of the number of nodes inserted per slice, whatever the measured cost
+MIN_CHUNK_SIZE = 20
+MAX_CHUNK_SIZE = 5000
+
+
+class TreeInserter:
+    """
+    Inserts treeview nodes in slices run from after_idle(), so filling a large tree never blocks the
+    Tk event loop for longer than a time budget.
+
+    The number of nodes per slice adapts to the measured cost of an insert. Every slice is timed, and
+    the next one is sized to fill the budget at the cost seen so far, smoothed so a single slow slice
+    does not swing it.
+
+    Nodes are queued as (parent, iid, text, values, open) tuples and inserted at the end of their
+    parent, in order, so a parent queued before its children always exists when they are inserted.
+    Starting a new insertion cancels the one in progress.
+
+    A node Tk refuses, such as one whose iid is already in the tree, is logged and skipped along with
+    every node queued under it, and the rest of the insertion carries on.
+
+    Attributes:
+        treeview (ttk.Treeview): The treeview to fill.
+        node_index (NodeIndex | None): The index every inserted node is recorded in.
+        budget (float): The time one slice may take, in seconds.
+        chunk_size (int): The number of nodes the next slice inserts.
+    """
+
+    def __init__(self, treeview, node_index=None, budget_ms=TREE_INSERT_BUDGET_MS, chunk_size=200):
+        """
+        Initializes the TreeInserter.
+
+        Args:
+            treeview (ttk.Treeview): The treeview to fill.
+            node_index (NodeIndex | None): The index to record inserted nodes in, if any.
+            budget_ms (int): The time one slice may take, in milliseconds.
+            chunk_size (int): The number of nodes the first slice inserts.
+        """
+        self.treeview = treeview
+        self.node_index = node_index
+        self.budget = budget_ms / 1000
+        self.chunk_size = chunk_size
+        self.pending = deque()
+        self.skipped = set()
+        self.job = None
+
+    @property
+    def running(self):
+        """bool: Whether nodes are still waiting to be inserted."""
+        return bool(self.pending)
+
+    def start(self, nodes):
+        """
+        Cancels the insertion in progress and starts inserting new nodes.
+
+        Args:
+            nodes (iterable): (parent, iid, text, values, open) tuples, parents first.
+        """
+        self.cancel()
+        self.extend(nodes)
+
+    def extend(self, nodes):
+        """
+        Queues more nodes behind those of the insertion in progress. The first slice of an idle inserter
+        runs straight away, so small insertions complete before this returns.
+
+        Args:
+            nodes (iterable): (parent, iid, text, values, open) tuples, parents first.
+        """
+        # Taken now, so later changes to the data the nodes came from do not leak into the tree
+        self.pending.extend(nodes)
+        if self.job is None and self.pending:
+            self.step()
+
+    def cancel(self):
+        """
+        Drops the nodes not inserted yet.
+        """
+        if self.job is not None:
+            self.treeview.after_cancel(self.job)
+            self.job = None
+        self.pending.clear()
+        self.skipped.clear()
+
+    def finish(self):
+        """
+        Inserts every queued node at once, for changes that need the whole tree in place.
+        """
+        if self.job is not None:
+            self.treeview.after_cancel(self.job)
+            self.job = None
+        self.insert(len(self.pending))
+
+    def step(self):
+        """Inserts one slice of nodes and schedules the next while any are left."""
+        self.job = None
+        count = min(self.chunk_size, len(self.pending))
+        started = time.perf_counter()
+        self.insert(count)
+        elapsed = time.perf_counter() - started
+
+        if count:
+            fitting = self.budget * count / max(elapsed, 1e-6)
+            self.chunk_size = int(min(max((self.chunk_size + fitting) / 2, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE))
+        if self.pending:
+            self.job = self.treeview.after_idle(self.step)
+
+    def insert(self, count):
+        """Inserts the next `count` queued nodes."""
+        insert = self.treeview.insert
+        record = self.node_index.add if self.node_index is not None else None
+        pending = self.pending
+        skipped = self.skipped
+        for _ in range(count):
+            parent, iid, text, values, is_open = pending.popleft()
+            if skipped and parent in skipped:
+                skipped.add(iid)
+                continue
+            try:
+                insert(parent, 'end', iid=iid, text=text, values=values, open=is_open)
+            except tk.TclError as error:
+                logger.error(f"Could not insert tree node {iid}: {error}")
+                skipped.add(iid)
+                continue
+            if record is not None:
+                record(parent, iid)
@@ -0,0 +1,82 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import time
+import unittest
+
+from src.db.connection import DatabaseConnection
+from src.db.db_schema import INDEXES_SQL, TABLES_SQL
+from src.models.duplicate_model import DuplicateModel
+
+
+class DuplicateModelTest(unittest.TestCase):
+    """Tests for DuplicateModel.find_clusters."""
+
+    def setUp(self):
+        self.db_connection = DatabaseConnection(":memory:")
+        for statement in [*TABLES_SQL.values(), *INDEXES_SQL.values()]:
+            self.db_connection.connection.execute(statement)
+        self.model = DuplicateModel(self.db_connection)
+
+    def tearDown(self):
+        self.db_connection.close_connection()
+
+    def add_snippets(self, codes):
+        """Stores snippets with their signatures and returns their IDs."""
+        connection = self.db_connection.connection
+        snippet_ids = []
+        for code in codes:
+            cursor = connection.execute(
+                "INSERT INTO snippets (title, code, language_id, category_id) VALUES (?, ?, 1, 1)", ("snippet", code))
+            self.model.update_signature(cursor.lastrowid, code, commit=False)
+            snippet_ids.append(cursor.lastrowid)
+        connection.commit()
+        return snippet_ids
+
+    def test_large_bucket_of_copies_is_one_cluster(self):
+        code = "def total(values):\n    return sum(value * 2 for value in values if value > 0)\n"
+        copies = self.add_snippets([code] * 3000)
+        near = self.add_snippets([code.replace("total", "summed")])
+        other = self.add_snippets(["class Stack:\n    def push(self, item):\n        self.items.append(item)\n"])
+
+        started = time.perf_counter()
+        clusters = self.model.find_clusters(threshold=0.5)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(set(clusters[0]), set(copies) | set(near))
+        self.assertNotIn(other[0], clusters[0])
+        # Pairwise scoring of every copy would compare about 4.5 million pairs
+        self.assertLess(elapsed, 5)
+
+    def test_bucket_over_the_limit_is_not_scored(self):
+        body = "\n".join(f"line_{line} = compute(line_{line - 1}, {line})" for line in range(1, 40))
+        variants = ["".join(f"\nvariant_{index}_{line} = {index * line}" for line in range(4)) for index in range(5)]
+        snippet_ids = self.add_snippets([body + variant for variant in variants])
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(self.model.find_clusters(threshold=0.5, bucket_limit=1), [])
+        self.assertEqual(self.model.find_clusters(threshold=0.5), [snippet_ids])
+
+
+if __name__ == '__main__':
+    unittest.main()
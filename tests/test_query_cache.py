@@ -0,0 +1,87 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+import tempfile
+import unittest
+
+from src.db.connection import DatabaseConnection
+from src.utils.query_cache import QueryCache, query_cache
+
+QUERY = "SELECT name FROM languages ORDER BY id"
+
+
+class QueryCacheConnectionTest(unittest.TestCase):
+    """Tests for the connections the query cache serves."""
+
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.temporary_dir.name, "library.db")
+        self.main = DatabaseConnection(self.db_file)
+        self.main.connection.execute("CREATE TABLE languages (id INTEGER PRIMARY KEY, name TEXT)")
+        self.main.connection.execute("INSERT INTO languages (name) VALUES ('Python')")
+        self.main.connection.commit()
+        self.cache = QueryCache()
+        self.cache.track(self.main.connection)
+
+    def tearDown(self):
+        self.main.close_connection()
+        self.temporary_dir.cleanup()
+
+    def test_tracked_connection_sees_commits_of_other_connections(self):
+        self.assertEqual(self.cache.fetch(self.main.connection, QUERY, tables=("languages",)), [("Python",)])
+        self.assertEqual(self.cache.fetch(self.main.connection, QUERY, tables=("languages",)), [("Python",)])
+        self.assertEqual(self.cache.hits, 1)
+
+        worker = DatabaseConnection(self.db_file)
+        worker.connection.execute("INSERT INTO languages (name) VALUES ('Java')")
+        worker.connection.commit()
+        worker.close_connection()
+        self.assertEqual(self.cache.fetch(self.main.connection, QUERY, tables=("languages",)),
+                         [("Python",), ("Java",)])
+
+    def test_other_connections_bypass_the_cache(self):
+        self.cache.fetch(self.main.connection, QUERY, tables=("languages",))
+        # A write the models never reported, which a new connection could not tell apart from a cached result
+        self.main.connection.execute("INSERT INTO languages (name) VALUES ('Java')")
+        self.main.connection.commit()
+
+        worker = DatabaseConnection(self.db_file)
+        try:
+            self.assertEqual(self.cache.fetch(worker.connection, QUERY, tables=("languages",)),
+                             [("Python",), ("Java",)])
+        finally:
+            worker.close_connection()
+        self.assertEqual(len(self.cache.entries), 1)
+
+    def test_closing_the_tracked_connection_forgets_it(self):
+        connection = DatabaseConnection(self.db_file)
+        query_cache.track(connection.connection)
+        query_cache.fetch(connection.connection, QUERY, tables=("languages",))
+        connection.close_connection()
+        self.assertIsNone(query_cache.connection)
+        self.assertEqual(len(query_cache.entries), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import unittest
+
+from src.db.connection import DatabaseConnection
+from src.db.db_schema import INDEXES_SQL, INITIAL_DATA_SQL, TABLES_SQL
+from src.models.snippet_model import SnippetModel
+
+
+class SnippetModelSelectionTest(unittest.TestCase):
+    """Tests that bulk operations on a selection that picks nothing leave the library alone."""
+
+    EMPTY_SELECTIONS = (
+        None,
+        {},
+        {'snippet_ids': [], 'language_nodes': [], 'category_nodes': []},
+        {'snippets': [1, 2]},
+        {'language_ids': [1]},
+    )
+
+    def setUp(self):
+        self.db_connection = DatabaseConnection(":memory:")
+        connection = self.db_connection.connection
+        for statement in [*TABLES_SQL.values(), *INDEXES_SQL.values()]:
+            connection.execute(statement)
+        for statements in INITIAL_DATA_SQL.values():
+            for statement in statements:
+                connection.execute(statement)
+        connection.commit()
+        self.model = SnippetModel(self.db_connection)
+        self.rows = self.read_rows()
+        self.assertTrue(self.rows)
+
+    def tearDown(self):
+        self.db_connection.close_connection()
+
+    def read_rows(self):
+        return self.db_connection.connection.execute(
+            "SELECT id, title, language_id, category_id FROM snippets ORDER BY id").fetchall()
+
+    def test_empty_or_unknown_selection_touches_nothing(self):
+        operations = (
+            ("delete", lambda selection: self.model.delete_snippets(selection)),
+            ("move", lambda selection: self.model.move_snippets(selection, 2)),
+            ("change language", lambda selection: self.model.change_snippets_language(selection, 2)),
+            ("duplicate", lambda selection: self.model.duplicate_snippets(selection)),
+        )
+        for name, operation in operations:
+            for selection in self.EMPTY_SELECTIONS:
+                with self.subTest(operation=name, selection=selection):
+                    self.assertEqual(operation(selection), [])
+                    self.assertEqual(self.read_rows(), self.rows)
+
+    def test_picked_snippet_is_deleted(self):
+        snippet_id = self.rows[0][0]
+        self.assertEqual(self.model.delete_snippets({'snippet_ids': [snippet_id]}), [snippet_id])
+        self.assertEqual(self.read_rows(), self.rows[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
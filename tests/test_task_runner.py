@@ -0,0 +1,112 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import threading
+import time
+import unittest
+
+from src.utils.task_runner import TaskRunner
+from src.utils.tree_loader import TreeLoader
+
+
+class FakeRoot:
+    """Stands in for the Tk root, running the after() callbacks when the test asks."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, delay, callback):
+        self.jobs.append(callback)
+        return f"after#{len(self.jobs)}"
+
+    def after_cancel(self, job):
+        pass
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, []
+        for callback in jobs:
+            callback()
+
+
+class TaskRunnerTest(unittest.TestCase):
+    """Tests for TaskRunner."""
+
+    def wait_for_results(self, runner, count):
+        deadline = time.monotonic() + 5
+        while runner.results.qsize() < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_failing_callback_does_not_stop_delivery(self):
+        root = FakeRoot()
+        runner = TaskRunner(root)
+        release = threading.Event()
+        delivered = []
+
+        def fail(result):
+            raise RuntimeError("callback failed")
+
+        runner.submit(lambda: 1, callback=fail)
+        runner.submit(release.wait, 5, callback=delivered.append)
+        self.wait_for_results(runner, 1)
+        with self.assertLogs(level='ERROR'):
+            root.run_pending()
+
+        # The failure was logged, and polling carries on for the task still running
+        self.assertEqual(runner.pending, 1)
+        self.assertEqual(len(root.jobs), 1)
+        release.set()
+        self.wait_for_results(runner, 1)
+        root.run_pending()
+        self.assertEqual(delivered, [True])
+        self.assertEqual(root.jobs, [])
+
+
+class TreeLoaderTest(unittest.TestCase):
+    """Tests for the polling of TreeLoader, fed without a worker thread."""
+
+    def test_failing_callback_cancels_the_load_and_polling_stops(self):
+        root = FakeRoot()
+
+        def fail(*args):
+            raise RuntimeError("callback failed")
+
+        done = []
+        loader = TreeLoader(root, ":memory:", on_categories=fail, on_snippets=fail,
+                            on_done=lambda: done.append(True))
+        loader.generation = 1
+        loader.cancel_event = threading.Event()
+        loader.chunks.put((1, 'categories', ([], 0, False)))
+        loader.chunks.put((1, 'done', ()))
+
+        with self.assertLogs(level='ERROR'):
+            loader.poll()
+        self.assertFalse(loader.running)
+        root.run_pending()
+        # The chunk queued behind the failure belongs to the cancelled load and is dropped
+        self.assertEqual(done, [])
+        self.assertTrue(loader.chunks.empty())
+        self.assertEqual(root.jobs, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
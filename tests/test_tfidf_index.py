@@ -0,0 +1,72 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import threading
+import unittest
+
+from src.utils.tfidf_index import TfidfIndex, extract_terms
+
+
+class TfidfIndexLoadingTest(unittest.TestCase):
+    """Tests for edits made while the index is being loaded."""
+
+    def setUp(self):
+        self.index = TfidfIndex()
+        self.entries = [
+            (1, extract_terms("Parse JSON file", "json.load(file)"), "Parse JSON file", "Python"),
+            (2, extract_terms("Read JSON", "json.loads(text)"), "Read JSON", "Python"),
+            (3, extract_terms("Sort list", "items.sort()"), "Sort list", "Python"),
+        ]
+
+    def test_edits_during_a_load_are_replayed_after_it(self):
+        self.assertTrue(self.index.start_loading())
+        # Made on another thread while the library is read, without waiting for the load
+        editor = threading.Thread(target=lambda: (
+            self.index.set_document(4, extract_terms("Write JSON", "json.dump(data)"), "Write JSON", "Python"),
+            self.index.remove_document(3),
+            self.index.relabel_document(2, "Read JSON", "JavaScript")))
+        editor.start()
+        editor.join(timeout=5)
+        self.assertFalse(editor.is_alive())
+        self.assertEqual(self.index.labels, {})
+
+        self.index.load(self.entries)
+        self.assertTrue(self.index.loaded)
+        self.assertFalse(self.index.loading)
+        self.assertEqual(self.index.labels, {1: ("Parse JSON file", "Python"), 2: ("Read JSON", "JavaScript"),
+                                             4: ("Write JSON", "Python")})
+        self.assertIn(4, [snippet_id for snippet_id, _ in self.index.most_similar(1)])
+        self.assertFalse(self.index.start_loading())
+
+    def test_cancelled_load_can_be_claimed_again(self):
+        self.assertTrue(self.index.start_loading())
+        self.index.set_document(4, extract_terms("Write JSON", "json.dump(data)"), "Write JSON", "Python")
+        self.index.cancel_loading()
+        self.assertFalse(self.index.active)
+        self.assertTrue(self.index.start_loading())
+        self.index.load(self.entries)
+        self.assertNotIn(4, self.index.labels)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+import tempfile
+import unittest
+from array import array
+
+from src.utils.token_cache import TokenCache
+
+
+class TokenCacheTest(unittest.TestCase):
+    """Tests for TokenCache."""
+
+    def setUp(self):
+        self.temporary_dir = tempfile.TemporaryDirectory()
+        self.spans = (array('q', [0, 10]), array('q', [5, 12]), array('B', [0, 2]))
+
+    def tearDown(self):
+        self.temporary_dir.cleanup()
+
+    def test_put_then_get_returns_the_spans(self):
+        cache = TokenCache(cache_dir=self.temporary_dir.name)
+        key = TokenCache.key("python", "v1", "def f(): pass")
+        cache.put(key, *self.spans)
+        self.assertEqual(TokenCache(cache_dir=self.temporary_dir.name).get(key), self.spans)
+
+    def test_unusable_directory_acts_as_a_miss(self):
+        # A regular file where the folder should be, which no one can create a folder under
+        blocker = os.path.join(self.temporary_dir.name, "blocker")
+        with open(blocker, 'w'):
+            pass
+        cache = TokenCache(cache_dir=os.path.join(blocker, "tokens"))
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", *self.spans)
+        cache.discard("key")
+        self.assertIsNone(cache.get("key"))
+        self.assertTrue(cache.disabled)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_least_recently_used_spans_are_evicted(self):
+        cache = TokenCache(cache_dir=self.temporary_dir.name, max_bytes=100)
+        cache.put("old", *self.spans)
+        cache.put("new", *self.spans)
+        cache.put("newest", *self.spans)
+        self.assertIsNone(cache.get("old"))
+        self.assertIsNotNone(cache.get("newest"))
+        self.assertLessEqual(cache.size, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+MIT License
+
+Copyright (c) 2024 David Southwood
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from src.controllers.application_controller import ApplicationController
+from src.db.connection import DatabaseConnection
+from src.models.application_model import ApplicationModel
+from src.utils.initialize_database import DatabaseInitializer
+from src.utils.query_cache import query_cache
+
+# The sizes of the generated libraries
+LIBRARY_SIZES = (1000, 10000, 100000)
+# How much the cost per snippet may grow from 10k to 100k snippets. A cost that grows with the
+# library, as when every snippet is checked against every category, grows about tenfold.
+MAX_GROWTH = 2.5
+
+
+class TreeScalingTest(unittest.TestCase):
+    """
+    Benchmarks building the snippet tree with ApplicationController.prepare_treeview_data over generated
+    libraries of 1k, 10k and 100k snippets, and checks the cost per snippet stays roughly flat.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temporary_dir = tempfile.TemporaryDirectory()
+        cls.timings = {size: cls.time_build(cls.make_library(size), size) for size in LIBRARY_SIZES}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temporary_dir.cleanup()
+
+    @classmethod
+    def make_library(cls, size):
+        """Creates a library with the initial data and `size` generated snippets spread over the tree."""
+        db_connection = DatabaseConnection(os.path.join(cls.temporary_dir.name, f"library_{size}.db"))
+        initializer = DatabaseInitializer(db_connection)
+        initializer.create_tables()
+        initializer.load_initial_data()
+        # Snippets are only generated under the categories shown for their language, so all are filed
+        places = [(row[0], row[2]) for row in ApplicationModel(db_connection).get_treeview_categories()]
+        db_connection.connection.executemany(
+            "INSERT INTO snippets (title, code, language_id, category_id) VALUES (?, ?, ?, ?)",
+            ((f"Snippet {index}", f"def f{index}(x):\n    return x + {index}\n", *places[index % len(places)])
+             for index in range(size)))
+        db_connection.connection.commit()
+        return db_connection
+
+    @staticmethod
+    def time_build(db_connection, size, repeat=3):
+        """Returns the best time to build the tree of a library, in seconds per snippet."""
+        controller = ApplicationController(ApplicationModel(db_connection), db_connection)
+        best = float('inf')
+        try:
+            for _ in range(repeat):
+                query_cache.clear()
+                started = time.perf_counter()
+                controller.prepare_treeview_data()
+                best = min(best, time.perf_counter() - started)
+            # Every generated snippet is filed in the tree
+            assert len(controller.snippet_locations) == ApplicationModel(db_connection).count_snippets()
+        finally:
+            db_connection.close_connection()
+        return best / size
+
+    def test_cost_per_snippet_stays_flat(self):
+        for size, per_snippet in self.timings.items():
+            print(f"{size:>7} snippets: {per_snippet * 1e6:.2f}us per snippet")
+        growth = self.timings[100000] / self.timings[10000]
+        self.assertLess(growth, MAX_GROWTH, f"Cost per snippet grew {growth:.1f}x from 10k to 100k snippets")
+
+
+if __name__ == '__main__':
+    unittest.main()